@@ -0,0 +1,53 @@
+"""2: Adds track lookup indexes
+
+Revision ID: 0c6465e18d9
+Revises: 2f10651e946
+Create Date: 2014-12-08 14:21:37.518204
+
+tracks and trackStores tables get a unique index on uid, an index on next for previous track
+lookups and a composite site, level, sector, trackwayType, trackwayNumber index for sitemap and
+trackway queries. The uid index matches the unique uid column of the models, so the migration
+fails, listing the duplicated uids, if a table already contains duplicate uids. These must be
+resolved before the database can be upgraded.
+"""
+
+# revision identifiers, used by Alembic.
+revision = '0c6465e18d9'
+down_revision = '2f10651e946'
+
+from alembic import op
+
+TABLES = ['tracks', 'trackStores']
+
+# Maximum number of duplicated uids listed in the error message of a failed upgrade
+MAX_LISTED_DUPLICATES = 20
+
+#___________________________________________________________________________________________________ upgrade
+def upgrade():
+    connection = op.get_bind()
+
+    for table in TABLES:
+        duplicates = connection.execute(
+            'SELECT uid, COUNT(*) FROM "%s" GROUP BY uid HAVING COUNT(*) > 1 ORDER BY uid' %
+            table).fetchall()
+        if duplicates:
+            listed = ['%s (%s rows)' % (row[0], row[1]) for row in duplicates]
+            if len(listed) > MAX_LISTED_DUPLICATES:
+                listed = listed[:MAX_LISTED_DUPLICATES] + ['...']
+            raise RuntimeError(
+                'Unable to create the unique uid index of the "%s" table, which contains %s '
+                'duplicated uids: %s' % (table, len(duplicates), ', '.join(listed)))
+
+        op.execute('CREATE UNIQUE INDEX IF NOT EXISTS "ix_%s_uid" ON "%s" (uid)' % (
+            table, table))
+        op.execute('CREATE INDEX IF NOT EXISTS "ix_%s_next" ON "%s" (next)' % (table, table))
+        op.execute(
+            'CREATE INDEX IF NOT EXISTS "ix_%s_site_level_trackway" ON "%s" '
+            '(site, level, sector, trackwayType, trackwayNumber)' % (table, table))
+
+#___________________________________________________________________________________________________ downgrade
+def downgrade():
+    for table in TABLES:
+        op.execute('DROP INDEX IF EXISTS "ix_%s_site_level_trackway"' % table)
+        op.execute('DROP INDEX IF EXISTS "ix_%s_next"' % table)
+        op.execute('DROP INDEX IF EXISTS "ix_%s_uid"' % table)
@@ -0,0 +1,79 @@
+"""4: Adds track note search index
+
+Revision ID: 4b1e7d3a9c2
+Revises: 975c76ec73d
+Create Date: 2014-12-12 09:41:18.210534
+
+Creates the trackNotes SQLite FTS5 full-text index over the note and snapshot key names of every
+track, keyed by the integer primary key of the tracks table. The index is kept in sync by the
+application through the trackNoteChanges table, to which triggers on the tracks table add the row
+ids of inserted, deleted and updated tracks. The triggers only write to that ordinary table, so
+the database remains writable by SQLite libraries without the FTS5 or JSON extensions. SQLite
+builds without those extensions skip the index and searches fall back to scanning the tracks
+table.
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4b1e7d3a9c2'
+down_revision = '975c76ec73d'
+
+from alembic import op
+
+# SQL expression that lists the top-level keys of a snapshot JSON string separated by spaces
+SNAPSHOT_KEYS = '''CASE WHEN json_valid(snapshot) AND json_type(snapshot) = 'object'
+        THEN (SELECT group_concat(key, ' ') FROM json_each(snapshot))
+        ELSE '' END'''
+
+CREATE_STATEMENTS = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS trackNotes USING fts5(
+        uid UNINDEXED, note, snapshotKeys, tokenize='unicode61')''',
+
+    'CREATE TABLE IF NOT EXISTS trackNoteChanges (i INTEGER PRIMARY KEY)',
+
+    '''CREATE TRIGGER IF NOT EXISTS trackNotes_afterInsert AFTER INSERT ON tracks BEGIN
+        INSERT OR IGNORE INTO trackNoteChanges(i) VALUES (new.i);
+    END''',
+
+    '''CREATE TRIGGER IF NOT EXISTS trackNotes_afterDelete AFTER DELETE ON tracks BEGIN
+        INSERT OR IGNORE INTO trackNoteChanges(i) VALUES (old.i);
+    END''',
+
+    '''CREATE TRIGGER IF NOT EXISTS trackNotes_afterUpdate
+    AFTER UPDATE OF i, uid, note, snapshot ON tracks BEGIN
+        INSERT OR IGNORE INTO trackNoteChanges(i) VALUES (old.i);
+        INSERT OR IGNORE INTO trackNoteChanges(i) VALUES (new.i);
+    END''',
+
+    '''INSERT INTO trackNotes(rowid, uid, note, snapshotKeys)
+        SELECT i, uid, COALESCE(note, ''), %s FROM tracks''' % SNAPSHOT_KEYS ]
+
+DROP_STATEMENTS = [
+    'DROP TRIGGER IF EXISTS trackNotes_afterUpdate',
+    'DROP TRIGGER IF EXISTS trackNotes_afterDelete',
+    'DROP TRIGGER IF EXISTS trackNotes_afterInsert',
+    'DROP TABLE IF EXISTS trackNoteChanges',
+    'DROP TABLE IF EXISTS trackNotes' ]
+
+#___________________________________________________________________________________________________ upgrade
+def upgrade():
+    if not isSupported(op.get_bind()):
+        return
+
+    for statement in CREATE_STATEMENTS:
+        op.execute(statement)
+
+#___________________________________________________________________________________________________ downgrade
+def downgrade():
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
+
+#___________________________________________________________________________________________________ isSupported
+def isSupported(connection):
+    """ Returns whether or not the SQLite library provides the FTS5 and JSON extensions. """
+    try:
+        connection.execute('CREATE VIRTUAL TABLE temp.trackNotesProbe USING fts5(value)')
+        connection.execute('DROP TABLE temp.trackNotesProbe')
+        connection.execute('SELECT json_valid(\'{}\')')
+    except Exception:
+        return False
+    return True
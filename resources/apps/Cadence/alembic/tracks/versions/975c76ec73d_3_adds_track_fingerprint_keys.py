@@ -0,0 +1,52 @@
+"""3: Adds track fingerprint keys
+
+Revision ID: 975c76ec73d
+Revises: 0c6465e18d9
+Create Date: 2014-12-10 11:02:54.804117
+
+tracks and trackStores tables get indexed fingerprintKey and seriesFingerprintKey columns, which
+persist the fingerprint and trackSeriesFingerprint values so that tracks can be identified with a
+single equality lookup. Existing rows are populated from their uniquely identifying columns.
+"""
+
+# revision identifiers, used by Alembic.
+revision = '975c76ec73d'
+down_revision = '0c6465e18d9'
+
+from alembic import op
+import sqlalchemy as sqla
+
+TABLES = ['tracks', 'trackStores']
+
+# SQL equivalent of the TracksDefault.trackSeriesFingerprint property
+SERIES_FINGERPRINT = ' || \'-\' || '.join([
+    'COALESCE(site, \'\')',
+    'COALESCE(level, \'\')',
+    'COALESCE(year, \'\')',
+    'COALESCE(sector, \'\')',
+    'COALESCE(trackwayType, \'\')',
+    'COALESCE(trackwayNumber, \'\')',
+    'CASE WHEN "left" THEN \'L\' ELSE \'R\' END',
+    'CASE WHEN pes THEN \'P\' ELSE \'M\' END' ])
+
+#___________________________________________________________________________________________________ upgrade
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sqla.Column('fingerprintKey', sqla.Unicode, default=''))
+        op.add_column(table, sqla.Column('seriesFingerprintKey', sqla.Unicode, default=''))
+
+        op.execute('UPDATE "%s" SET seriesFingerprintKey = %s' % (table, SERIES_FINGERPRINT))
+        op.execute(
+            'UPDATE "%s" SET fingerprintKey = seriesFingerprintKey || \'-\' || COALESCE(number, \'\')'
+            % table)
+
+        op.create_index('ix_%s_fingerprintKey' % table, table, ['fingerprintKey'])
+        op.create_index('ix_%s_seriesFingerprintKey' % table, table, ['seriesFingerprintKey'])
+
+#___________________________________________________________________________________________________ downgrade
+def downgrade():
+    for table in TABLES:
+        op.drop_index('ix_%s_seriesFingerprintKey' % table, table)
+        op.drop_index('ix_%s_fingerprintKey' % table, table)
+        op.drop_column(table, 'seriesFingerprintKey')
+        op.drop_column(table, 'fingerprintKey')
@@ -0,0 +1,67 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import timeit
+
+import numpy as np
+from pyglass.app.PyGlassEnvironment import PyGlassEnvironment
+
+PyGlassEnvironment.initializeFromInternalPath(__file__)
+
+from cadence.analysis.shared.TrackArray import TrackArray
+from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
+
+# Compares projecting every track within the largest sitemap to map coordinates one point at a
+# time, as the CadenceDrawing scalar arithmetic did previously, with a single vectorized
+# SitemapTransform call
+
+REPEATS = 5
+
+model   = Tracks_SiteMap.MASTER
+session = model.createSession()
+
+sitemap = None
+tracks  = []
+for sm in session.query(model).all():
+    if not sm.filename:
+        continue
+    smTracks = sm.getAllTracks(session)
+    if len(smTracks) > len(tracks):
+        sitemap = sm
+        tracks  = smTracks
+
+if sitemap is None:
+    print('No sitemaps with tracks found')
+    session.close()
+    raise SystemExit(0)
+
+transform  = sitemap.getTransform()
+trackArray = TrackArray(tracks)
+xScene     = 100.0*trackArray.x
+zScene     = 100.0*trackArray.z
+
+#___________________________________________________________________________________________________ scalarToMap
+def scalarToMap():
+    scale = 0.1*sitemap.scale
+    out   = []
+    for t in tracks:
+        out.append((sitemap.xFederal - t.x/scale, sitemap.yFederal - t.z/scale))
+    return out
+
+#___________________________________________________________________________________________________ vectorizedToMap
+def vectorizedToMap():
+    return transform.sceneToMap(xScene, zScene)
+
+expected = np.array(scalarToMap())
+xMap, yMap = vectorizedToMap()
+assert np.allclose(expected[:, 0], xMap) and np.allclose(expected[:, 1], yMap)
+
+before = min(timeit.repeat(scalarToMap, repeat=REPEATS, number=1))
+after  = min(timeit.repeat(vectorizedToMap, repeat=REPEATS, number=1))
+
+session.close()
+
+print('SITEMAP:', sitemap)
+print('TRACKS:', len(tracks))
+print('SCALAR:     %.2f ms' % (1.0e3*before))
+print('VECTORIZED: %.2f ms' % (1.0e3*after))
+print('SPEEDUP:    %.1fx' % (before/after if after else 0.0))
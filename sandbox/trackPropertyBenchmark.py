@@ -0,0 +1,67 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import timeit
+
+from pyaid.reflection.Reflection import Reflection
+from pyglass.app.PyGlassEnvironment import PyGlassEnvironment
+
+PyGlassEnvironment.initializeFromInternalPath(__file__)
+
+from cadence.enums.TrackPropEnum import TrackPropEnum
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+
+# Compares the per-track cost of the Reflection-driven serialization loops that the track models
+# used previously with the precompiled TrackPropEnumOps tables they use now
+
+REPEATS = 5
+
+model   = Tracks_Track.MASTER
+session = model.createSession()
+tracks  = session.query(model).limit(1000).all()
+
+#___________________________________________________________________________________________________ reflectionToDict
+def reflectionToDict(track):
+    out = dict(id=track.id, uid=track.uid)
+    for enum in Reflection.getReflectionList(TrackPropEnum):
+        out[enum.name] = getattr(track, enum.name)
+    return out
+
+#___________________________________________________________________________________________________ reflectionFromDict
+def reflectionFromDict(track, data):
+    for enum in Reflection.getReflectionList(TrackPropEnum):
+        if enum == TrackPropEnum.UID:
+            continue
+        if enum.name in data:
+            setattr(track, enum.name, data[enum.name])
+
+#___________________________________________________________________________________________________ reflectionToMayaNodeDict
+def reflectionToMayaNodeDict(track):
+    out = dict()
+    for enum in Reflection.getReflectionList(TrackPropEnum):
+        if enum.maya:
+            out[enum.maya] = getattr(track, enum.name)
+    return out
+
+#___________________________________________________________________________________________________ runAll
+def runAll(toDict, fromDict, toMayaNodeDict):
+    for t in tracks:
+        data = toDict(t)
+        fromDict(t, data)
+        toMayaNodeDict(t)
+
+before = min(timeit.repeat(
+    lambda: runAll(reflectionToDict, reflectionFromDict, reflectionToMayaNodeDict),
+    repeat=REPEATS, number=1))
+
+after = min(timeit.repeat(
+    lambda: runAll(model.toDict, model.fromDict, model.toMayaNodeDict),
+    repeat=REPEATS, number=1))
+
+session.rollback()
+session.close()
+
+count = max(1, len(tracks))
+print('TRACKS:', len(tracks))
+print('REFLECTION:  %.2f us/track' % (1.0e6*before/count))
+print('PRECOMPILED: %.2f us/track' % (1.0e6*after/count))
+print('SPEEDUP:     %.1fx' % (before/after if after else 0.0))
@@ -113,6 +113,16 @@ class CadenceMainWindow(PyGlassWindow):
         headRevision = AlembicUtils.getHeadDatabaseRevision(databaseUrl=tracks.DATABASE_URL)
         myRevision = AlembicUtils.getCurrentDatabaseRevision(databaseUrl=tracks.DATABASE_URL)
         print('[TRACKS]: %s [HEAD %s]' % (myRevision, headRevision))
+
+        # The databases are switched to write-ahead logging the first time they are opened
+        # without another process, e.g. Maya, holding them, and are used as they are otherwise
+        from cadence.models.SessionFactory import SessionFactory
+        from cadence.models.analysis.Analysis_TrackCurve import Analysis_TrackCurve
+        from cadence.models.tracks.Tracks_Track import Tracks_Track
+        for model in (Tracks_Track, Analysis_TrackCurve):
+            if not SessionFactory.enableWriteAheadLogging(model):
+                print('[WARNING]: Write-ahead logging not enabled for the %s database' % (
+                    model.__module__.split('.')[-2]))
         super(CadenceMainWindow, self)._initializeImpl()
 
 #___________________________________________________________________________________________________ _firstShowImpl
@@ -6,9 +6,13 @@ from __future__ import print_function, absolute_import, unicode_literals, divisi
 
 from PyPDF2.merger import PdfFileMerger
 from PyPDF2.pdf import PdfFileReader
+import time
+
 from pyaid.config.ConfigsDict import ConfigsDict
 from pyaid.time.TimeUtils import TimeUtils
 
+from cadence.analysis.StageLogBuffer import StageLogBuffer
+
 
 try:
     import matplotlib.pyplot as plt
@@ -23,9 +27,50 @@ class AnalysisStage(object):
 #===================================================================================================
 #                                                                                       C L A S S
 
+    # Ways in which the accumulator attributes of stages merge the partial results of sitemap
+    # shards: extending lists, summing numbers, updating dictionaries or appending CsvWriter rows
+    MERGE_EXTEND = 'extend'
+    MERGE_SUM    = 'sum'
+    MERGE_UPDATE = 'update'
+    MERGE_ROWS   = 'rows'
+
+    # Stages opt into sharding their sitemap traversal across processes by mapping the names of
+    # their accumulator attributes to one of the merge modes above
+    SHARD_ACCUMULATORS = None
+
+    # The keys of the track values within the entries of the extended accumulators, which are
+    # copies when entries are merged from shards or loaded from the result cache and are bound
+    # to the tracks of the owner by uid. The entries are stored in the cache of the track of the
+    # first key under TRACK_CACHE_KEY, if specified.
+    ENTRY_TRACK_FIELDS = None
+    TRACK_CACHE_KEY    = None
+
+    # Stages opt into fused traversal, where the analyzer walks the hierarchy once for several
+    # stages, when their overridden _analyze*() methods either do not descend into the next level
+    # or call the super method last. Work that must follow the descent into the track series of
+    # a trackway belongs in _postAnalyzeTrackway() instead.
+    FUSABLE = False
+
+    # Stages with declared accumulators opt into persisting the accumulated results of each
+    # trackway across runs by specifying a code version, which must be incremented whenever a
+    # change to the stage alters its results. Cached results are keyed by the values of the
+    # CACHE_COLUMNS of every track in the trackway, which default to all TrackRecord columns.
+    # The accumulators must only be modified while the stage analyzes a trackway.
+    CACHE_VERSION = None
+    CACHE_COLUMNS = None
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, key, owner, label =None, **kwargs):
-        """Creates a new instance of AnalysisStage."""
+        """Creates a new instance of AnalysisStage.
+
+            [dependencies] :: [String] :: None
+                The keys of the stages, or the names of the outputs of stages, that must complete
+                before this stage executes. If not specified, the stage depends on every stage
+                added to the owner before it.
+
+            [outputs] :: [String] :: []
+                The names of the data this stage produces for other stages, in addition to its
+                key, which other stages can list as dependencies. """
 
         # The AnalyzerBase object that owns this stage
         self.owner = owner
@@ -34,6 +79,17 @@ class AnalysisStage(object):
         self._cache = ConfigsDict()
         self._label = label if label else self.__class__.__name__
         self._startTime = None
+        self._logBuffer = None
+        self._fused     = False
+        self._descend   = False
+        self._busyTime  = None
+
+        self._resultCache = None
+        self._cacheEntry  = None
+
+        dependencies        = kwargs.get('dependencies')
+        self._dependencies  = None if dependencies is None else list(dependencies)
+        self._outputs       = list(kwargs.get('outputs', []))
 
         self._analyzeCallback       = kwargs.get('analyze')
         self._preStageCallback      = kwargs.get('pre')
@@ -53,6 +109,12 @@ class AnalysisStage(object):
             references this stage. """
         return self._key
 
+#___________________________________________________________________________________________________ GS: label
+    @property
+    def label(self):
+        """ The display name of this stage used in the log and profile output. """
+        return self._label
+
 #___________________________________________________________________________________________________ GS: index
     @property
     def index(self):
@@ -62,6 +124,55 @@ class AnalysisStage(object):
         except Exception:
             return -1
 
+#___________________________________________________________________________________________________ GS: dependencies
+    @property
+    def dependencies(self):
+        """ The list of stage keys or output names this stage depends upon, or None if the stage
+            depends on every stage added before it. """
+        return self._dependencies
+
+#___________________________________________________________________________________________________ GS: outputs
+    @property
+    def outputs(self):
+        """ The list of output names this stage produces for other stages. """
+        return self._outputs
+
+#___________________________________________________________________________________________________ GS: canShard
+    @property
+    def canShard(self):
+        """ Whether or not the sitemap traversal of this stage can be split across worker
+            processes, which requires declared accumulators and no traversal callbacks, as
+            callbacks cannot be sent to other processes. """
+
+        return self.SHARD_ACCUMULATORS is not None and not any([
+            self._analyzeCallback, self._sitemapCallback, self._trackwayCallback,
+            self._seriesCallback, self._trackCallback])
+
+#___________________________________________________________________________________________________ GS: canCacheResults
+    @property
+    def canCacheResults(self):
+        """ Whether or not the per-trackway results of this stage can be persisted across runs,
+            which requires a declared code version in addition to the requirements of sharding,
+            as cached results are applied in the same way as shard results. """
+        return self.CACHE_VERSION is not None and self.canShard
+
+#___________________________________________________________________________________________________ GS: resultCache
+    @property
+    def resultCache(self):
+        """ The StageResultCache used by the current or most recent analysis process of this
+            stage, or None if results are not cached. """
+        return self._resultCache
+
+#___________________________________________________________________________________________________ GS: logBuffer
+    @property
+    def logBuffer(self):
+        """ A StageLogBuffer that replaces the owner logger while this stage runs concurrently
+            with other stages, or None when the stage writes to the owner logger directly. """
+        return self._logBuffer
+    @logBuffer.setter
+    def logBuffer(self, value):
+        self._logBuffer = value
+
 #___________________________________________________________________________________________________ GS: cache
     @property
     def cache(self):
@@ -73,8 +184,9 @@ class AnalysisStage(object):
     @property
     def logger(self):
         """ The Logger instance for writing all analysis process information. This logger
-            instance is owned by the AnalyzerBase and shared across stages. """
-        return self.owner.logger
+            instance is owned by the AnalyzerBase and shared across stages. While the stage runs
+            concurrently with other stages, writes are buffered until the stage completes. """
+        return self.owner.logger if self._logBuffer is None else self._logBuffer
 
 #___________________________________________________________________________________________________ GS: plot
     @property
@@ -126,12 +238,137 @@ class AnalysisStage(object):
         """ Executes the analysis process for this stage, which consists largely of calling the
             analysis hook methods in their specified order. """
 
-        self._startTime = TimeUtils.getNowDatetime()
+        profiler = self.owner.profiler
+        if profiler is not None:
+            profiler.beginStage(self)
+
+        self._startTime   = TimeUtils.getNowDatetime()
+        self._resultCache = self.owner.getStageResultCache(self)
         self._writeHeader()
+        self._profile('preAnalyze', self._preAnalyze)
+        self._profile('analyze', self._analyze)
+        self._pruneResultCache()
+        self._profile('postAnalyze', self._postAnalyze)
+
+        if profiler is not None:
+            profiler.endStage(self)
+        self._writeFooter()
+
+#___________________________________________________________________________________________________ resetShard
+    def resetShard(self):
+        """ Prepares this stage to traverse a sitemap within a worker process by running the
+            pre-analysis hook and emptying the accumulators. """
+
+        self._resultCache = self.owner.getStageResultCache(self)
         self._preAnalyze()
-        self._analyze()
-        self._postAnalyze()
+        empty = {self.MERGE_EXTEND:list, self.MERGE_SUM:int, self.MERGE_UPDATE:dict}
+        for name, mode in self.SHARD_ACCUMULATORS.items():
+            if mode == self.MERGE_ROWS:
+                getattr(self, name).rows = []
+            else:
+                setattr(self, name, empty[mode]())
+
+#___________________________________________________________________________________________________ analyzeSitemapShard
+    def analyzeSitemapShard(self, sitemap):
+        """ Traverses the specified sitemap within a worker process. """
+        self._analyzeSitemap(sitemap)
+
+#___________________________________________________________________________________________________ getShardResult
+    def getShardResult(self):
+        """ Returns a picklable dictionary of the accumulator values of this stage. """
+
+        out = dict()
+        for name, mode in self.SHARD_ACCUMULATORS.items():
+            value = getattr(self, name)
+            out[name] = value.rows if mode == self.MERGE_ROWS else value
+        return out
+
+#___________________________________________________________________________________________________ mergeShardResult
+    def mergeShardResult(self, result):
+        """ Merges the accumulator values of a shard result into the accumulators of this
+            stage. """
+
+        for name, mode in self.SHARD_ACCUMULATORS.items():
+            value   = result[name]
+            current = getattr(self, name)
+            if mode == self.MERGE_EXTEND:
+                current.extend(value)
+            elif mode == self.MERGE_SUM:
+                setattr(self, name, current + value)
+            elif mode == self.MERGE_UPDATE:
+                current.update(value)
+            elif mode == self.MERGE_ROWS:
+                current.rows.extend(value)
+            else:
+                raise ValueError('Unknown merge mode "%s" for accumulator "%s"' % (mode, name))
+
+#___________________________________________________________________________________________________ beginFused
+    def beginFused(self):
+        """ Starts the analysis process of this stage as part of a fused traversal, in which the
+            FusedStageGroup descends the hierarchy and calls the hook methods of this stage for
+            each level through visitFused(). Returns whether or not the stage traverses the
+            hierarchy. """
+
+        if self.owner.profiler is not None:
+            self.owner.profiler.beginStage(self)
+
+        self._fused       = True
+        self._busyTime    = 0.0
+        self._startTime   = TimeUtils.getNowDatetime()
+        self._resultCache = self.owner.getStageResultCache(self)
+        self._writeHeader()
+        self._timeFused(self._profile, 'preAnalyze', self._preAnalyze)
+        return not self._analyzeCallback or self._timeFused(self._analyzeCallback, self)
+
+#___________________________________________________________________________________________________ visitFused
+    def visitFused(self, name, *args):
+        """ Calls the hook method of the specified name with the specified arguments during a
+            fused traversal and returns whether or not the hook method descended, which is the
+            case when the base class implementation was reached. """
+
+        self._descend = False
+        self._timeFused(self._profile, name.lstrip('_'), getattr(self, name), *args)
+        return self._descend
+
+#___________________________________________________________________________________________________ endFused
+    def endFused(self):
+        """ Completes the analysis process of this stage after a fused traversal. The footer
+            reports the time spent within this stage instead of the elapsed time of the whole
+            traversal, which is shared with the other stages. """
+
+        self._timeFused(self._pruneResultCache)
+        self._timeFused(self._profile, 'postAnalyze', self._postAnalyze)
+        self._fused = False
+
+        if self.owner.profiler is not None:
+            self.owner.profiler.endStage(self)
         self._writeFooter()
+        self._busyTime = None
+
+#___________________________________________________________________________________________________ loadCachedTrackway
+    def loadCachedTrackway(self, trackway):
+        """ Applies the cached results of the specified trackway to the accumulators of this stage
+            and returns True if the trackway is unchanged since its results were stored.
+            Otherwise the trackway must be analyzed, and its results are stored by a subsequent
+            call to storeCachedTrackway(), and False is returned. """
+
+        self._cacheEntry = None
+        if self._resultCache is None:
+            return False
+        return self._timeFused(self._loadCachedTrackway, trackway)
+
+#___________________________________________________________________________________________________ storeCachedTrackway
+    def storeCachedTrackway(self, trackway):
+        """ Stores the results accumulated since the preceding loadCachedTrackway() call for the
+            specified trackway missed the cache. Returns whether or not results were stored. """
+
+        entry            = self._cacheEntry
+        self._cacheEntry = None
+        if entry is None or entry[0] != trackway.uid:
+            return False
+
+        return self._timeFused(
+            self._resultCache.save, entry[1], self._getAccumulatorDelta(entry[2]))
 
 #___________________________________________________________________________________________________ mergePdfs
     def mergePdfs(self, paths, fileName =None):
@@ -184,8 +421,113 @@ class AnalysisStage(object):
             _analyzeSitemap() method on each one. """
 
         if not self._analyzeCallback or self._analyzeCallback(self):
-            for sitemap in self.owner.getSitemaps():
-                self._analyzeSitemap(sitemap)
+            pool = self.owner.getShardPool() if self.canShard else None
+            if pool is None:
+                for sitemap in self.owner.getSitemaps():
+                    self._profile('analyzeSitemap', self._analyzeSitemap, sitemap)
+                return
+
+            for shard in pool.run(self):
+                StageLogBuffer.replay(self.logger, shard['log'])
+                self.mergeShardResult(shard['result'])
+                self._bindResultEntries(shard['result'])
+                if self._resultCache is not None and shard.get('cache'):
+                    self._resultCache.markUsed(**shard['cache'])
+            self._postMergeShards()
+
+#___________________________________________________________________________________________________ _postMergeShards
+    def _postMergeShards(self):
+        """ A hook method called after the shard results of every sitemap have been merged and
+            the tracks within their entries have been bound to those of the owner. """
+        pass
+
+#___________________________________________________________________________________________________ _bindResultEntries
+    def _bindResultEntries(self, result):
+        """ Binds the track copies within the entries of the extended accumulators of a shard or
+            cached result to the tracks of the owner. """
+
+        if not self.ENTRY_TRACK_FIELDS:
+            return
+
+        for name, mode in self.SHARD_ACCUMULATORS.items():
+            if mode == self.MERGE_EXTEND:
+                self.owner.bindTrackEntries(
+                    result[name], self.ENTRY_TRACK_FIELDS, self.TRACK_CACHE_KEY)
+
+#___________________________________________________________________________________________________ _loadCachedTrackway
+    def _loadCachedTrackway(self, trackway):
+        cache        = self._resultCache
+        key          = cache.createKey(trackway, self.owner.getTrackwaySeries(trackway))
+        found, delta = cache.load(key)
+        if not found:
+            self._cacheEntry = (trackway.uid, key, self._getAccumulatorSnapshot())
+            return False
+
+        self.mergeShardResult(delta)
+        self._bindResultEntries(delta)
+        self._postLoadCachedTrackway(trackway, delta)
+        return True
+
+#___________________________________________________________________________________________________ _postLoadCachedTrackway
+    def _postLoadCachedTrackway(self, trackway, result):
+        """ A hook method called after the cached results of a trackway have been merged into
+            the accumulators and the tracks within their entries have been bound to those of the
+            owner.
+
+            trackway :: Tracks_Trackway
+                The trackway whose results were loaded.
+
+            result :: Dict
+                The cached accumulator values of the trackway. """
+        pass
+
+#___________________________________________________________________________________________________ _getAccumulatorSnapshot
+    def _getAccumulatorSnapshot(self):
+        """ Returns the current state of the accumulators, from which _getAccumulatorDelta()
+            determines the values they have accumulated since. """
+
+        out = dict()
+        for name, mode in self.SHARD_ACCUMULATORS.items():
+            value = getattr(self, name)
+            if mode == self.MERGE_ROWS:
+                out[name] = len(value.rows)
+            elif mode == self.MERGE_EXTEND:
+                out[name] = len(value)
+            elif mode == self.MERGE_UPDATE:
+                out[name] = set(value.keys())
+            else:
+                out[name] = value
+        return out
+
+#___________________________________________________________________________________________________ _getAccumulatorDelta
+    def _getAccumulatorDelta(self, snapshot):
+        """ Returns the values accumulated since the specified snapshot in the form of a shard
+            result, which mergeShardResult() applies to the accumulators. Dictionary accumulators
+            only include the keys added since the snapshot. """
+
+        out = dict()
+        for name, mode in self.SHARD_ACCUMULATORS.items():
+            value = getattr(self, name)
+            start = snapshot[name]
+            if mode == self.MERGE_ROWS:
+                out[name] = value.rows[start:]
+            elif mode == self.MERGE_EXTEND:
+                out[name] = value[start:]
+            elif mode == self.MERGE_UPDATE:
+                out[name] = dict([(k, v) for k, v in value.items() if k not in start])
+            else:
+                out[name] = value - start
+        return out
+
+#___________________________________________________________________________________________________ _pruneResultCache
+    def _pruneResultCache(self):
+        """ Removes the cached results of trackways that no longer exist or have changed once the
+            traversal of every sitemap has completed. Nothing is removed when the owner limits
+            the analysis to a subset of the trackways. """
+
+        cache = self._resultCache
+        if cache is not None and not self.owner.isScoped and (cache.hits or cache.misses):
+            cache.prune()
 
 #___________________________________________________________________________________________________ _analyzeSitemap
     def _analyzeSitemap(self, sitemap):
@@ -198,8 +540,15 @@ class AnalysisStage(object):
         if self._sitemapCallback and not self._sitemapCallback(self, sitemap):
             return
 
+        if self._fused:
+            self._descend = True
+            return
+
         for tw in self.owner.getTrackways(sitemap):
-            self._analyzeTrackway(tw, sitemap)
+            if self.loadCachedTrackway(tw):
+                continue
+            self._profile('analyzeTrackway', self._analyzeTrackway, tw, sitemap)
+            self.storeCachedTrackway(tw)
 
 #___________________________________________________________________________________________________ _analyzeTrackway
     def _analyzeTrackway(self, trackway, sitemap):
@@ -215,9 +564,27 @@ class AnalysisStage(object):
         if self._trackwayCallback and not self._trackwayCallback(self, trackway, sitemap):
             return
 
+        if self._fused:
+            self._descend = True
+            return
+
         for key, series in self.owner.getTrackwaySeries(trackway).items():
             if series.isReady:
-                self._analyzeTrackSeries(series, trackway, sitemap)
+                self._profile(
+                    'analyzeTrackSeries', self._analyzeTrackSeries, series, trackway, sitemap)
+        self._profile('postAnalyzeTrackway', self._postAnalyzeTrackway, trackway, sitemap)
+
+#___________________________________________________________________________________________________ _postAnalyzeTrackway
+    def _postAnalyzeTrackway(self, trackway, sitemap):
+        """ A hook method called after every track series of a trackway has been analyzed by the
+            default _analyzeTrackway() method, in both the standalone and fused traversals.
+
+            trackway :: Tracks_Trackway
+                The trackway instance that was analyzed.
+
+            sitemap :: Tracks_SiteMap
+                The sitemap in which this trackway resides. """
+        pass
 
 #___________________________________________________________________________________________________ _analyzeTrackSeries
     def _analyzeTrackSeries(self, series, trackway, sitemap):
@@ -236,8 +603,12 @@ class AnalysisStage(object):
         if self._seriesCallback and not self._seriesCallback(self, series, trackway, sitemap):
             return
 
+        if self._fused:
+            self._descend = True
+            return
+
         for t in series.tracks:
-            self._analyzeTrack(t, series, trackway, sitemap)
+            self._profile('analyzeTrack', self._analyzeTrack, t, series, trackway, sitemap)
 
 #___________________________________________________________________________________________________ _analyzeTrack
     def _analyzeTrack(self, track, series, trackway, sitemap):
@@ -272,15 +643,57 @@ class AnalysisStage(object):
             about the analysis stage to the log file for reference. This includes basic operational
             information about performance by default. """
 
-        elapsed = TimeUtils.getElapsedTime(
-            startDateTime=self._startTime,
-            endDateTime=TimeUtils.getNowDatetime(),
-            toUnit=TimeUtils.MILLISECONDS)
+        if self._busyTime is not None:
+            elapsed = 1000.0*self._busyTime
+        else:
+            elapsed = TimeUtils.getElapsedTime(
+                startDateTime=self._startTime,
+                endDateTime=TimeUtils.getNowDatetime(),
+                toUnit=TimeUtils.MILLISECONDS)
 
         self.logger.write('\n' + 80*'*')
         self.logger.write('\n'.join([
             '[COMPLETE]: %s ANALYSIS STAGE' % self._label.upper(),
-            'Elapsed Time: %s' % TimeUtils.toPrettyElapsedTime(elapsed)] + self._getFooterArgs()))
+            'Elapsed Time: %s' % TimeUtils.toPrettyElapsedTime(elapsed)]
+            + self._getCacheFooterArgs() + self._getFooterArgs()))
+
+#___________________________________________________________________________________________________ _getCacheFooterArgs
+    def _getCacheFooterArgs(self):
+        """ Returns the footer lines reporting how many trackways were loaded from the result
+            cache instead of being analyzed. """
+
+        cache = self._resultCache
+        if cache is None:
+            return []
+
+        total = cache.hits + cache.misses
+        return ['Result Cache: %s of %s trackways loaded (%s%%)%s' % (
+            cache.hits, total, int(round(100.0*cache.hits/total)) if total else 0,
+            ' [COLD RUN]' if cache.cold else '')]
+
+#___________________________________________________________________________________________________ _timeFused
+    def _timeFused(self, method, *args):
+        """ Calls the specified method and, during a fused traversal, adds its duration to the
+            time spent in this stage. """
+
+        if self._busyTime is None:
+            return method(*args)
+
+        start = time.time()
+        try:
+            return method(*args)
+        finally:
+            self._busyTime += time.time() - start
+
+#___________________________________________________________________________________________________ _profile
+    def _profile(self, level, method, *args):
+        """ Calls the specified hook method and, if the owner is profiling the analysis, adds its
+            measurements to the specified level of this stage in the profile. """
+
+        profiler = self.owner.profiler
+        if profiler is None:
+            return method(*args)
+        return profiler.measure(self, level, method, *args)
 
 #___________________________________________________________________________________________________ _getFooterArgs
     # noinspection PyMethodMayBeStatic
@@ -4,7 +4,9 @@
 
 from __future__ import print_function, absolute_import, unicode_literals, division
 
+import fnmatch
 import os
+import threading
 
 from pyaid.config.ConfigsDict import ConfigsDict
 from pyaid.config.SettingsConfig import SettingsConfig
@@ -16,6 +18,16 @@ from pyaid.time.TimeUtils import TimeUtils
 from pyglass.app.PyGlassEnvironment import PyGlassEnvironment
 PyGlassEnvironment.initializeFromInternalPath(__file__)
 
+from cadence.analysis.FusedStageGroup import FusedStageGroup
+from cadence.analysis.SitemapShardPool import SitemapShardPool
+from cadence.analysis.StageLogBuffer import StageLogBuffer
+from cadence.analysis.StageProfiler import StageProfiler
+from cadence.analysis.StageResultCache import StageResultCache
+from cadence.analysis.StageScheduler import StageScheduler
+from cadence.analysis.TrackRecord import TrackRecord
+from cadence.analysis.TrackSeriesLoader import TrackSeriesLoader
+from cadence.models.SessionFactory import SessionFactory
+from cadence.models.analysis.Analysis_TrackCurve import Analysis_TrackCurve
 from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
 
 try:
@@ -32,6 +44,11 @@ class AnalyzerBase(object):
 #===================================================================================================
 #                                                                                       C L A S S
 
+    # Non-interactive PyPlot backend used while stages run concurrently, because interactive
+    # backends create and draw their figures through a GUI toolkit that only the main thread can
+    # use
+    CONCURRENT_BACKEND = 'Agg'
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, **kwargs):
         """ Creates a new instance of AnalyzerBase.
@@ -41,6 +58,10 @@ class AnalyzerBase(object):
                 specified the analyzer will manage sessions internally (opening and closing them
                 as needed).
 
+            [analysisSession] ~ Session
+                An SqlAlchemy session object into the Cadence analysis database. If no session was
+                specified the analyzer will manage sessions internally.
+
             [cacheData] ~ Object | CacheData
                 A caching object on which to store data during analysis at the analyzer level,
                 instead of the stage level.
@@ -52,9 +73,86 @@ class AnalyzerBase(object):
             [logFolderPath] ~ String
                 If no logger was specified for the analyzer, this is the absolute path to the
                 folder where the log file should be written. This value is ignored if you specify
-                a logger. """
-
-        self._tracksSession = kwargs.get('tracksSession')
+                a logger.
+
+            [readOnly] ~ Boolean
+                If True the tracks within track series are loaded as lightweight, read-only
+                TrackRecord instances instead of database model instances. Stages of read-only
+                analyzers must not modify tracks or query the database through them.
+
+            [maxWorkers] ~ Integer
+                The maximum number of analysis stages that run concurrently in worker threads once
+                the stages they depend upon have completed. Defaults to 1, which runs the stages
+                one at a time. Stages only run concurrently within read-only analyzers that manage
+                their own sessions, in which each worker thread has its own tracks session.
+
+            [shardProcesses] ~ Integer
+                The number of worker processes across which the sitemap traversal of stages that
+                declare their accumulators is split, one sitemap per task. Sharding requires a
+                read-only analyzer and is disabled by default (0).
+
+            [fused] ~ Boolean
+                If True, consecutive fusable stages are executed together with a single walk of
+                the sitemap hierarchy instead of one walk per stage. Fused stages traverse within
+                the analyzer process and are not sharded.
+
+            [cacheResults] ~ Boolean
+                If True, stages that declare a cache version persist the results of each trackway
+                across runs of a read-only analyzer and only analyze the trackways whose tracks
+                have changed since the previous run. Disabled by default (False).
+
+            [coldRun] ~ Boolean
+                If True, cached stage results are ignored and every trackway is analyzed, while
+                the new results are still stored for the next run.
+
+            [profile] ~ Boolean
+                If True the stages are profiled while they run. The profile is written as a JSON
+                file in the output folder of the analyzer and summarized in the log.
+
+            [stages] ~ [String]
+                The keys of the stages to run. The stages they depend upon are run as well, and
+                every other stage is skipped. All stages are run if not specified.
+
+            [sites] ~ [String]
+                Limits the analysis to the sitemaps of the specified site names, e.g. 'BEB'.
+
+            [levels] ~ [String]
+                Limits the analysis to the sitemaps of the specified levels, e.g. '515'.
+
+            [sitemapIndexes] ~ [Integer]
+                Limits the analysis to the sitemaps with the specified indexes.
+
+            [trackways] ~ [String]
+                Limits the analysis to the trackways whose names, e.g. 'BEB-515-2009-1-S-21',
+                match one of the specified shell-style patterns, e.g. '*-S-21'.
+
+            [outputPath] ~ String
+                The root folder where analyses are stored, which replaces the OUTPUT_PATH setting
+                for this analyzer. """
+
+        self._tracksSession   = kwargs.get('tracksSession')
+        self._ownsTracks      = self._tracksSession is None
+        self._threadSessions  = dict()
+        self._analysisSession = kwargs.get('analysisSession')
+        self._ownsAnalysis    = self._analysisSession is None
+        self._readOnly        = kwargs.get('readOnly', False)
+        self._maxWorkers      = kwargs.get('maxWorkers', 1)
+        self._shardProcesses  = kwargs.get('shardProcesses', 0)
+        self._fused           = kwargs.get('fused', False)
+        self._cacheResults    = kwargs.get('cacheResults', False)
+        self._coldRun         = kwargs.get('coldRun', False)
+        self._profiler        = StageProfiler(self) if kwargs.get('profile') else None
+        self._stageKeys       = kwargs.get('stages')
+        self._outputPath      = kwargs.get('outputPath')
+
+        self._sites           = kwargs.get('sites')
+        self._levels          = kwargs.get('levels')
+        self._sitemapIndexes  = kwargs.get('sitemapIndexes')
+        self._trackwayNames   = kwargs.get('trackways')
+        self._shardPool       = None
+        self._trackLookup     = None
+        self._loadedTracks    = dict()
+        self._pendingBindings = dict()
 
         self._cache         = ConfigsDict(kwargs.get('cacheData'))
         self._logger        = kwargs.get('logger')
@@ -65,6 +163,14 @@ class AnalyzerBase(object):
         self._trackSeries   = dict()
         self._plotFigures   = dict()
         self._currentStage  = None
+        self._figureThreads = dict()
+
+        # Serializes access to the tracks session and loaded data by concurrent stages
+        self._dataLock      = threading.RLock()
+
+        # Held by a thread from the creation of a managed figure until it is closed, because the
+        # PyPlot state machine cannot be used by more than one thread at a time
+        self._figureLock    = threading.RLock()
 
         if not self._logger:
             self._logger = Logger(
@@ -80,9 +186,38 @@ class AnalyzerBase(object):
         self._settings = SettingsConfig(
             FileUtils.makeFilePath(self._defaultRootPath, 'analysis.json'), pretty=True)
 
+        for stage in self.createStages(self):
+            self.addStage(stage)
+
 #===================================================================================================
 #                                                                                   G E T / S E T
 
+#___________________________________________________________________________________________________ GS: readOnly
+    @property
+    def readOnly(self):
+        """ Specifies whether or not tracks are loaded as read-only TrackRecord instances. """
+        return self._readOnly
+
+#___________________________________________________________________________________________________ GS: profiler
+    @property
+    def profiler(self):
+        """ The StageProfiler that records the performance of the stages, or None if the analysis
+            is not profiled. """
+        return self._profiler
+
+#___________________________________________________________________________________________________ GS: profilePath
+    @property
+    def profilePath(self):
+        """ The path of the JSON profile file written by profiled runs. """
+        return self.getPath('%s-Profile.json' % self.__class__.__name__, isFile=True)
+
+#___________________________________________________________________________________________________ GS: isScoped
+    @property
+    def isScoped(self):
+        """ Specifies whether or not the analysis is limited to a subset of the sitemaps or
+            trackways, in which case results of the excluded data must be left untouched. """
+        return any([self._sites, self._levels, self._sitemapIndexes, self._trackwayNames])
+
 #___________________________________________________________________________________________________ GS: plotFigures
     @property
     def plotFigures(self):
@@ -120,6 +255,8 @@ class AnalyzerBase(object):
         """ The root folder path where all analyses are stored. This is a top-level directory that
             should not be accessed directly unless absolutely necessary. In most cases you should
             use the outputPath property instead. """
+        if self._outputPath:
+            return self._outputPath
         return self._settings.fetch('OUTPUT_PATH', self._defaultRootPath)
 
 #___________________________________________________________________________________________________ GS: outputRootPath
@@ -130,6 +267,14 @@ class AnalyzerBase(object):
             to this analyzer. """
         return FileUtils.makeFolderPath(self.analysisRootPath, self.__class__.__name__)
 
+#___________________________________________________________________________________________________ GS: cachePath
+    @property
+    def cachePath(self):
+        """ The root folder path where the persistent stage results of this Analyzer are stored,
+            which is within the analysisRootPath. Unlike the temporary path, this folder is kept
+            between runs. """
+        return FileUtils.makeFolderPath(self.analysisRootPath, 'cache', self.__class__.__name__)
+
 #___________________________________________________________________________________________________ GS: tempPath
     @property
     def tempPath(self):
@@ -146,6 +291,19 @@ class AnalyzerBase(object):
 #===================================================================================================
 #                                                                                     P U B L I C
 
+#___________________________________________________________________________________________________ createStages
+    @classmethod
+    def createStages(cls, owner =None):
+        """ Returns a list of new instances of the stages that make up the analysis process of
+            this analyzer class, in the order in which they are added to each analyzer when it is
+            created. Analyzers override this instead of adding their stages in the constructor,
+            which allows the stages to be listed without creating an analyzer.
+
+            [owner] :: AnalyzerBase :: None
+                The analyzer that owns the created stages, which can be None if the stages are
+                only inspected. """
+        return []
+
 #___________________________________________________________________________________________________ getStage
     def getStage(self, key):
         """ Returns the analysis stage associated with the specified key or None if no such stage
@@ -155,6 +313,29 @@ class AnalyzerBase(object):
                 return stage
         return None
 
+#___________________________________________________________________________________________________ resolveStages
+    def resolveStages(self, keys):
+        """ Returns the list of the stages with the specified keys and of every stage they depend
+            upon, directly or indirectly, in declaration order. Raises a ValueError if a key does
+            not match any stage. """
+
+        scheduler = StageScheduler(self._stages)
+        required  = set()
+        pending   = []
+        for key in keys:
+            stage = self.getStage(key)
+            if stage is None:
+                raise ValueError('Unknown stage "%s" in %s' % (key, self.__class__.__name__))
+            pending.append(stage)
+
+        while pending:
+            stage = pending.pop()
+            if stage not in required:
+                required.add(stage)
+                pending.extend(scheduler.getDependencies(stage))
+
+        return [stage for stage in self._stages if stage in required]
+
 #___________________________________________________________________________________________________ addStage
     def addStage(self, stage):
         """ Appends the specified stage to this instances stage list if it is not already in the
@@ -208,9 +389,14 @@ class AnalyzerBase(object):
         return FileUtils.createPath(self.tempPath, *args, **kwargs)
 
 #___________________________________________________________________________________________________ run
-    def run(self):
-        """ Executes the analysis process, iterating through each of the analysis stages before
-            cleaning up and exiting. """
+    def run(self, stages =None):
+        """ Executes the analysis process, running each of the analysis stages after the stages
+            they depend upon before cleaning up and exiting.
+
+            [stages] :: [AnalysisStage] :: None
+                The stages to run, as returned by resolveStages(). If not specified, the stages
+                selected by the stages constructor argument are resolved, or every stage is run
+                if there is no selection. """
 
         print('[OUTPUT PATH]: %s' % self.analysisRootPath)
 
@@ -226,27 +412,61 @@ class AnalyzerBase(object):
         if not self.logger.loggingPath:
             self.logger.loggingPath = myRootPath
 
+        if self._profiler is not None:
+            self._profiler.start()
+
+        scheduler = None
         try:
             self._preAnalyze()
-            for stage in self._stages:
-                print('#--- RUNNING STAGE "%s" ---#' % stage.key)
-                self._currentStage = stage
-                stage.analyze()
+            if stages is None:
+                stages = self.resolveStages(self._stageKeys) if self._stageKeys else self._stages
+            stages    = self._createFusedGroups(stages) if self._fused else stages
+            scheduler = StageScheduler(stages, maxWorkers=self._getMaxWorkers())
+            if scheduler.isConcurrent:
+                self._useConcurrentBackend()
+                self._preloadData()
+            scheduler.run(self._runStageBuffered if scheduler.isConcurrent else self._runStage)
             self._currentStage = None
             self._postAnalyze()
         except Exception as err:
+            if scheduler and scheduler.failedStage:
+                self._currentStage = scheduler.failedStage
             self.logger.writeError([
                 '[ERROR]: Failed to execute analysis',
                 'STAGE: %s' % self._currentStage], err)
 
+        if self._shardPool:
+            self._shardPool.close()
+            self._shardPool = None
+
+        if self._profiler is not None:
+            self._profiler.stop()
+            self._writeProfile()
+
         self._cleanup()
+        if self._ownsTracks:
+            self.closeTracksSession()
+        if self._ownsAnalysis:
+            self.closeAnalysisSession()
         SystemUtils.remove(tempPath)
 
 #___________________________________________________________________________________________________ createFigure
     def createFigure(self, key, subplotX =1, subPlotY =1, **kwargs):
-        """ A convenience method for creating a PyPlot figure that is managed by this analyzer. """
-        result = plt.subplots(subplotX, subPlotY, **kwargs)
-        self._plotFigures[key] = plt.gcf()
+        """ A convenience method for creating a PyPlot figure that is managed by this analyzer.
+            While stages run concurrently, figures are created with the non-interactive
+            CONCURRENT_BACKEND and the thread that creates a figure has exclusive use of PyPlot
+            until the figure is closed. """
+
+        self._figureLock.acquire()
+        self.closeFigure(key)
+        try:
+            result = self._renderFigure(plt.subplots, subplotX, subPlotY, **kwargs)
+        except Exception:
+            self._figureLock.release()
+            raise
+
+        self._plotFigures[key]   = plt.gcf()
+        self._figureThreads[key] = threading.current_thread().ident
         return result[0]
 
 #___________________________________________________________________________________________________ getFigure
@@ -267,6 +487,8 @@ class AnalyzerBase(object):
         figure = self._plotFigures[key]
         plt.close(figure)
         del self._plotFigures[key]
+        if self._figureThreads.pop(key, None) == threading.current_thread().ident:
+            self._figureLock.release()
 
 #___________________________________________________________________________________________________ savePlotFile
     def saveFigure(self, key, path =None, close =True, **kwargs):
@@ -299,7 +521,7 @@ class AnalyzerBase(object):
         if 'orientation' not in kwargs:
             kwargs['orientation'] = 'landscape'
 
-        figure.savefig(path, **kwargs)
+        self._renderFigure(figure.savefig, path, **kwargs)
         if close:
             self.closeFigure(key)
         return path
@@ -308,59 +530,214 @@ class AnalyzerBase(object):
     def getTracksSession(self):
         """ Returns a managed session to the tracks database. Used for shared session access across
             analysis stages, which is used to increase performance by eliminating the overhead in
-            loading large segments of the database multiple times. """
-        if self._tracksSession is None:
-            self._tracksSession = Tracks_SiteMap.createSession()
-        return self._tracksSession
+            loading large segments of the database multiple times. Managed sessions are the
+            read-only shared sessions of the SessionFactory, which do not block other processes,
+            e.g. a UI export, from accessing the database while the analysis runs. Sessions and
+            their SQLite connections cannot be used by more than one thread, so each thread is
+            given its own managed session. """
+
+        if not self._ownsTracks:
+            return self._tracksSession
+
+        ident = threading.current_thread().ident
+        with self._dataLock:
+            session = self._threadSessions.get(ident)
+            if session is None:
+                session = SessionFactory.getSharedSession(Tracks_SiteMap)
+                self._threadSessions[ident] = session
+            return session
 
 #___________________________________________________________________________________________________ closeTracksSession
     def closeTracksSession(self, commit =False):
-        """ Closes the shared track database session. By default no commit is made because the
+        """ Closes the shared track database sessions. By default no commit is made because the
             analyzers should not be writing to the tracks database. """
-        if not self._tracksSession:
+
+        if not self._ownsTracks:
+            if self._tracksSession and commit:
+                self._tracksSession.commit()
+            return
+
+        with self._dataLock:
+            sessions             = list(self._threadSessions.values())
+            self._threadSessions = dict()
+
+        for session in sessions:
+            if commit:
+                session.commit()
+            SessionFactory.releaseSharedSession(session)
+
+#___________________________________________________________________________________________________ getAnalysisSession
+    def getAnalysisSession(self):
+        """ Returns a managed session to the analysis database, which is created with the tuned
+            connection settings of the SessionFactory. Unlike the tracks session, analysis
+            sessions can be written to by the stages. """
+        if self._analysisSession is None:
+            self._analysisSession = SessionFactory.createSession(Analysis_TrackCurve)
+        return self._analysisSession
+
+#___________________________________________________________________________________________________ closeAnalysisSession
+    def closeAnalysisSession(self, commit =True):
+        """ Closes the analysis database session, committing any changes made by the stages
+            unless commit is False. """
+        if not self._analysisSession:
             return
 
         if commit:
-            self._tracksSession.commit()
-        self._tracksSession.close()
-        self._tracksSession = None
+            self._analysisSession.commit()
+        else:
+            self._analysisSession.rollback()
+        self._analysisSession.close()
+        self._analysisSession = None
 
 #___________________________________________________________________________________________________ getSitemaps
     def getSitemaps(self):
         """ Retrieves a list of sitemap model instances from the tracks database for use in
             analysis. These sitemaps are cached for the remainder of the analysis process for
-            data persistence and performance reasons. """
+            data persistence and performance reasons. The trackways of every sitemap are eagerly
+            loaded by the same call, while their tracks are left to the TrackSeriesLoader. """
 
-        if not self._sitemaps:
-            model   = Tracks_SiteMap.MASTER
-            session = self.getTracksSession()
-            self._sitemaps = session.query(model).all()
+        with self._dataLock:
+            if not self._sitemaps:
+                model   = Tracks_SiteMap.MASTER
+                session = self.getTracksSession()
+                options = model.getHierarchyOptions(includeTracks=False)
+                sitemaps = session.query(model).options(*options).all()
+                self._sitemaps = [sm for sm in sitemaps if self._isSitemapInScope(sm)]
 
-        return self._sitemaps
+            return self._sitemaps
 
 #___________________________________________________________________________________________________ getTrackways
     def getTrackways(self, sitemap):
         """ Retrieves a list of trackway model instances for the specified sitemap. These trackways
-            are cached for data persistence and performance reasons. """
+            are cached for data persistence and performance reasons and are read from the
+            sitemap trackways relationship, which is eagerly loaded by getSitemaps(). """
 
-        if sitemap.uid in self._trackways:
-            return self._trackways[sitemap.uid]
+        with self._dataLock:
+            if sitemap.uid in self._trackways:
+                return self._trackways[sitemap.uid]
 
-        trackways = sitemap.getTrackways()
-        self._trackways[sitemap.uid] = trackways
-        return trackways
+            trackways = sitemap.getTrackways()
+            if self._trackwayNames:
+                trackways = [tw for tw in trackways if any(
+                    fnmatch.fnmatchcase(tw.name or '', name) for name in self._trackwayNames)]
+            self._trackways[sitemap.uid] = trackways
+            return trackways
 
 #___________________________________________________________________________________________________ getTrackwaySeries
     def getTrackwaySeries(self, trackway):
         """ Retrieves a list of TrackSeries instances for the specified trackway. These series are
-            cached for data persistence and performance reasons. """
+            cached for data persistence and performance reasons. The first request for a trackway
+            bulk loads the series of every trackway within the same sitemap, which replaces one
+            query per track with a single query for the entire sitemap. """
+
+        with self._dataLock:
+            if trackway.uid in self._trackSeries:
+                return self._trackSeries[trackway.uid]
+
+            loader  = TrackSeriesLoader(
+                self.getTracksSession(), logger=self.logger, readOnly=self.readOnly)
+            sitemap = trackway.sitemap
+            if sitemap:
+                self._addTrackSeries(loader.loadSitemap(sitemap, self.getTrackways(sitemap)))
+
+            if trackway.uid not in self._trackSeries:
+                self._addTrackSeries(loader.loadTrackways([trackway]))
 
-        if trackway.uid in self._trackSeries:
             return self._trackSeries[trackway.uid]
 
-        series = trackway.getTrackSeries()
-        self._trackSeries[trackway.uid] = series
-        return series
+#___________________________________________________________________________________________________ bindTrackEntries
+    def bindTrackEntries(self, entries, fields, cacheKey =None):
+        """ Replaces the track copies within the specified result entries, e.g. entries created
+            by worker processes or loaded from the result cache, with the tracks of this analyzer
+            that have the same uid. Tracks whose series have not been loaded yet are bound when
+            their series are loaded, so binding never loads track series by itself.
+
+            entries :: [Dict]
+                The result entries to bind.
+
+            fields :: [String]
+                The keys of the entry values that are tracks. The entry is stored in the cache of
+                the track of the first field.
+
+            [cacheKey] :: String :: None
+                The key under which each entry is stored in the cache of its track, if any. """
+
+        with self._dataLock:
+            for entry in entries:
+                for index, field in enumerate(fields):
+                    track = entry.get(field)
+                    if track is None:
+                        continue
+
+                    binding = (entry, field, cacheKey if index == 0 else None)
+                    loaded  = self._loadedTracks.get(track.uid)
+                    if loaded is None:
+                        self._pendingBindings.setdefault(track.uid, []).append(binding)
+                    else:
+                        self._bindTrack(loaded, binding)
+
+#___________________________________________________________________________________________________ getTrackLookup
+    def getTrackLookup(self):
+        """ Returns a dictionary of every track within the loaded track series keyed by uid,
+            loading the series of all sitemaps as needed. Used to reattach the results created
+            by worker processes to the tracks of this analyzer. """
+
+        with self._dataLock:
+            if self._trackLookup is None:
+                lookup = dict()
+                for sitemap in self.getSitemaps():
+                    for trackway in self.getTrackways(sitemap):
+                        for series in self.getTrackwaySeries(trackway).values():
+                            for track in series.tracks:
+                                lookup[track.uid] = track
+                self._trackLookup = lookup
+            return self._trackLookup
+
+#___________________________________________________________________________________________________ getShardPool
+    def getShardPool(self):
+        """ Returns the SitemapShardPool used to split stage traversals across worker processes,
+            or None if sharding is disabled for this analyzer. """
+
+        if self._shardProcesses < 2 or not self.readOnly:
+            return None
+
+        with self._dataLock:
+            if self._shardPool is None:
+                self._shardPool = SitemapShardPool(self, self._shardProcesses)
+            return self._shardPool
+
+#___________________________________________________________________________________________________ getShardArguments
+    def getShardArguments(self):
+        """ Returns the picklable keyword arguments with which worker processes create their own
+            instance of this analyzer, which share the scope and output path, and therefore the
+            result cache, of this analyzer. Worker analyzers neither shard nor run stages
+            concurrently. Analyzers with additional constructor arguments should extend these. """
+        return dict(
+            readOnly=self.readOnly,
+            outputPath=self._outputPath,
+            maxWorkers=1,
+            shardProcesses=0,
+            cacheResults=self._cacheResults,
+            coldRun=self._coldRun,
+            sites=self._sites,
+            levels=self._levels,
+            sitemapIndexes=self._sitemapIndexes,
+            trackways=self._trackwayNames)
+
+#___________________________________________________________________________________________________ getStageResultCache
+    def getStageResultCache(self, stage):
+        """ Returns a new StageResultCache for the per-trackway results of the specified stage, or
+            None if results are not cached for the stage. Caching requires a read-only analyzer,
+            where the tracks within results are picklable TrackRecord instances. """
+
+        if not self._cacheResults or not self.readOnly or not stage.canCacheResults:
+            return None
+
+        return StageResultCache(
+            path=FileUtils.makeFolderPath(self.cachePath, stage.key),
+            stage=stage,
+            columns=stage.CACHE_COLUMNS or TrackRecord.COLUMNS,
+            cold=self._coldRun)
 
 #===================================================================================================
 #                                                                               P R O T E C T E D
@@ -380,6 +757,164 @@ class AnalyzerBase(object):
             the cleanup process. """
         pass
 
+#___________________________________________________________________________________________________ _addTrackSeries
+    def _addTrackSeries(self, trackSeries):
+        """ Adds the specified dictionary of loaded track series keyed by trackway uid and binds
+            the result entries that are waiting for their tracks. """
+
+        self._trackSeries.update(trackSeries)
+        for seriesDict in trackSeries.values():
+            for series in seriesDict.values():
+                for track in series.tracks:
+                    self._loadedTracks[track.uid] = track
+                    for binding in self._pendingBindings.pop(track.uid, []):
+                        self._bindTrack(track, binding)
+
+#___________________________________________________________________________________________________ _bindTrack
+    @classmethod
+    def _bindTrack(cls, track, binding):
+        entry, field, cacheKey = binding
+        entry[field] = track
+        if cacheKey:
+            track.cache.set(cacheKey, entry)
+
+#___________________________________________________________________________________________________ _isSitemapInScope
+    def _isSitemapInScope(self, sitemap):
+        """ Returns whether or not the specified sitemap matches the site, level and index
+            limits of this analyzer. """
+
+        if self._sites and (sitemap.name or '').upper() not in [
+                s.upper() for s in self._sites]:
+            return False
+        if self._levels and (sitemap.level or '') not in self._levels:
+            return False
+        if self._sitemapIndexes and sitemap.index not in self._sitemapIndexes:
+            return False
+        return True
+
+#___________________________________________________________________________________________________ _runStage
+    def _runStage(self, stage):
+        """ Executes the analysis process of the specified stage. """
+
+        print('#--- RUNNING STAGE "%s" ---#' % stage.key)
+        self._currentStage = stage
+        stage.analyze()
+
+#___________________________________________________________________________________________________ _runStageBuffered
+    def _runStageBuffered(self, stage):
+        """ Executes the analysis process of the specified stage on a worker thread while other
+            stages run concurrently. The log output of the stage is buffered and written as a
+            single section when the stage completes, and figures left open by a failing stage
+            are closed so that PyPlot is released for the other stages. """
+
+        stage.logBuffer = StageLogBuffer(self.logger)
+        try:
+            self._runStage(stage)
+        finally:
+            buffer = stage.logBuffer
+            stage.logBuffer = None
+            buffer.flush()
+            self._closeThreadFigures()
+            self._releaseThreadSession()
+
+#___________________________________________________________________________________________________ _getMaxWorkers
+    def _getMaxWorkers(self):
+        """ Returns the number of stages that can run concurrently. Only read-only analyzers that
+            manage their own sessions run stages concurrently, because the model instances loaded
+            by other analyzers, and sessions specified by the caller, are bound to the session of
+            a single thread. """
+
+        if not self.readOnly or not self._ownsTracks:
+            return 1
+        return self._maxWorkers
+
+#___________________________________________________________________________________________________ _useConcurrentBackend
+    @classmethod
+    def _useConcurrentBackend(cls):
+        """ Switches PyPlot to the CONCURRENT_BACKEND, if it is not already used, before stages
+            are dispatched to worker threads. Analyzers only save their figures to files, so
+            the backend is kept for the remainder of the process. """
+
+        if plt is None:
+            return
+        if plt.get_backend().lower() != cls.CONCURRENT_BACKEND.lower():
+            plt.switch_backend(cls.CONCURRENT_BACKEND)
+
+#___________________________________________________________________________________________________ _preloadData
+    def _preloadData(self):
+        """ Loads the sitemaps, trackways and track series of the analysis on the calling thread
+            before stages are dispatched to worker threads, so that the model instances shared by
+            the stages are never lazily loaded through the session of another thread. """
+        self.getTrackLookup()
+
+#___________________________________________________________________________________________________ _releaseThreadSession
+    def _releaseThreadSession(self):
+        """ Releases the managed tracks session of the current thread, which must happen on the
+            thread that used it because SQLite connections cannot be closed by other threads. """
+
+        if not self._ownsTracks:
+            return
+
+        with self._dataLock:
+            session = self._threadSessions.pop(threading.current_thread().ident, None)
+        if session is not None:
+            SessionFactory.releaseSharedSession(session)
+
+#___________________________________________________________________________________________________ _createFusedGroups
+    def _createFusedGroups(self, stages):
+        """ Returns the list of the specified stages to schedule in fused mode, in which runs of
+            consecutive stages that can be fused are replaced by a FusedStageGroup. """
+
+        out   = []
+        group = []
+        for stage in StageScheduler(stages).order:
+            if FusedStageGroup.canJoin(stage, group):
+                group.append(stage)
+                continue
+
+            if group:
+                out.append(group[0] if len(group) == 1 else FusedStageGroup(self, group))
+            group = [stage] if stage.FUSABLE else []
+            if not group:
+                out.append(stage)
+
+        if group:
+            out.append(group[0] if len(group) == 1 else FusedStageGroup(self, group))
+        return out
+
+#___________________________________________________________________________________________________ _renderFigure
+    def _renderFigure(self, method, *args, **kwargs):
+        """ Calls the specified PyPlot method, whose duration is added to the figure time of the
+            running stage when the analysis is profiled. """
+
+        if self._profiler is None:
+            return method(*args, **kwargs)
+        return self._profiler.measureFigure(method, *args, **kwargs)
+
+#___________________________________________________________________________________________________ _writeProfile
+    def _writeProfile(self):
+        """ Writes the profile of the completed run to the profile file and its summary table to
+            the log. """
+
+        path = self.profilePath
+        if not self._profiler.save(path):
+            self.logger.write('[ERROR]: Failed to save profile file %s' % path)
+            path = None
+
+        self.logger.write('\n' + 80*'*')
+        self.logger.write('\n'.join(
+            ['[PROFILE]: %s' % (path if path else self.__class__.__name__)]
+            + self._profiler.getSummary()))
+
+#___________________________________________________________________________________________________ _closeThreadFigures
+    def _closeThreadFigures(self):
+        """ Closes the managed figures that were created by the current thread. """
+
+        ident = threading.current_thread().ident
+        for key, owner in list(self._figureThreads.items()):
+            if owner == ident:
+                self.closeFigure(key)
+
 #___________________________________________________________________________________________________ _cleanup
     def _cleanup(self):
         """ A hook method called in the final stages of the run() method after all analysis is
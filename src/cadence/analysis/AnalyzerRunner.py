@@ -0,0 +1,241 @@
+# AnalyzerRunner.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import argparse
+import importlib
+import inspect
+import multiprocessing
+import os
+import pkgutil
+import sys
+from collections import OrderedDict
+
+#*************************************************************************************************** AnalyzerRunner
+class AnalyzerRunner(object):
+    """ The command line entry point for running any of the Cadence analyzers. Analyzers are
+        discovered within the cadence.analysis package, and a run can be limited to selected
+        stages, together with the stages they depend upon, and to a subset of the sitemaps and
+        trackways. For example:
+
+            python AnalyzerRunner.py ValidationAnalyzer --stage paceLength --site BEB --level 515
+
+        Run with --help for the complete list of options, or with --list to show the available
+        analyzers and their stages. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Module name suffix of the analyzer modules within the cadence.analysis subpackages
+    MODULE_SUFFIX = 'Analyzer'
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ discover
+    @classmethod
+    def discover(cls):
+        """ Returns an ordered dictionary of the analyzer classes within the subpackages of the
+            cadence.analysis package keyed by class name. Only the analyzer modules themselves
+            are imported. """
+
+        from cadence.analysis.AnalyzerBase import AnalyzerBase
+        import cadence.analysis as analysis
+
+        out    = OrderedDict()
+        prefix = analysis.__name__ + '.'
+        for loader, name, isPackage in sorted(
+                pkgutil.walk_packages(analysis.__path__, prefix), key=lambda x: x[1]):
+            if isPackage or not name.rsplit('.', 1)[-1].endswith(cls.MODULE_SUFFIX):
+                continue
+
+            module = importlib.import_module(name)
+            for attr, value in inspect.getmembers(module, inspect.isclass):
+                if value.__module__ == module.__name__ and issubclass(value, AnalyzerBase):
+                    out[attr] = value
+
+        return out
+
+#___________________________________________________________________________________________________ createParser
+    @classmethod
+    def createParser(cls):
+        """ Returns the ArgumentParser for the command line arguments of the runner. """
+
+        parser = argparse.ArgumentParser(
+            description='Runs a Cadence analyzer, optionally limited to selected stages and to a '
+                        'subset of the sitemaps and trackways.')
+        parser.add_argument(
+            'analyzer', nargs='?',
+            help='Class name of the analyzer to run, e.g. ValidationAnalyzer')
+        parser.add_argument(
+            '-l', '--list', action='store_true',
+            help='List the available analyzers and their stages, then exit')
+
+        group = parser.add_argument_group('stage selection')
+        group.add_argument(
+            '-s', '--stage', dest='stages', action='append', metavar='KEY',
+            help='Key of a stage to run, together with the stages it depends upon. Can be '
+                 'repeated. Runs every stage if not specified.')
+
+        group = parser.add_argument_group('scope')
+        group.add_argument(
+            '--site', dest='sites', action='append', metavar='NAME',
+            help='Only analyze the sitemaps of this site, e.g. BEB. Can be repeated.')
+        group.add_argument(
+            '--level', dest='levels', action='append', metavar='LEVEL',
+            help='Only analyze the sitemaps of this level, e.g. 515. Can be repeated.')
+        group.add_argument(
+            '--sitemap', dest='sitemapIndexes', action='append', type=int, metavar='INDEX',
+            help='Only analyze the sitemap with this index. Can be repeated.')
+        group.add_argument(
+            '--trackway', dest='trackways', action='append', metavar='PATTERN',
+            help='Only analyze the trackways whose names match this shell-style pattern, e.g. '
+                 '"*-S-21". Can be repeated.')
+
+        group = parser.add_argument_group('output')
+        group.add_argument(
+            '-o', '--output', dest='outputPath', metavar='PATH',
+            help='Root folder in which the analysis output is written')
+        group.add_argument(
+            '--profile', action='store_true',
+            help='Profile the stages and write a JSON profile to the output folder')
+        group.add_argument(
+            '--compare-profile', dest='compareProfile', metavar='PATH',
+            help='Compare the profile of this run with the specified profile file and exit with '
+                 'status 1 if a regression is found. Implies --profile.')
+
+        group = parser.add_argument_group('caching')
+        group.add_argument(
+            '--cache', dest='cacheResults', action='store_true', default=None,
+            help='Load and store the per-trackway results of cacheable stages in the output '
+                 'folder. Requires a read-only analyzer.')
+        group.add_argument(
+            '--cold', dest='coldRun', action='store_true', default=None,
+            help='Ignore cached stage results and store the recomputed results. Implies --cache.')
+
+        group = parser.add_argument_group('parallelism')
+        group.add_argument(
+            '-w', '--workers', dest='maxWorkers', type=int, metavar='COUNT',
+            help='Number of stages that run concurrently in worker threads')
+        group.add_argument(
+            '-p', '--processes', dest='shardProcesses', type=int, metavar='COUNT',
+            help='Number of worker processes across which sitemaps are sharded, where 0 uses '
+                 'one process per CPU. Requires a read-only analyzer.')
+        group.add_argument(
+            '--fused', action='store_true', default=None,
+            help='Execute consecutive fusable stages with a single traversal')
+        group.add_argument(
+            '--read-only', dest='readOnly', action='store_true', default=None,
+            help='Load tracks as read-only records, which is required for sharding and caching')
+
+        return parser
+
+#___________________________________________________________________________________________________ getAnalyzerArguments
+    @classmethod
+    def getAnalyzerArguments(cls, options):
+        """ Returns the keyword arguments of the analyzer constructor for the parsed command line
+            options. Options that were not specified are omitted so that the defaults of each
+            analyzer apply. The selected stages are not included, as they are resolved by run()
+            and passed to the run of the analyzer. """
+
+        out = dict()
+        for name in (
+                'sites', 'levels', 'sitemapIndexes', 'trackways', 'outputPath', 'cacheResults',
+                'coldRun', 'maxWorkers', 'shardProcesses', 'fused', 'readOnly'):
+            value = getattr(options, name)
+            if value is not None:
+                out[name] = value
+
+        if options.outputPath:
+            out['outputPath'] = os.path.abspath(options.outputPath)
+        if options.shardProcesses == 0:
+            out['shardProcesses'] = multiprocessing.cpu_count()
+        if options.coldRun:
+            out['cacheResults'] = True
+        if options.profile or options.compareProfile:
+            out['profile'] = True
+        return out
+
+#___________________________________________________________________________________________________ run
+    @classmethod
+    def run(cls, args =None):
+        """ Parses the specified command line arguments, or those of the process if None, and
+            runs the selected analyzer. Returns the exit status of the command. """
+
+        parser  = cls.createParser()
+        options = parser.parse_args(args)
+
+        analyzers = cls.discover()
+        if options.list:
+            for line in cls._getListing(analyzers):
+                print(line)
+            return 0
+
+        if not options.analyzer:
+            parser.error('An analyzer must be specified. Use --list to show the analyzers.')
+
+        analyzerClass = cls._findAnalyzer(analyzers, options.analyzer)
+        if analyzerClass is None:
+            parser.error('Unknown analyzer "%s". Available analyzers: %s' % (
+                options.analyzer, ', '.join(analyzers.keys())))
+
+        analyzer = analyzerClass(**cls.getAnalyzerArguments(options))
+        stages   = None
+        if options.stages:
+            try:
+                stages = analyzer.resolveStages(options.stages)
+            except ValueError as err:
+                parser.error('%s. Available stages: %s' % (
+                    err, ', '.join([stage.key for stage in analyzer.stages])))
+            print('[STAGES]: %s' % ', '.join([stage.key for stage in stages]))
+
+        analyzer.run(stages)
+
+        if not options.compareProfile:
+            return 0
+
+        from cadence.analysis.StageProfiler import StageProfiler
+        lines, regressed = StageProfiler.compare(options.compareProfile, analyzer.profilePath)
+        print('\n'.join(lines))
+        return 1 if regressed else 0
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _findAnalyzer
+    @classmethod
+    def _findAnalyzer(cls, analyzers, name):
+        """ Returns the analyzer class of the specified name, which is not case sensitive and can
+            omit the Analyzer suffix, or None if no such analyzer exists. """
+
+        name = name.lower()
+        for key, analyzerClass in analyzers.items():
+            if name in (key.lower(), key.lower()[:-len(cls.MODULE_SUFFIX)]):
+                return analyzerClass
+        return None
+
+#___________________________________________________________________________________________________ _getListing
+    @classmethod
+    def _getListing(cls, analyzers):
+        """ Returns the lines listing the specified analyzers and the keys and dependencies of
+            their stages, which are created without an owning analyzer. """
+
+        out = []
+        for name, analyzerClass in analyzers.items():
+            out.append(name)
+            for stage in analyzerClass.createStages():
+                if stage.dependencies is None:
+                    requires = 'all previous stages'
+                else:
+                    requires = ', '.join(stage.dependencies) if stage.dependencies else 'none'
+                out.append('    %-24s %s (requires: %s)' % (stage.key, stage.label, requires))
+        return out
+
+####################################################################################################
+####################################################################################################
+
+#___________________________________________________________________________________________________ RUN MAIN
+if __name__ == '__main__':
+    sys.exit(AnalyzerRunner.run())
@@ -0,0 +1,185 @@
+# FusedStageGroup.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from cadence.analysis.StageLogBuffer import StageLogBuffer
+
+#*************************************************************************************************** FusedStageGroup
+class FusedStageGroup(object):
+    """ Executes several fusable analysis stages with a single walk of the sitemap, trackway,
+        track series and track hierarchy. Each node is dispatched to the hook method of every
+        stage in stage order, and a stage only receives the children of a node if its hook
+        method for that node descended. As a consequence, outputs that an earlier stage creates
+        for the children of a node are not yet available to the hook of a later stage for that
+        node itself. The group is scheduled in place of its stages, so it exposes the same key,
+        dependencies and outputs attributes as a stage.
+
+        Every stage keeps its own log section, from header to footer, and reports the time spent
+        within its own hook methods. Stages that cache their results skip the trackways whose
+        results were loaded from their cache. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, owner, stages):
+        """ Creates a new instance of FusedStageGroup for the specified stages of the specified
+            AnalyzerBase owner, which must be in a valid execution order. """
+
+        self.owner      = owner
+        self._stages    = list(stages)
+        self._logBuffer = None
+
+        provided = set()
+        for stage in self._stages:
+            provided.add(stage.key)
+            provided.update(stage.outputs)
+
+        first = self._stages[0]
+        if first.dependencies is None:
+            self._dependencies = None
+        else:
+            self._dependencies = []
+            for stage in self._stages:
+                for name in stage.dependencies:
+                    if name not in provided and name not in self._dependencies:
+                        self._dependencies.append(name)
+
+        self._outputs = sorted(provided)
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: key
+    @property
+    def key(self):
+        return '+'.join([stage.key for stage in self._stages])
+
+#___________________________________________________________________________________________________ GS: stages
+    @property
+    def stages(self):
+        """ The stages executed by this group in the order they receive each node. """
+        return list(self._stages)
+
+#___________________________________________________________________________________________________ GS: dependencies
+    @property
+    def dependencies(self):
+        """ The names of the stages and outputs outside of this group that the stages within the
+            group depend upon, or None if the group depends on every stage before it. """
+        return self._dependencies
+
+#___________________________________________________________________________________________________ GS: outputs
+    @property
+    def outputs(self):
+        """ The keys and outputs of the stages within this group. """
+        return self._outputs
+
+#___________________________________________________________________________________________________ GS: logBuffer
+    @property
+    def logBuffer(self):
+        return self._logBuffer
+    @logBuffer.setter
+    def logBuffer(self, value):
+        self._logBuffer = value
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ canJoin
+    @classmethod
+    def canJoin(cls, stage, stages):
+        """ Returns whether or not the specified stage can be fused with the specified stages that
+            precede it. Fusing requires that the stage is fusable and depends on the preceding
+            stages only through their outputs, which are created as each node is visited, and not
+            through their keys, which require the preceding stages to have completed. """
+
+        if not stage.FUSABLE or stage.dependencies is None or not stages:
+            return False
+
+        keys = set([s.key for s in stages])
+        return not any(name in keys for name in stage.dependencies)
+
+#___________________________________________________________________________________________________ analyze
+    def analyze(self):
+        """ Executes the analysis process of every stage within the group with a single walk of
+            the hierarchy. """
+
+        target = self.owner.logger if self._logBuffer is None else self._logBuffer
+        active = []
+        try:
+            for stage in self._stages:
+                stage.logBuffer = StageLogBuffer(target)
+                if stage.beginFused():
+                    active.append(stage)
+
+            self._walk(active)
+
+            for stage in self._stages:
+                stage.endFused()
+        finally:
+            for stage in self._stages:
+                buffer = stage.logBuffer
+                stage.logBuffer = None
+                if buffer is not None:
+                    buffer.flush()
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _walk
+    def _walk(self, stages):
+        owner = self.owner
+        for sitemap in owner.getSitemaps():
+            sitemapStages = self._visit(stages, '_analyzeSitemap', sitemap)
+            if not sitemapStages:
+                continue
+
+            for trackway in owner.getTrackways(sitemap):
+                missed = [s for s in sitemapStages if not s.loadCachedTrackway(trackway)]
+                trackwayStages = self._visit(missed, '_analyzeTrackway', trackway, sitemap)
+                if not trackwayStages:
+                    self._storeCached(missed, trackway)
+                    continue
+
+                for key, series in owner.getTrackwaySeries(trackway).items():
+                    if not series.isReady:
+                        continue
+
+                    seriesStages = self._visit(
+                        trackwayStages, '_analyzeTrackSeries', series, trackway, sitemap)
+                    if not seriesStages:
+                        continue
+
+                    for track in series.tracks:
+                        self._visit(
+                            seriesStages, '_analyzeTrack', track, series, trackway, sitemap)
+
+                self._visit(trackwayStages, '_postAnalyzeTrackway', trackway, sitemap)
+                self._storeCached(missed, trackway)
+
+#___________________________________________________________________________________________________ _storeCached
+    @classmethod
+    def _storeCached(cls, stages, trackway):
+        """ Stores the results of the specified trackway for the stages that analyzed it. """
+        for stage in stages:
+            stage.storeCachedTrackway(trackway)
+
+#___________________________________________________________________________________________________ _visit
+    @classmethod
+    def _visit(cls, stages, name, *args):
+        """ Calls the hook method of the specified name on each stage and returns the list of the
+            stages that descended into the children of the node. """
+        return [stage for stage in stages if stage.visitFused(name, *args)]
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.key)
@@ -0,0 +1,174 @@
+# SitemapShardPool.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import multiprocessing
+import threading
+
+from cadence.analysis.StageLogBuffer import StageLogBuffer
+from cadence.models.SessionFactory import SessionFactory
+
+#*************************************************************************************************** SitemapShardPool
+class SitemapShardPool(object):
+    """ Executes the sitemap traversal of analysis stages across a pool of worker processes, one
+        sitemap per task. Each worker process creates its own instance of the analyzer, with its
+        own read-only session into the tracks database, and returns the picklable accumulators of
+        the stage for every sitemap it traverses. The partial results are returned in sitemap
+        order so that the owning stage merges them deterministically. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Worker processes are started fresh instead of being forked where the start method can be
+    # selected, because a forked worker would inherit the open SQLite connections of the
+    # analyzer, the shared sessions of the SessionFactory, which are keyed by thread ident, and
+    # locks held by other threads. Otherwise forked workers discard the inherited state when
+    # they start.
+    START_METHOD = 'spawn'
+
+    # Analyzers created within a worker process keyed by analyzer class, reused across tasks
+    _WORKER_ANALYZERS = dict()
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, owner, processes):
+        """ Creates a new instance of SitemapShardPool for the specified AnalyzerBase owner with
+            the specified number of worker processes. The processes are started when the first
+            stage is run. """
+
+        self.owner      = owner
+        self._processes = max(1, processes)
+        self._pool      = None
+        self._lock      = threading.Lock()
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: processes
+    @property
+    def processes(self):
+        return self._processes
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ run
+    def run(self, stage):
+        """ Traverses every sitemap of the owner with the specified stage in the worker processes
+            and returns a list of the shard results in the sitemap order of the owner. Each shard
+            result is a dictionary with the stage accumulator values ('result'), the buffered
+            log entries ('log') written by the stage for that sitemap and the state of the result
+            cache of the stage ('cache'), if any. """
+
+        sitemaps = self.owner.getSitemaps()
+        if not sitemaps:
+            return []
+
+        # Larger sitemaps are dispatched first so that they do not finish last on a single worker
+        tasks = [
+            (self.owner.__class__, self.owner.getShardArguments(), stage.key, sitemap.index)
+            for sitemap in sitemaps]
+        sizes = dict([(sm.index, len(self.owner.getTrackways(sm))) for sm in sitemaps])
+        tasks.sort(key=lambda t: sizes[t[3]], reverse=True)
+
+        results = dict()
+        for shard in self._getPool().imap_unordered(executeShard, tasks, chunksize=1):
+            results[shard['index']] = shard
+
+        return [results[sitemap.index] for sitemap in sitemaps]
+
+#___________________________________________________________________________________________________ close
+    def close(self):
+        """ Stops the worker processes once their current tasks have completed. """
+
+        with self._lock:
+            pool       = self._pool
+            self._pool = None
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+#___________________________________________________________________________________________________ initializeWorker
+    @classmethod
+    def initializeWorker(cls):
+        """ Executed within each forked worker process before its first task to discard the
+            analyzers and shared sessions inherited from the parent process, so that the worker
+            opens its own connections into the databases. """
+
+        cls._WORKER_ANALYZERS.clear()
+        SessionFactory.discardSharedSessions()
+
+#___________________________________________________________________________________________________ executeShard
+    @classmethod
+    def executeShard(cls, analyzerClass, analyzerArgs, stageKey, sitemapIndex):
+        """ Executed within a worker process to traverse a single sitemap with the stage of the
+            specified key and return its shard result. """
+
+        analyzer = cls._WORKER_ANALYZERS.get(analyzerClass)
+        if analyzer is None:
+            analyzer = analyzerClass(**analyzerArgs)
+            cls._WORKER_ANALYZERS[analyzerClass] = analyzer
+
+        stage   = analyzer.getStage(stageKey)
+        sitemap = None
+        for sm in analyzer.getSitemaps():
+            if sm.index == sitemapIndex:
+                sitemap = sm
+                break
+
+        buffer = StageLogBuffer(analyzer.logger)
+        stage.logBuffer = buffer
+        try:
+            stage.resetShard()
+            if sitemap is not None:
+                stage.analyzeSitemapShard(sitemap)
+            result = stage.getShardResult()
+        finally:
+            stage.logBuffer = None
+
+        cache = stage.resultCache
+        return dict(
+            index=sitemapIndex,
+            result=result,
+            log=buffer.entries,
+            cache=None if cache is None else cache.state)
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getPool
+    def _getPool(self):
+        with self._lock:
+            if self._pool is None:
+                if hasattr(multiprocessing, 'get_context'):
+                    context    = multiprocessing.get_context(self.START_METHOD)
+                    self._pool = context.Pool(processes=self._processes)
+                else:
+                    self._pool = multiprocessing.Pool(
+                        processes=self._processes, initializer=initializeWorker)
+            return self._pool
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
+
+#___________________________________________________________________________________________________ executeShard
+def executeShard(task):
+    """ Entry point of the pool worker tasks, which must be a module-level function to be
+        pickled. """
+    return SitemapShardPool.executeShard(*task)
+
+#___________________________________________________________________________________________________ initializeWorker
+def initializeWorker():
+    """ Initializer of the forked pool workers, which must be a module-level function to be
+        pickled. """
+    SitemapShardPool.initializeWorker()
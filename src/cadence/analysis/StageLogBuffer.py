@@ -0,0 +1,89 @@
+# StageLogBuffer.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import threading
+
+#*************************************************************************************************** StageLogBuffer
+class StageLogBuffer(object):
+    """ Stands in for the analyzer logger while an analysis stage executes concurrently with other
+        stages. Writes are recorded instead of being sent to the logger and are replayed all at
+        once when the stage completes, so that the log sections of concurrent stages, from their
+        headers to their footers, are not interleaved. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Serializes the replay of buffers into loggers that are shared by concurrent stages
+    _LOCK = threading.RLock()
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, logger):
+        """ Creates a new instance of StageLogBuffer that buffers writes to the specified
+            logger. """
+
+        self._logger  = logger
+        self._entries = []
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: entries
+    @property
+    def entries(self):
+        """ The list of buffered writes as (methodName, args, kwargs) tuples, which can be
+            replayed into another logger with the replay() method. """
+        return list(self._entries)
+
+#___________________________________________________________________________________________________ GS: logger
+    @property
+    def logger(self):
+        """ The logger to which the buffered writes are replayed. """
+        return self._logger
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ write
+    def write(self, *args, **kwargs):
+        self._entries.append(('write', args, kwargs))
+
+#___________________________________________________________________________________________________ writeError
+    def writeError(self, *args, **kwargs):
+        self._entries.append(('writeError', args, kwargs))
+
+#___________________________________________________________________________________________________ flush
+    def flush(self):
+        """ Replays every buffered write to the logger in the order in which they were made and
+            empties the buffer. """
+
+        entries       = self._entries
+        self._entries = []
+        self.replay(self._logger, entries)
+
+#___________________________________________________________________________________________________ replay
+    @classmethod
+    def replay(cls, logger, entries):
+        """ Writes the specified buffered entries to the logger in order. """
+
+        with cls._LOCK:
+            for name, args, kwargs in entries:
+                getattr(logger, name)(*args, **kwargs)
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __getattr__
+    def __getattr__(self, item):
+        """ Attributes other than the buffered write methods are those of the logger. """
+        return getattr(self._logger, item)
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
@@ -0,0 +1,449 @@
+# StageProfiler.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import json
+import os
+import sys
+import threading
+import time
+
+import sqlalchemy as sqla
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+#*************************************************************************************************** StageProfiler
+class StageProfiler(object):
+    """ Records the wall time, CPU time, SQL statements and figure rendering time of the analysis
+        stages of an analyzer, both for each stage as a whole and for each hook method level of
+        its traversal, e.g. analyzeTrackway or analyzeTrack. Level measurements are inclusive of
+        the levels nested within them. Peak Python allocations are recorded for each stage when
+        the tracemalloc module is available and its peak can be reset. Measurements are attributed to the thread that makes
+        them, so stages that run concurrently are profiled separately, although allocation peaks
+        are process-wide and include the allocations of concurrent stages.
+
+        The profile is written as a JSON file and two profile files can be compared with the
+        compare() method to find regressions. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    VERSION = 1
+
+    # The measured values of stages and levels in the order they are written to the summary
+    FIELDS = ('calls', 'wall', 'cpu', 'sqlCount', 'sqlTime', 'figureCount', 'figureTime')
+
+    # Measured values compared by compare() and the minimum change reported for each, which
+    # ignores the noise of very short timings
+    COMPARED_FIELDS = (
+        ('wall', 0.05), ('cpu', 0.05), ('sqlCount', 1), ('sqlTime', 0.05),
+        ('figureTime', 0.05), ('peakMemory', 1048576))
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, owner, traceMemory =True):
+        """ Creates a new instance of StageProfiler.
+
+            owner :: AnalyzerBase
+                The analyzer whose stages are profiled.
+
+            [traceMemory] :: Boolean :: True
+                If True and the tracemalloc module is available, Python allocations are traced
+                while profiling to record the peak memory of each stage. Tracing allocations
+                slows down the analysis considerably. """
+
+        self.owner        = owner
+        self._traceMemory = traceMemory and tracemalloc is not None
+        self._ownsTrace   = False
+        self._local       = threading.local()
+        self._lock        = threading.Lock()
+        self._stages      = []
+        self._stageLookup = dict()
+        self._started     = None
+        self._elapsed     = None
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: isActive
+    @property
+    def isActive(self):
+        return self._started is not None
+
+#___________________________________________________________________________________________________ GS: stages
+    @property
+    def stages(self):
+        """ The list of stage records in the order in which the stages started. Each record is a
+            dictionary of the measured values of the stage with a 'levels' dictionary of the
+            measured values of each hook method level. """
+        return list(self._stages)
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ start
+    def start(self):
+        """ Starts profiling, which begins counting the SQL statements executed by every
+            engine. """
+
+        if self.isActive:
+            return
+
+        sqla.event.listen(
+            sqla.engine.Engine, 'before_cursor_execute', self._handleBeforeCursorExecute)
+        sqla.event.listen(
+            sqla.engine.Engine, 'after_cursor_execute', self._handleAfterCursorExecute)
+
+        if self._traceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._ownsTrace = True
+
+        self._stages      = []
+        self._stageLookup = dict()
+        self._elapsed     = None
+        self._started     = time.time()
+
+#___________________________________________________________________________________________________ stop
+    def stop(self):
+        """ Stops profiling and removes the SQL event listeners. """
+
+        if not self.isActive:
+            return
+
+        sqla.event.remove(
+            sqla.engine.Engine, 'before_cursor_execute', self._handleBeforeCursorExecute)
+        sqla.event.remove(
+            sqla.engine.Engine, 'after_cursor_execute', self._handleAfterCursorExecute)
+
+        if self._ownsTrace:
+            tracemalloc.stop()
+            self._ownsTrace = False
+
+        self._elapsed = time.time() - self._started
+        self._started = None
+
+#___________________________________________________________________________________________________ beginStage
+    def beginStage(self, stage):
+        """ Starts measuring the specified stage as a whole on the current thread. """
+
+        if not self.isActive:
+            return
+
+        memory = None
+        if self._traceMemory:
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+
+        self._getStageRecord(stage)
+        self._getStageFrames()[stage.key] = (self._createFrame(), memory)
+
+#___________________________________________________________________________________________________ endStage
+    def endStage(self, stage):
+        """ Completes the measurement of the specified stage started by beginStage(). """
+
+        frames = self._getStageFrames()
+        if stage.key not in frames:
+            return
+
+        frame, memory = frames.pop(stage.key)
+        record        = self._getStageRecord(stage)
+        with self._lock:
+            self._addFrame(record, frame)
+            if memory is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                record['memoryDelta'] = current - memory
+
+                # Without reset_peak() the peak includes the allocations of earlier stages
+                if hasattr(tracemalloc, 'reset_peak'):
+                    record['peakMemory'] = max(record.get('peakMemory', 0), peak - memory)
+
+#___________________________________________________________________________________________________ measure
+    def measure(self, stage, level, method, *args):
+        """ Calls the specified method with the specified arguments and adds its measurements to
+            the specified level of the stage. Returns the result of the method. """
+
+        if not self.isActive:
+            return method(*args)
+
+        frame = self._createFrame()
+        try:
+            return method(*args)
+        finally:
+            record = self._getStageRecord(stage)
+            with self._lock:
+                levels = record['levels']
+                if level not in levels:
+                    levels[level] = self._createRecord()
+                self._addFrame(levels[level], frame)
+
+#___________________________________________________________________________________________________ measureFigure
+    def measureFigure(self, method, *args, **kwargs):
+        """ Calls the specified PyPlot method, e.g. a figure creation or save method, and adds
+            its duration to the figure time of the stage running on the current thread. Returns
+            the result of the method. """
+
+        if not self.isActive:
+            return method(*args, **kwargs)
+
+        counters = self._getCounters()
+        start    = time.time()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            counters['figureCount'] += 1
+            counters['figureTime']  += time.time() - start
+
+#___________________________________________________________________________________________________ toDict
+    def toDict(self):
+        """ Returns the JSON-serializable profile of the most recent run. """
+
+        return dict(
+            version=self.VERSION,
+            analyzer=self.owner.__class__.__name__,
+            created=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            python=sys.version.split()[0],
+            traceMemory=self._traceMemory,
+            elapsed=self._elapsed,
+            stages=self._stages)
+
+#___________________________________________________________________________________________________ save
+    def save(self, path):
+        """ Writes the profile to a JSON file at the specified path. Returns whether or not the
+            file was written. """
+
+        try:
+            with open(path, 'w') as f:
+                f.write(json.dumps(self.toDict(), indent=2, sort_keys=True))
+        except Exception:
+            return False
+        return True
+
+#___________________________________________________________________________________________________ getSummary
+    def getSummary(self):
+        """ Returns a list of lines containing a table of the measured values of each stage and
+            each of its levels. """
+        return self.createSummary(self.toDict())
+
+#___________________________________________________________________________________________________ createSummary
+    @classmethod
+    def createSummary(cls, profile):
+        """ Returns a list of lines containing a table of the measured values of the stages and
+            levels within the specified profile dictionary. """
+
+        header = '%-32s %8s %10s %10s %8s %10s %10s %10s' % (
+            'STAGE / LEVEL', 'CALLS', 'WALL (s)', 'CPU (s)', 'SQL', 'SQL (s)', 'FIGS (s)',
+            'PEAK (MB)')
+        out = [header, '-'*len(header)]
+
+        for stage in profile.get('stages', []):
+            out.append(cls._formatRow(stage['key'], stage))
+            levels = stage.get('levels', dict())
+            for level in sorted(levels.keys(), key=lambda name: -levels[name]['wall']):
+                out.append(cls._formatRow('  ' + level, levels[level]))
+
+        return out
+
+#___________________________________________________________________________________________________ load
+    @classmethod
+    def load(cls, path):
+        """ Returns the profile dictionary stored in the JSON file at the specified path. """
+
+        with open(path, 'r') as f:
+            return json.loads(f.read())
+
+#___________________________________________________________________________________________________ compare
+    @classmethod
+    def compare(cls, basePath, currentPath, threshold =0.1):
+        """ Compares the current profile file with the base profile file and returns a tuple of
+            the list of report lines and a boolean that is True when regressions were found.
+
+            basePath :: String
+                Path of the profile file of the reference run.
+
+            currentPath :: String
+                Path of the profile file of the run to check for regressions.
+
+            [threshold] :: Number :: 0.1
+                The fractional increase of a measured value over its base value, e.g. 0.1 for
+                10%, above which the increase is reported as a regression. """
+
+        base    = cls.load(basePath)
+        current = cls.load(currentPath)
+        baseStages = dict([(stage['key'], stage) for stage in base.get('stages', [])])
+
+        out         = []
+        regressions = 0
+        for stage in current.get('stages', []):
+            previous = baseStages.pop(stage['key'], None)
+            if previous is None:
+                out.append('[NEW]: Stage "%s" is not in the base profile' % stage['key'])
+                continue
+
+            pairs = [(stage['key'], stage, previous)]
+            baseLevels = previous.get('levels', dict())
+            for level, values in stage.get('levels', dict()).items():
+                if level in baseLevels:
+                    pairs.append(('%s.%s' % (stage['key'], level), values, baseLevels[level]))
+
+            for label, values, baseValues in pairs:
+                for name, minimum in cls.COMPARED_FIELDS:
+                    if name not in values or name not in baseValues:
+                        continue
+
+                    before = baseValues[name]
+                    after  = values[name]
+                    change = after - before
+                    if change <= minimum or change <= threshold*before:
+                        continue
+
+                    regressions += 1
+                    out.append('[REGRESSION]: %s %s %s -> %s (%s)' % (
+                        label, name, cls._formatValue(before), cls._formatValue(after),
+                        '+%s%%' % int(round(100.0*change/before)) if before else 'new'))
+
+        for key in baseStages:
+            out.append('[REMOVED]: Stage "%s" is not in the current profile' % key)
+
+        if not regressions:
+            out.append('No regressions above %s%% found' % int(round(100.0*threshold)))
+        return out, regressions > 0
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getCounters
+    def _getCounters(self):
+        """ Returns the dictionary of the running SQL and figure totals of the current thread. """
+
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = dict(sqlCount=0, sqlTime=0.0, figureCount=0, figureTime=0.0)
+            self._local.counters = counters
+        return counters
+
+#___________________________________________________________________________________________________ _getStageFrames
+    def _getStageFrames(self):
+        frames = getattr(self._local, 'stageFrames', None)
+        if frames is None:
+            frames = dict()
+            self._local.stageFrames = frames
+        return frames
+
+#___________________________________________________________________________________________________ _getStageRecord
+    def _getStageRecord(self, stage):
+        with self._lock:
+            record = self._stageLookup.get(stage.key)
+            if record is None:
+                record = self._createRecord()
+                record.update(key=stage.key, label=stage.label, levels=dict())
+                self._stageLookup[stage.key] = record
+                self._stages.append(record)
+            return record
+
+#___________________________________________________________________________________________________ _createFrame
+    def _createFrame(self):
+        """ Returns the current time and counter values of the current thread, from which the
+            measurements of a call are determined once it completes. """
+
+        counters = self._getCounters()
+        return dict(
+            wall=time.time(),
+            cpu=self._getCpuTime(),
+            sqlCount=counters['sqlCount'],
+            sqlTime=counters['sqlTime'],
+            figureCount=counters['figureCount'],
+            figureTime=counters['figureTime'])
+
+#___________________________________________________________________________________________________ _addFrame
+    def _addFrame(self, record, frame):
+        """ Adds the measurements since the specified frame was created to the record. """
+
+        counters = self._getCounters()
+        record['calls']       += 1
+        record['wall']        += time.time() - frame['wall']
+        record['cpu']         += self._getCpuTime() - frame['cpu']
+        record['sqlCount']    += counters['sqlCount'] - frame['sqlCount']
+        record['sqlTime']     += counters['sqlTime'] - frame['sqlTime']
+        record['figureCount'] += counters['figureCount'] - frame['figureCount']
+        record['figureTime']  += counters['figureTime'] - frame['figureTime']
+
+#___________________________________________________________________________________________________ _createRecord
+    @classmethod
+    def _createRecord(cls):
+        return dict(
+            calls=0, wall=0.0, cpu=0.0, sqlCount=0, sqlTime=0.0, figureCount=0, figureTime=0.0)
+
+#___________________________________________________________________________________________________ _getCpuTime
+    @classmethod
+    def _getCpuTime(cls):
+        """ Returns the CPU time of the current thread where supported, or otherwise the user and
+            system CPU time of the process, which os.times() reports on Pythons without the
+            per-thread or per-process clocks, e.g. Python 2. """
+
+        if hasattr(time, 'thread_time'):
+            return time.thread_time()
+        if hasattr(time, 'process_time'):
+            return time.process_time()
+        return sum(os.times()[:2])
+
+#___________________________________________________________________________________________________ _formatRow
+    @classmethod
+    def _formatRow(cls, label, values):
+        peak = values.get('peakMemory')
+        return '%-32s %8s %10.3f %10.3f %8s %10.3f %10.3f %10s' % (
+            label[:32], values['calls'], values['wall'], values['cpu'], values['sqlCount'],
+            values['sqlTime'], values['figureTime'],
+            '-' if peak is None else '%.1f' % (peak/1048576.0))
+
+#___________________________________________________________________________________________________ _formatValue
+    @classmethod
+    def _formatValue(cls, value):
+        return '%.3f' % value if isinstance(value, float) else '%s' % value
+
+#===================================================================================================
+#                                                                                 H A N D L E R S
+
+#___________________________________________________________________________________________________ _handleBeforeCursorExecute
+    def _handleBeforeCursorExecute(self, conn, cursor, statement, parameters, context, many):
+        self._local.sqlStart = time.time()
+
+#___________________________________________________________________________________________________ _handleAfterCursorExecute
+    def _handleAfterCursorExecute(self, conn, cursor, statement, parameters, context, many):
+        start = getattr(self._local, 'sqlStart', None)
+        if start is None:
+            return
+
+        self._local.sqlStart = None
+        counters = self._getCounters()
+        counters['sqlCount'] += 1
+        counters['sqlTime']  += time.time() - start
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
+
+####################################################################################################
+####################################################################################################
+
+#___________________________________________________________________________________________________ RUN MAIN
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: StageProfiler.py BASE_PROFILE CURRENT_PROFILE [THRESHOLD]')
+        sys.exit(2)
+
+    lines, regressed = StageProfiler.compare(
+        sys.argv[1], sys.argv[2], float(sys.argv[3]) if len(sys.argv) > 3 else 0.1)
+    print('\n'.join(lines))
+    sys.exit(1 if regressed else 0)
@@ -0,0 +1,257 @@
+# StageResultCache.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import hashlib
+import importlib
+import inspect
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+#*************************************************************************************************** StageResultCache
+class StageResultCache(object):
+    """ A persistent, content-addressed store of the per-trackway results of an analysis stage.
+        Each result is stored in its own file named by a digest of the stage code version, the
+        code of the modules that load the tracks analyzed by every stage and the track rows of
+        the trackway, so that a result is only found again if neither the code nor any of the
+        tracks in the trackway have changed since it was stored. Entries that were not used by a
+        complete run are removed by prune(). """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    EXTENSION = '.result'
+
+    # Modules that load, parse and thread the tracks passed to every stage, whose code is part of
+    # the version of every cached result
+    DEPENDENCY_MODULES = (
+        'cadence.analysis.TrackRecord',
+        'cadence.analysis.TrackSeries',
+        'cadence.analysis.shared.TrackArray',
+        'cadence.models.tracks.TracksDefault')
+
+    # Digests of the source files of stage classes and dependency modules, which change whenever
+    # the code changes
+    _SOURCE_DIGESTS = dict()
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, path, stage, columns, cold =False):
+        """ Creates a new instance of StageResultCache.
+
+            path :: String
+                The absolute path of the folder in which the results of the stage are stored.
+
+            stage :: AnalysisStage
+                The stage whose results are stored.
+
+            columns :: [String]
+                The names of the track columns whose values identify the input of the stage.
+
+            [cold] :: Boolean :: False
+                If True no stored results are loaded, although new results are still stored. """
+
+        self._path    = path
+        self._columns = tuple(columns)
+        self._cold    = cold
+        self._used    = set()
+        self.hits     = 0
+        self.misses   = 0
+
+        version = hashlib.sha1()
+        for part in (
+                stage.__class__.__name__, stage.key, stage.CACHE_VERSION,
+                self._getSourceDigest(stage.__class__), self._getDependencyDigest(),
+                ','.join(self._columns)):
+            version.update(('%s\n' % part).encode('utf-8'))
+        self._version = version.hexdigest()
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: path
+    @property
+    def path(self):
+        return self._path
+
+#___________________________________________________________________________________________________ GS: version
+    @property
+    def version(self):
+        """ The digest of the stage and dependency code versions and the cache columns, which is
+            the basis of every key created by this cache. """
+        return self._version
+
+#___________________________________________________________________________________________________ GS: cold
+    @property
+    def cold(self):
+        """ Whether or not stored results are ignored, which forces every result to be
+            recomputed. """
+        return self._cold
+
+#___________________________________________________________________________________________________ GS: usedKeys
+    @property
+    def usedKeys(self):
+        """ The keys of the results loaded or stored since this cache was created. """
+        return list(self._used)
+
+#___________________________________________________________________________________________________ GS: state
+    @property
+    def state(self):
+        """ A picklable dictionary of the keys used and the counts of this cache, which can be
+            added to another cache for the same stage with markUsed(**state). """
+        return dict(keys=self.usedKeys, hits=self.hits, misses=self.misses)
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ createKey
+    def createKey(self, trackway, trackSeries):
+        """ Returns the key of the result for the specified trackway and its dictionary of
+            TrackSeries, which is a digest of the stage code version and the values of the cache
+            columns of every track within the series. """
+
+        digest = hashlib.sha1(self._version.encode('utf-8'))
+        digest.update(('%s\n' % trackway.uid).encode('utf-8'))
+        for key in sorted(trackSeries.keys()):
+            series = trackSeries[key]
+            digest.update(('%s:%s\n' % (key, series.isReady)).encode('utf-8'))
+            for track in series.tracks:
+                values = [repr(getattr(track, name, None)) for name in self._columns]
+                digest.update(('|'.join(values) + '\n').encode('utf-8'))
+        return digest.hexdigest()
+
+#___________________________________________________________________________________________________ load
+    def load(self, key):
+        """ Returns a (found, result) tuple for the specified key. Results that cannot be read,
+            e.g. because they were written by an incompatible version, are treated as missing. """
+
+        path = self._getFilePath(key)
+        if self._cold or not os.path.exists(path):
+            self.misses += 1
+            return False, None
+
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except Exception:
+            self.misses += 1
+            return False, None
+
+        self._used.add(key)
+        self.hits += 1
+        return True, result
+
+#___________________________________________________________________________________________________ save
+    def save(self, key, result):
+        """ Stores the specified picklable result for the key. The file is written under a
+            temporary name and then renamed so that concurrent runs never read a partial file.
+            Returns whether or not the result was stored. """
+
+        self._used.add(key)
+        if not os.path.exists(self._path):
+            try:
+                os.makedirs(self._path)
+            except OSError:
+                if not os.path.exists(self._path):
+                    return False
+
+        path     = self._getFilePath(key)
+        tempPath = '%s.%s.tmp' % (path, os.getpid())
+        try:
+            with open(tempPath, 'wb') as f:
+                pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tempPath, path)
+        except Exception:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            return False
+        return True
+
+#___________________________________________________________________________________________________ markUsed
+    def markUsed(self, keys, hits =0, misses =0):
+        """ Adds the keys used and the counts of another cache instance for the same stage, e.g.
+            one within a worker process, to this cache. """
+
+        self._used.update(keys)
+        self.hits   += hits
+        self.misses += misses
+
+#___________________________________________________________________________________________________ prune
+    def prune(self):
+        """ Removes the stored results that have not been used since this cache was created and
+            returns the number of results removed. Should only be called after a complete run. """
+
+        if not os.path.exists(self._path):
+            return 0
+
+        count = 0
+        for name in os.listdir(self._path):
+            key, extension = os.path.splitext(name)
+            if extension != self.EXTENSION or key in self._used:
+                continue
+            try:
+                os.remove(os.path.join(self._path, name))
+                count += 1
+            except OSError:
+                pass
+        return count
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getFilePath
+    def _getFilePath(self, key):
+        return os.path.join(self._path, key + self.EXTENSION)
+
+#___________________________________________________________________________________________________ _getDependencyDigest
+    @classmethod
+    def _getDependencyDigest(cls):
+        """ Returns the combined source digests of the DEPENDENCY_MODULES, where modules that
+            cannot be imported contribute an empty digest. """
+
+        out = []
+        for name in cls.DEPENDENCY_MODULES:
+            try:
+                module = importlib.import_module(name)
+            except Exception:
+                out.append('')
+                continue
+            out.append(cls._getSourceDigest(module))
+        return ','.join(out)
+
+#___________________________________________________________________________________________________ _getSourceDigest
+    @classmethod
+    def _getSourceDigest(cls, target):
+        """ Returns a digest of the source file of the specified stage class or module, or an
+            empty string if the source is not available, in which case only the CACHE_VERSION of
+            the stage identifies its code. """
+
+        if target in cls._SOURCE_DIGESTS:
+            return cls._SOURCE_DIGESTS[target]
+
+        try:
+            with open(inspect.getsourcefile(target), 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except Exception:
+            digest = ''
+
+        cls._SOURCE_DIGESTS[target] = digest
+        return digest
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
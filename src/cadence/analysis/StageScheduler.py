@@ -0,0 +1,205 @@
+# StageScheduler.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import threading
+
+#*************************************************************************************************** StageScheduler
+class StageScheduler(object):
+    """ Orders the analysis stages of an analyzer as a dependency graph and executes them, running
+        stages whose dependencies have completed concurrently in worker threads.
+
+        Each stage declares the names of the outputs it produces (its key by default) and the
+        names of the stages or outputs it depends upon. Stages that do not declare their
+        dependencies depend on every stage added before them, which preserves the sequential
+        declaration order of analyzers written before dependencies could be declared. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, stages, maxWorkers =1):
+        """ Creates a new instance of StageScheduler.
+
+            stages :: [AnalysisStage]
+                The stages to schedule in their declaration order.
+
+            [maxWorkers] :: Integer :: 1
+                The maximum number of stages that execute at the same time. A value of 1 executes
+                the stages one at a time on the calling thread. """
+
+        self._stages       = list(stages)
+        self._maxWorkers   = max(1, maxWorkers)
+        self._dependencies = self._resolveDependencies()
+        self._order        = self._sortStages()
+        self._failedStage  = None
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: order
+    @property
+    def order(self):
+        """ The stages in a valid execution order, where every stage follows its dependencies and
+            stages are otherwise kept in declaration order. """
+        return list(self._order)
+
+#___________________________________________________________________________________________________ GS: isConcurrent
+    @property
+    def isConcurrent(self):
+        """ Whether or not stages can execute at the same time in worker threads. """
+        return self._maxWorkers > 1 and len(self._stages) > 1
+
+#___________________________________________________________________________________________________ GS: failedStage
+    @property
+    def failedStage(self):
+        """ The stage whose execution raised an exception during the last run, or None. """
+        return self._failedStage
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ getDependencies
+    def getDependencies(self, stage):
+        """ Returns the list of stages that must complete before the specified stage executes. """
+        return list(self._dependencies.get(stage, []))
+
+#___________________________________________________________________________________________________ run
+    def run(self, execute):
+        """ Executes every stage by calling execute(stage). If a stage raises an exception no
+            further stages are started, stages that are already running are allowed to finish
+            and the exception of the failed stage is then raised from this method. """
+
+        self._failedStage = None
+        if not self.isConcurrent:
+            for stage in self._order:
+                try:
+                    execute(stage)
+                except Exception:
+                    self._failedStage = stage
+                    raise
+            return
+
+        condition = threading.Condition()
+        pending   = list(self._order)
+        running   = set()
+        complete  = set()
+        errors    = []
+
+        def executeStage(stage):
+            error = None
+            try:
+                execute(stage)
+            except Exception as err:
+                error = err
+
+            with condition:
+                running.discard(stage)
+                complete.add(stage)
+                if error is not None:
+                    errors.append((stage, error))
+                condition.notify_all()
+
+        with condition:
+            while pending or running:
+                if errors and not running:
+                    break
+
+                while not errors and pending and len(running) < self._maxWorkers:
+                    stage = self._getNextReady(pending, complete)
+                    if stage is None:
+                        break
+
+                    pending.remove(stage)
+                    running.add(stage)
+                    thread = threading.Thread(
+                        target=executeStage,
+                        args=(stage,),
+                        name='Stage-%s' % stage.key)
+                    thread.daemon = True
+                    thread.start()
+
+                condition.wait()
+
+        if errors:
+            self._failedStage = errors[0][0]
+            raise errors[0][1]
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getNextReady
+    def _getNextReady(self, pending, complete):
+        """ Returns the first pending stage whose dependencies have all completed, or None if
+            there is no such stage. """
+
+        for stage in pending:
+            if all(d in complete for d in self._dependencies[stage]):
+                return stage
+        return None
+
+#___________________________________________________________________________________________________ _resolveDependencies
+    def _resolveDependencies(self):
+        """ Maps each stage to the list of stages that it depends upon. Raises a ValueError if a
+            stage depends on a name that no stage provides. """
+
+        providers = dict()
+        for stage in self._stages:
+            providers[stage.key] = stage
+            for name in stage.outputs:
+                if name in providers and providers[name] is not stage:
+                    raise ValueError('Output "%s" of stage "%s" is already provided by "%s"' % (
+                        name, stage.key, providers[name].key))
+                providers[name] = stage
+
+        out = dict()
+        for index, stage in enumerate(self._stages):
+            if stage.dependencies is None:
+                out[stage] = self._stages[:index]
+                continue
+
+            dependencies = []
+            for name in stage.dependencies:
+                provider = providers.get(name)
+                if provider is None:
+                    raise ValueError('Stage "%s" depends on unknown stage or output "%s"' % (
+                        stage.key, name))
+                if provider is not stage and provider not in dependencies:
+                    dependencies.append(provider)
+            out[stage] = dependencies
+
+        return out
+
+#___________________________________________________________________________________________________ _sortStages
+    def _sortStages(self):
+        """ Returns the stages sorted so that each follows its dependencies, keeping declaration
+            order wherever the dependencies allow it. Raises a ValueError if the dependencies
+            contain a cycle. """
+
+        order     = []
+        remaining = list(self._stages)
+        complete  = set()
+        while remaining:
+            stage = self._getNextReady(remaining, complete)
+            if stage is None:
+                raise ValueError('Circular dependency between the stages: %s' % ', '.join(
+                    [s.key for s in remaining]))
+
+            remaining.remove(stage)
+            complete.add(stage)
+            order.append(stage)
+
+        return order
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
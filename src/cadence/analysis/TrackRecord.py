@@ -0,0 +1,110 @@
+# TrackRecord.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import sqlalchemy as sqla
+
+from cadence.models.tracks.TracksDefault import TracksDefault
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+
+#*************************************************************************************************** TrackRecord
+class TrackRecord(object):
+    """ A compact, read-only representation of a row in the tracks table used by analyzers that
+        run in read-only mode. Records are created from Core select results rather than ORM
+        queries and so carry no session, identity map or attribute instrumentation. They expose
+        the same column attributes and the read-only properties of the Tracks_Track model, e.g.
+        fingerprint, positionValue and cache, which are shared directly with the model classes.
+        Column values cannot be modified, while transient data is stored on the record itself. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Names of the columns selected from the tracks table in the order they are specified within
+    # the select statement
+    COLUMNS = (
+        'i', 'uid', 'site', 'year', 'level', 'sector', 'trackwayType', 'trackwayNumber', 'number',
+        'snapshot', 'note', 'next', 'left', 'pes', 'hidden', 'index', 'width', 'length',
+        'rotation', 'x', 'z', 'lengthRatio', 'widthMeasured', 'widthUncertainty',
+        'lengthMeasured', 'lengthUncertainty', 'depthMeasured', 'depthUncertainty',
+        'rotationMeasured', 'rotationUncertainty', 'flags', 'sourceFlags', 'displayFlags',
+        'importFlags', 'analysisFlags', 'dead', 'fingerprintKey', 'seriesFingerprintKey')
+
+    __slots__ = COLUMNS + ('_transients',)
+
+    _TRACKS_DEFAULT = TracksDefault.__dict__
+    _TRACKS_TRACK   = Tracks_Track.__dict__
+
+    trackSeries             = _TRACKS_DEFAULT['trackSeries']
+    positionValue           = _TRACKS_DEFAULT['positionValue']
+    xValue                  = _TRACKS_DEFAULT['xValue']
+    zValue                  = _TRACKS_DEFAULT['zValue']
+    isComplete              = _TRACKS_DEFAULT['isComplete']
+    id                      = _TRACKS_DEFAULT['id']
+    name                    = property(_TRACKS_DEFAULT['name'].fget)
+    fingerprint             = _TRACKS_DEFAULT['fingerprint']
+    trackSeriesFingerprint  = _TRACKS_DEFAULT['trackSeriesFingerprint']
+    trackwayFingerprint     = _TRACKS_DEFAULT['trackwayFingerprint']
+    snapshotData            = property(_TRACKS_DEFAULT['snapshotData'].fget)
+    cache                   = _TRACKS_TRACK['cache']
+
+    getSnapshotValue            = _TRACKS_DEFAULT['getSnapshotValue']
+    toDict                      = _TRACKS_DEFAULT['toDict']
+    _createDict                 = _TRACKS_DEFAULT['_createDict']
+    _createTrackwayFingerprint  = _TRACKS_DEFAULT['_createTrackwayFingerprint']
+    _createSeriesFingerprint    = _TRACKS_DEFAULT['_createSeriesFingerprint']
+    _createFingerprint          = _TRACKS_DEFAULT['_createFingerprint']
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, values):
+        """ Creates a new instance of TrackRecord from a sequence of values in the order of the
+            COLUMNS names, e.g. a row returned by the select statement of createSelect(). """
+
+        for name, value in zip(self.COLUMNS, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_transients', dict())
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ fetchTransient
+    def fetchTransient(self, key, defaultValue =None):
+        """ Returns the transient value stored on this record for the specified key. """
+        return self._transients.get(key, defaultValue)
+
+#___________________________________________________________________________________________________ putTransient
+    def putTransient(self, key, value):
+        """ Stores the specified transient value on this record, which is not persisted. """
+        self._transients[key] = value
+
+#___________________________________________________________________________________________________ createSelect
+    @classmethod
+    def createSelect(cls, table):
+        """ Returns a Core select statement for the record columns of the specified tracks table,
+            to which where clauses can be added as needed. """
+        return sqla.select([table.c[name] for name in cls.COLUMNS])
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __reduce__
+    def __reduce__(self):
+        """ Records are pickled from their column values alone, e.g. when returned from analysis
+            worker processes, because the read-only columns cannot be restored by attribute
+            assignment and transient data does not outlive the process. """
+        return self.__class__, (tuple([getattr(self, name) for name in self.COLUMNS]),)
+
+#___________________________________________________________________________________________________ __setattr__
+    def __setattr__(self, name, value):
+        if name in self.COLUMNS:
+            raise AttributeError('%s column "%s" is read-only' % (self.__class__.__name__, name))
+        object.__setattr__(self, name, value)
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    # Shared with the track models so that records and tracks are logged identically
+    __str__ = _TRACKS_DEFAULT['__str__']
@@ -4,8 +4,10 @@
 
 from __future__ import print_function, absolute_import, unicode_literals, division
 
+import numpy as np
 from pyaid.config.ConfigsDict import ConfigsDict
 
+from cadence.analysis.shared.TrackArray import TrackArray
 from cadence.models.tracks.Tracks_Track import Tracks_Track
 
 #*************************************************************************************************** TrackSeries
@@ -20,12 +22,15 @@ class TrackSeries(object):
         """Creates a new instance of TrackSeries."""
         self.analysisHierarchy = []
 
-        self._trackway      = trackway
-        self._firstTrackUid = firstTrackUid
-        self._tracks        = []
-        self._incomplete    = []
-        self._isValid       = True
-        self._cache         = ConfigsDict()
+        self._trackway       = trackway
+        self._firstTrackUid  = firstTrackUid
+        self._tracks         = []
+        self._incomplete     = []
+        self._isValid        = True
+        self._errors         = []
+        self._snapshotArrays = dict()
+        self._trackArray     = None
+        self._cache          = ConfigsDict()
 
 #===================================================================================================
 #                                                                                   G E T / S E T
@@ -53,6 +58,13 @@ class TrackSeries(object):
     def isValid(self):
         return self._isValid
 
+#___________________________________________________________________________________________________ GS: errors
+    @property
+    def errors(self):
+        """ A list of messages describing the linkage problems, e.g. cycles or links to tracks that
+            do not exist, found while loading this series. Empty if the series loaded cleanly. """
+        return self._errors
+
 #___________________________________________________________________________________________________ GS: cache
     @property
     def cache(self):
@@ -115,6 +127,16 @@ class TrackSeries(object):
     def tracks(self, value):
         self._tracks = value
 
+#___________________________________________________________________________________________________ GS: trackArray
+    @property
+    def trackArray(self):
+        """ A TrackArray containing the spatial properties of the tracks in this series as numpy
+            arrays in series order, created on first access and cached until the series is
+            reloaded. """
+        if self._trackArray is None:
+            self._trackArray = TrackArray(self.tracks)
+        return self._trackArray
+
 #___________________________________________________________________________________________________ GS: incompleteTracks
     @property
     def incompleteTracks(self):
@@ -128,24 +150,73 @@ class TrackSeries(object):
 #===================================================================================================
 #                                                                                     P U B L I C
 
+#___________________________________________________________________________________________________ getSnapshotValues
+    def getSnapshotValues(self, key):
+        """ Returns a numpy array containing the snapshot value for the specified key, one of the
+            SnapshotDataEnum values, for each track in the series in order. Tracks without such a
+            value are represented by NaN entries. The array is cached until the series is
+            reloaded. """
+
+        out = self._snapshotArrays.get(key)
+        if out is None:
+            out = np.array(
+                [t.getSnapshotValue(key, np.nan) for t in self.tracks], dtype=np.float64)
+            self._snapshotArrays[key] = out
+        return out
+
 #___________________________________________________________________________________________________ load
-    def load(self):
-        """load doc..."""
+    def load(self, tracks =None):
+        """ Loads the tracks in this series by following the next links from the first track.
+
+            [tracks] :: Dict :: None
+                A dictionary mapping track uids to track instances. If specified, the series is
+                threaded in memory from this dictionary. Otherwise the series is retrieved from
+                the database with a single recursive query.
+
+            Loading stops at the first cycle or broken link, in which case the series is marked
+            invalid and the problem is recorded in the errors list. """
+
+        self._tracks         = []
+        self._incomplete     = []
+        self._errors         = []
+        self._isValid        = True
+        self._snapshotArrays = dict()
+        self._trackArray     = None
+
         if not self._firstTrackUid:
             return True
 
-        model   = Tracks_Track.MASTER
-        session = self.trackway.mySession
+        if tracks is None:
+            # Retrieve the entire series with a single recursive query, from which the tracks are
+            # threaded below exactly as they would be from a dictionary of loaded tracks
+            model  = Tracks_Track.MASTER
+            result = model.querySeries(self._firstTrackUid, self.trackway.mySession)
+            tracks = dict((t.uid, t) for t in result.tracks)
+
+        visited = set()
 
         nextTrackUid = self._firstTrackUid
         while nextTrackUid:
-            track = session.query(model).filter(model.uid == nextTrackUid).first()
+            if nextTrackUid in visited:
+                self._isValid = False
+                self._errors.append('Cyclic link back to track %s' % nextTrackUid)
+                break
+            visited.add(nextTrackUid)
+
+            track = tracks.get(nextTrackUid)
+
+            if track is None:
+                self._isValid = False
+                self._errors.append('Broken link to missing track %s%s' % (
+                    nextTrackUid, (' from %s' % self.tracks[-1].uid) if self.tracks else ''))
+                break
+
             track.trackSeries = self
             self.tracks.append(track)
             if not track.isComplete:
                 self.incompleteTracks.append(track)
             nextTrackUid = track.next
-        return True
+        return self._isValid
 
 #===================================================================================================
 #                                                                               I N T R I N S I C
@@ -0,0 +1,184 @@
+# TrackSeriesLoader.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from pyaid.debug.Logger import Logger
+import sqlalchemy as sqla
+
+from cadence.analysis.TrackRecord import TrackRecord
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+
+#*************************************************************************************************** TrackSeriesLoader
+class TrackSeriesLoader(object):
+    """ Loads the track series for many trackways at once. Instead of following the next links of
+        each series with one query per track, every track within the sitemaps of the trackways is
+        fetched in a single query and the four series of each trackway are then threaded in memory
+        from a uid -> track dictionary. Cycles and broken links are detected in the same pass. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Maximum number of uids to include within a single IN clause, which keeps the query below the
+    # SQLite bound parameter limit
+    _BATCH_SIZE = 500
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, session, logger =None, readOnly =False):
+        """ Creates a new instance of TrackSeriesLoader.
+
+            [readOnly] :: Boolean :: False
+                If True the tracks are loaded with Core select statements as read-only TrackRecord
+                instances instead of Tracks_Track model instances, which is faster and uses far
+                less memory when the tracks will not be modified. """
+
+        self.session  = session
+        self.logger   = logger
+        self.readOnly = readOnly
+        if not logger:
+            self.logger = Logger(self, printOut=True)
+
+        self._tracks = dict()
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: tracks
+    @property
+    def tracks(self):
+        """ The dictionary of all tracks loaded by this loader, keyed by their uids. """
+        return self._tracks
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ loadSitemap
+    def loadSitemap(self, sitemap, trackways =None):
+        """ Loads the track series for every trackway within the specified sitemap and returns a
+            dictionary of the results keyed by trackway uid, where each value is the ordered
+            dictionary of series returned by Tracks_Trackway.getTrackSeries().
+
+            [trackways] :: List :: None
+                The trackways within the sitemap to load. If not specified, the trackways are
+                retrieved from the sitemap. """
+
+        if trackways is None:
+            trackways = sitemap.getTrackways()
+        return self.loadTrackways(trackways, [sitemap])
+
+#___________________________________________________________________________________________________ loadTrackways
+    def loadTrackways(self, trackways, sitemaps =None):
+        """ Loads the track series for each of the specified trackways and returns a dictionary of
+            the results keyed by trackway uid, where each value is the ordered dictionary of series
+            returned by Tracks_Trackway.getTrackSeries().
+
+            [sitemaps] :: List :: None
+                The sitemaps in which the trackways reside. If not specified the sitemap of each
+                trackway is used. """
+
+        if sitemaps is None:
+            sitemaps = []
+            for tw in trackways:
+                sitemap = tw.sitemap
+                if sitemap and sitemap not in sitemaps:
+                    sitemaps.append(sitemap)
+
+        self._loadSitemapTracks(sitemaps)
+
+        firstUids = []
+        for tw in trackways:
+            firstUids.extend(tw.firstTracksList)
+        self._loadLinkedTracks(firstUids)
+
+        out = dict()
+        for tw in trackways:
+            series = tw.getTrackSeries(self._tracks)
+            for key, s in series.items():
+                for error in s.errors:
+                    self.logger.write([
+                        '[ERROR]: Invalid track series linkage',
+                        'TRACKWAY: %s' % tw.name,
+                        'SERIES: %s' % key,
+                        'REASON: %s' % error ])
+            out[tw.uid] = series
+
+        return out
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _loadSitemapTracks
+    def _loadSitemapTracks(self, sitemaps):
+        """ Fetches every track within the specified sitemaps with a single query and adds them to
+            the tracks dictionary. """
+
+        model    = Tracks_Track.MASTER
+        criteria = []
+        for sitemap in sitemaps:
+            criteria.append(sqla.and_(model.site == sitemap.name, model.level == sitemap.level))
+
+        if not criteria:
+            return
+
+        for track in self._queryTracks(sqla.or_(*criteria)):
+            self._tracks[track.uid] = track
+
+#___________________________________________________________________________________________________ _loadLinkedTracks
+    def _loadLinkedTracks(self, uids):
+        """ Follows the next links from each of the specified uids through the loaded tracks and
+            fetches any linked tracks that reside outside of the loaded sitemaps, in batches, until
+            every reachable track has been loaded. Links to tracks that do not exist in the database
+            are left unresolved and later reported as broken by the TrackSeries. """
+
+        model     = Tracks_Track.MASTER
+        visited   = set()
+        requested = set()
+        pending   = [uid for uid in uids if uid]
+
+        while pending:
+            unresolved = []
+            for uid in pending:
+                while uid and uid not in visited:
+                    track = self._tracks.get(uid)
+                    if track is None:
+                        if uid not in requested:
+                            requested.add(uid)
+                            unresolved.append(uid)
+                        break
+                    visited.add(uid)
+                    uid = track.next
+
+            pending = []
+            for index in range(0, len(unresolved), self._BATCH_SIZE):
+                batch = unresolved[index:index + self._BATCH_SIZE]
+                for track in self._queryTracks(model.uid.in_(batch)):
+                    self._tracks[track.uid] = track
+                    pending.append(track.uid)
+
+#___________________________________________________________________________________________________ _queryTracks
+    def _queryTracks(self, criterion):
+        """ Returns a list of the tracks matching the specified where criterion as either model
+            instances or, in read-only mode, TrackRecord instances. Model instances are loaded
+            with their deferred columns, because stages read the snapshots of every track, e.g.
+            through TrackSeries.getSnapshotValues(), which would otherwise issue one query per
+            track. """
+
+        model = Tracks_Track.MASTER
+        if not self.readOnly:
+            query = self.session.query(model).options(model.getUndeferOption())
+            return query.filter(criterion).all()
+
+        query = TrackRecord.createSelect(model.__table__).where(criterion)
+        return [TrackRecord(row) for row in self.session.execute(query)]
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
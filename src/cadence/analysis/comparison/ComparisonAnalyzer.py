@@ -22,12 +22,22 @@ class ComparisonAnalyzer(AnalyzerBase):
     def __init__(self, **kwargs):
         """Creates a new instance of ComparisonAnalyzer."""
         super(ComparisonAnalyzer, self).__init__(**kwargs)
-        self.addStage(LengthWidthStage('lengthWidth', self))
-        self.addStage(RotationStage('rotation', self))
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ createStages
+    @classmethod
+    def createStages(cls, owner =None):
+        return [
+            LengthWidthStage('lengthWidth', owner),
+            RotationStage('rotation', owner) ]
 
 ####################################################################################################
 ####################################################################################################
 
 #___________________________________________________________________________________________________ RUN MAIN
 if __name__ == '__main__':
-    ComparisonAnalyzer().run()
+    import sys
+    from cadence.analysis.AnalyzerRunner import AnalyzerRunner
+    sys.exit(AnalyzerRunner.run(['ComparisonAnalyzer'] + sys.argv[1:]))
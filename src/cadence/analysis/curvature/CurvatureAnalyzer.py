@@ -22,12 +22,22 @@ class CurvatureAnalyzer(AnalyzerBase):
     def __init__(self, **kwargs):
         """Creates a new instance of CurvatureAnalyzer."""
         super(CurvatureAnalyzer, self).__init__(**kwargs)
-        # self.addStage(SeriesCurvatureStage('seriesCurves', self))
-        self.addStage(PathGeneratorStage('pathGenerator', self))
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ createStages
+    @classmethod
+    def createStages(cls, owner =None):
+        return [
+            # SeriesCurvatureStage('seriesCurves', owner),
+            PathGeneratorStage('pathGenerator', owner) ]
 
 ####################################################################################################
 ####################################################################################################
 
 #___________________________________________________________________________________________________ RUN MAIN
 if __name__ == '__main__':
-    CurvatureAnalyzer().run()
+    import sys
+    from cadence.analysis.AnalyzerRunner import AnalyzerRunner
+    sys.exit(AnalyzerRunner.run(['CurvatureAnalyzer'] + sys.argv[1:]))
@@ -0,0 +1,179 @@
+# SitemapTransform.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import numpy as np
+
+#*************************************************************************************************** SitemapTransform
+class SitemapTransform(object):
+    """ Converts coordinates between the three coordinate spaces of a sitemap with precomputed
+        affine matrices, operating on entire numpy arrays of points in a single call:
+
+            map     The drawing coordinates of the sitemap in 'scaled mm', where x is positive to
+                    the right and y is positive downwards.
+            scene   The Maya scene coordinates in cm, where x is positive to the left and z is
+                    positive upwards (towards the top of the map). The origin of the scene is the
+                    federal coordinates marker located at (xFederal, yFederal) on the map.
+            federal The Swiss federal coordinates in meters (east, north), where the federal
+                    coordinates marker is located at (federalEast, federalNorth).
+
+        The translate and rotate values of the sitemap describe the placement of the sitemap
+        image plane within the Maya scene and do not take part in these planar conversions. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Number of scene centimeters per map unit for a map scale of 1:1
+    _SCENE_UNITS_PER_MAP_UNIT = 0.1
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, sitemap):
+        """ Creates a new instance of SitemapTransform from the values of the specified
+            Tracks_SiteMap, which are copied so that later changes to the sitemap do not affect
+            this transform. """
+
+        self._sitemap = sitemap
+        scale = self._SCENE_UNITS_PER_MAP_UNIT*(sitemap.scale or 1.0)
+
+        self._mapToScene = np.array([
+            [-scale, 0.0, scale*sitemap.xFederal],
+            [0.0, -scale, scale*sitemap.yFederal],
+            [0.0, 0.0, 1.0] ])
+
+        self._sceneToFederal = np.array([
+            [-0.01, 0.0, float(sitemap.federalEast)],
+            [0.0, 0.01, float(sitemap.federalNorth)],
+            [0.0, 0.0, 1.0] ])
+
+        self._sceneToMap     = np.linalg.inv(self._mapToScene)
+        self._federalToScene = np.linalg.inv(self._sceneToFederal)
+        self._mapToFederal   = np.dot(self._sceneToFederal, self._mapToScene)
+        self._federalToMap   = np.linalg.inv(self._mapToFederal)
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: sitemap
+    @property
+    def sitemap(self):
+        """ The sitemap from which this transform was created. """
+        return self._sitemap
+
+#___________________________________________________________________________________________________ GS: mapToSceneMatrix
+    @property
+    def mapToSceneMatrix(self):
+        """ The 3x3 homogeneous affine matrix that converts map points to scene points. """
+        return self._mapToScene
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ mapToScene
+    def mapToScene(self, x, y):
+        """ Converts map coordinates to scene coordinates and returns them as an (x, z) tuple of
+            numpy arrays. The arguments can be numbers, sequences or numpy arrays of equal
+            length. """
+        return self._transform(self._mapToScene, x, y)
+
+#___________________________________________________________________________________________________ sceneToMap
+    def sceneToMap(self, x, z):
+        """ Converts scene coordinates to map coordinates and returns them as an (x, y) tuple of
+            numpy arrays. """
+        return self._transform(self._sceneToMap, x, z)
+
+#___________________________________________________________________________________________________ sceneToFederal
+    def sceneToFederal(self, x, z):
+        """ Converts scene coordinates to federal coordinates and returns them as an
+            (east, north) tuple of numpy arrays. """
+        return self._transform(self._sceneToFederal, x, z)
+
+#___________________________________________________________________________________________________ federalToScene
+    def federalToScene(self, east, north):
+        """ Converts federal coordinates to scene coordinates and returns them as an (x, z) tuple
+            of numpy arrays. """
+        return self._transform(self._federalToScene, east, north)
+
+#___________________________________________________________________________________________________ mapToFederal
+    def mapToFederal(self, x, y):
+        """ Converts map coordinates to federal coordinates and returns them as an (east, north)
+            tuple of numpy arrays. """
+        return self._transform(self._mapToFederal, x, y)
+
+#___________________________________________________________________________________________________ federalToMap
+    def federalToMap(self, east, north):
+        """ Converts federal coordinates to map coordinates and returns them as an (x, y) tuple of
+            numpy arrays. """
+        return self._transform(self._federalToMap, east, north)
+
+#___________________________________________________________________________________________________ sceneToMapUncertainty
+    def sceneToMapUncertainty(self, xUnc, zUnc):
+        """ Scales scene uncertainties in cm to map uncertainties, returned as an (x, y) tuple of
+            numpy arrays. """
+        return self._transformUncertainty(self._sceneToMap, xUnc, zUnc)
+
+#___________________________________________________________________________________________________ sceneToFederalUncertainty
+    def sceneToFederalUncertainty(self, xUnc, zUnc):
+        """ Scales scene uncertainties in cm to federal uncertainties in meters, returned as an
+            (east, north) tuple of numpy arrays. """
+        return self._transformUncertainty(self._sceneToFederal, xUnc, zUnc)
+
+#___________________________________________________________________________________________________ trackArrayToMap
+    def trackArrayToMap(self, trackArray):
+        """ Converts the positions and position uncertainties of every track within the specified
+            TrackArray to map coordinates, returned as an (x, y, xUnc, yUnc) tuple of numpy arrays.
+            The TrackArray positions are in meters and are converted to scene cm first. """
+
+        x, y = self.sceneToMap(100.0*trackArray.x, 100.0*trackArray.z)
+        xUnc, yUnc = self.sceneToMapUncertainty(100.0*trackArray.xUnc, 100.0*trackArray.zUnc)
+        return x, y, xUnc, yUnc
+
+#___________________________________________________________________________________________________ trackArrayToFederal
+    def trackArrayToFederal(self, trackArray):
+        """ Converts the positions and position uncertainties of every track within the specified
+            TrackArray to federal coordinates, returned as an (east, north, eastUnc, northUnc)
+            tuple of numpy arrays in meters. """
+
+        east, north = self.sceneToFederal(100.0*trackArray.x, 100.0*trackArray.z)
+        eastUnc, northUnc = self.sceneToFederalUncertainty(
+            100.0*trackArray.xUnc, 100.0*trackArray.zUnc)
+        return east, north, eastUnc, northUnc
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _transform
+    @classmethod
+    def _transform(cls, matrix, u, v):
+        """ Applies the affine matrix to the points with the specified coordinates. """
+
+        u = np.asarray(u, dtype=np.float64)
+        v = np.asarray(v, dtype=np.float64)
+        return (
+            matrix[0, 0]*u + matrix[0, 1]*v + matrix[0, 2],
+            matrix[1, 0]*u + matrix[1, 1]*v + matrix[1, 2] )
+
+#___________________________________________________________________________________________________ _transformUncertainty
+    @classmethod
+    def _transformUncertainty(cls, matrix, uUnc, vUnc):
+        """ Propagates the uncertainties through the linear part of the affine matrix. Absolute
+            values are used so that axis reflections do not produce negative uncertainties. """
+
+        linear = np.abs(matrix[:2, :2])
+        uUnc   = np.asarray(uUnc, dtype=np.float64)
+        vUnc   = np.asarray(vUnc, dtype=np.float64)
+        return (
+            linear[0, 0]*uUnc + linear[0, 1]*vUnc,
+            linear[1, 0]*uUnc + linear[1, 1]*vUnc )
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
@@ -0,0 +1,112 @@
+# TrackArray.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import numpy as np
+from pyaid.number.NumericUtils import NumericUtils
+
+from cadence.analysis.shared.PositionValue2D import PositionValue2D
+
+#*************************************************************************************************** TrackArray
+class TrackArray(object):
+    """ A columnar representation of a list of tracks, such as a track series, trackway or sitemap,
+        in which the spatial properties of the tracks are stored as numpy arrays. The positions and
+        their uncertainties, which the xValue and zValue properties of each track compute one at a
+        time, are calculated for every track in a single vectorized pass. Entries are stored in the
+        same order as the tracks from which the array was created. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, tracks):
+        """Creates a new instance of TrackArray."""
+
+        self._tracks  = list(tracks)
+        self._indexes = dict((t.uid, i) for i, t in enumerate(self._tracks))
+
+        def column(name):
+            return np.array([getattr(t, name) for t in self._tracks], dtype=np.float64)
+
+        self.rotation            = column('rotation')
+        self.rotationUncertainty = column('rotationUncertainty')
+        self.width               = column('width')
+        self.widthUncertainty    = column('widthUncertainty')
+        self.length              = column('length')
+        self.lengthUncertainty   = column('lengthUncertainty')
+
+        # Positions in units of meters
+        self.x = 0.01*column('x')
+        self.z = 0.01*column('z')
+
+        r    = np.pi/180.0*self.rotation
+        rUnc = np.pi/180.0*self.rotationUncertainty
+        wUnc = self.widthUncertainty
+        lUnc = self.lengthUncertainty
+        sin  = np.sin(r)
+        cos  = np.cos(r)
+
+        self.xUnc = lUnc*np.abs(sin) + wUnc*np.abs(cos) + rUnc*np.abs(lUnc*cos - wUnc*sin)
+        self.zUnc = lUnc*np.abs(cos) + wUnc*np.abs(sin) + rUnc*np.abs(wUnc*cos - lUnc*sin)
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: tracks
+    @property
+    def tracks(self):
+        """ The list of tracks represented by this array in index order. """
+        return self._tracks
+
+#___________________________________________________________________________________________________ GS: uids
+    @property
+    def uids(self):
+        """ A list of the uids of the tracks in index order. """
+        return [t.uid for t in self._tracks]
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ indexOf
+    def indexOf(self, uid):
+        """ Returns the index of the track with the specified uid within the arrays, or -1 if no
+            such track is represented by this array. """
+        return self._indexes.get(uid, -1)
+
+#___________________________________________________________________________________________________ getXValue
+    def getXValue(self, index):
+        """ Returns the x value of the track at the specified index as an uncertainty named tuple
+            in units of meters, equivalent to the xValue property of the track. """
+        return NumericUtils.toValueUncertainty(self.x[index], self.xUnc[index])
+
+#___________________________________________________________________________________________________ getZValue
+    def getZValue(self, index):
+        """ Returns the z value of the track at the specified index as an uncertainty named tuple
+            in units of meters, equivalent to the zValue property of the track. """
+        return NumericUtils.toValueUncertainty(self.z[index], self.zUnc[index])
+
+#___________________________________________________________________________________________________ getPositionValue
+    def getPositionValue(self, index):
+        """ Returns a PositionValue2D instance for the track at the specified index, equivalent to
+            the positionValue property of the track. """
+        p2d = PositionValue2D()
+        p2d.xFromUncertaintyValue(self.getZValue(index))
+        p2d.yFromUncertaintyValue(self.getXValue(index))
+        return p2d
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __len__
+    def __len__(self):
+        return len(self._tracks)
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
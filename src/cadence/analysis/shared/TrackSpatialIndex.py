@@ -0,0 +1,246 @@
+# TrackSpatialIndex.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import math
+
+import numpy as np
+
+#*************************************************************************************************** TrackSpatialIndex
+class TrackSpatialIndex(object):
+    """ A uniform grid spatial index of tracks by their x and z scene coordinates, which are in
+        centimeters, supporting nearest neighbour, radius and bounding box queries without
+        comparing every pair of tracks. The index is immutable and must be recreated when the
+        positions of the indexed tracks change. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Average number of tracks per grid cell used when no cell size is specified
+    _TRACKS_PER_CELL = 4.0
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, tracks, cellSize =None):
+        """ Creates a new instance of TrackSpatialIndex.
+
+            tracks :: List
+                The tracks to index.
+
+            [cellSize] :: Number :: None
+                The width of the square grid cells in centimeters. If not specified, a size is
+                chosen such that each cell holds a few tracks on average. """
+
+        self._tracks = list(tracks)
+        self._x      = np.array([t.x for t in self._tracks], dtype=np.float64)
+        self._z      = np.array([t.z for t in self._tracks], dtype=np.float64)
+        self._cells  = dict()
+        self._lookup = dict((id(t), i) for i, t in enumerate(self._tracks))
+
+        if not self._tracks:
+            self._minX = self._minZ = 0.0
+            self._cellSize  = float(cellSize) if cellSize else 1.0
+            self._cellCount = (0, 0)
+            return
+
+        self._minX = float(self._x.min())
+        self._minZ = float(self._z.min())
+        spanX      = float(self._x.max()) - self._minX
+        spanZ      = float(self._z.max()) - self._minZ
+
+        if not cellSize:
+            area     = max(spanX, 1.0)*max(spanZ, 1.0)
+            cellSize = math.sqrt(self._TRACKS_PER_CELL*area/len(self._tracks))
+        self._cellSize  = max(float(cellSize), 1.0)
+        self._cellCount = (
+            int(spanX//self._cellSize) + 1,
+            int(spanZ//self._cellSize) + 1)
+
+        cellsX = ((self._x - self._minX)//self._cellSize).astype(np.int64)
+        cellsZ = ((self._z - self._minZ)//self._cellSize).astype(np.int64)
+        for index, key in enumerate(zip(cellsX.tolist(), cellsZ.tolist())):
+            self._cells.setdefault(key, []).append(index)
+
+        for key, indexes in self._cells.items():
+            self._cells[key] = np.array(indexes, dtype=np.int64)
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: tracks
+    @property
+    def tracks(self):
+        """ The list of indexed tracks. """
+        return self._tracks
+
+#___________________________________________________________________________________________________ GS: cellSize
+    @property
+    def cellSize(self):
+        """ The width of the square grid cells in centimeters. """
+        return self._cellSize
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ getNearest
+    def getNearest(self, x, z, count =1, exclude =None):
+        """ Returns a list of up to count (track, distance) tuples for the tracks nearest to the
+            specified scene position, ordered by increasing distance in centimeters.
+
+            [exclude] :: List :: None
+                Tracks that should not be included in the results, e.g. the track at the specified
+                position. """
+
+        if count < 1 or not self._tracks:
+            return []
+
+        exclude = self._getExcludedIndexes(exclude)
+        cellX, cellZ = self._getCell(x, z)
+        maxRadius = max(
+            abs(cellX), abs(cellX - self._cellCount[0]),
+            abs(cellZ), abs(cellZ - self._cellCount[1]))
+
+        # Expand the search square ring by ring. Tracks outside of a square of the given radius
+        # (in cells) are at least radius*cellSize away, so the search can stop as soon as that
+        # distance exceeds the distance of the farthest of the nearest tracks found so far.
+        indexes = []
+        radius  = 0
+        while True:
+            indexes.extend(self._getRingIndexes(cellX, cellZ, radius))
+            if indexes:
+                candidates = self._removeExcluded(np.concatenate(indexes), exclude)
+                distances  = np.hypot(self._x[candidates] - x, self._z[candidates] - z)
+                if len(candidates) >= count:
+                    order = np.argsort(distances, kind='mergesort')[:count]
+                    if distances[order[-1]] <= radius*self._cellSize or radius >= maxRadius:
+                        break
+                elif radius >= maxRadius:
+                    order = np.argsort(distances, kind='mergesort')
+                    break
+            elif radius >= maxRadius:
+                return []
+            radius += 1
+
+        return [(self._tracks[candidates[i]], float(distances[i])) for i in order]
+
+#___________________________________________________________________________________________________ getWithinRadius
+    def getWithinRadius(self, x, z, radius, exclude =None):
+        """ Returns a list of (track, distance) tuples for every track within the specified radius
+            of the scene position, both in centimeters, ordered by increasing distance.
+
+            [exclude] :: List :: None
+                Tracks that should not be included in the results. """
+
+        candidates = self._getBoundsIndexes(x - radius, z - radius, x + radius, z + radius)
+        candidates = self._removeExcluded(candidates, self._getExcludedIndexes(exclude))
+        distances  = np.hypot(self._x[candidates] - x, self._z[candidates] - z)
+
+        inside     = distances <= radius
+        candidates = candidates[inside]
+        distances  = distances[inside]
+        order      = np.argsort(distances, kind='mergesort')
+        return [(self._tracks[candidates[i]], float(distances[i])) for i in order]
+
+#___________________________________________________________________________________________________ getInBounds
+    def getInBounds(self, minX, minZ, maxX, maxZ):
+        """ Returns a list of the tracks whose scene positions lie within the specified bounding
+            box, inclusive of its edges, in index order. """
+
+        candidates = self._getBoundsIndexes(minX, minZ, maxX, maxZ)
+        inside = (self._x[candidates] >= minX) & (self._x[candidates] <= maxX) \
+            & (self._z[candidates] >= minZ) & (self._z[candidates] <= maxZ)
+        return [self._tracks[i] for i in np.sort(candidates[inside])]
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getCell
+    def _getCell(self, x, z):
+        return (
+            int(math.floor((x - self._minX)/self._cellSize)),
+            int(math.floor((z - self._minZ)/self._cellSize)) )
+
+#___________________________________________________________________________________________________ _getRingIndexes
+    def _getRingIndexes(self, cellX, cellZ, radius):
+        """ Returns a list of the index arrays for the cells on the square ring at the specified
+            radius, in cells, around the specified cell. """
+
+        if radius == 0:
+            keys = [(cellX, cellZ)]
+        else:
+            keys = []
+            for offset in range(-radius, radius + 1):
+                keys.append((cellX + offset, cellZ - radius))
+                keys.append((cellX + offset, cellZ + radius))
+            for offset in range(-radius + 1, radius):
+                keys.append((cellX - radius, cellZ + offset))
+                keys.append((cellX + radius, cellZ + offset))
+
+        return [self._cells[key] for key in keys if key in self._cells]
+
+#___________________________________________________________________________________________________ _getBoundsIndexes
+    def _getBoundsIndexes(self, minX, minZ, maxX, maxZ):
+        """ Returns an array of the indexes of the tracks within the grid cells that overlap the
+            specified bounding box. """
+
+        if not self._tracks or maxX < minX or maxZ < minZ:
+            return np.zeros(0, dtype=np.int64)
+
+        startX, startZ = self._getCell(minX, minZ)
+        endX, endZ     = self._getCell(maxX, maxZ)
+        startX = max(startX, 0)
+        startZ = max(startZ, 0)
+        endX   = min(endX, self._cellCount[0] - 1)
+        endZ   = min(endZ, self._cellCount[1] - 1)
+
+        indexes = []
+        if (endX - startX + 1)*(endZ - startZ + 1) > len(self._cells):
+            for (cx, cz), cellIndexes in self._cells.items():
+                if startX <= cx <= endX and startZ <= cz <= endZ:
+                    indexes.append(cellIndexes)
+        else:
+            for cx in range(startX, endX + 1):
+                for cz in range(startZ, endZ + 1):
+                    cellIndexes = self._cells.get((cx, cz))
+                    if cellIndexes is not None:
+                        indexes.append(cellIndexes)
+
+        if not indexes:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(indexes)
+
+#___________________________________________________________________________________________________ _getExcludedIndexes
+    def _getExcludedIndexes(self, exclude):
+        """ Returns a boolean mask that is False for the indexes of the excluded tracks, or None
+            if no indexed tracks are excluded. """
+
+        indexes = [self._lookup[id(t)] for t in exclude or [] if id(t) in self._lookup]
+        if not indexes:
+            return None
+
+        mask = np.ones(len(self._tracks), dtype=bool)
+        mask[indexes] = False
+        return mask
+
+#___________________________________________________________________________________________________ _removeExcluded
+    @classmethod
+    def _removeExcluded(cls, indexes, excluded):
+        if excluded is None:
+            return indexes
+        return indexes[excluded[indexes]]
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __len__
+    def __len__(self):
+        return len(self._tracks)
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
@@ -4,6 +4,7 @@
 
 from __future__ import print_function, absolute_import, unicode_literals, division
 
+import numpy as np
 from pyaid.number.NumericUtils import NumericUtils
 
 from cadence.analysis.AnalysisStage import AnalysisStage
@@ -29,7 +30,7 @@ class SpatialUncertaintyStage(AnalysisStage):
 
         self._uncs        = []
         self._largeUncCsv = None
-        self._tracks      = []
+        self._arrays      = []
 
 #===================================================================================================
 #                                                                               P R O T E C T E D
@@ -37,7 +38,7 @@ class SpatialUncertaintyStage(AnalysisStage):
 #___________________________________________________________________________________________________ _preAnalyze
     def _preAnalyze(self):
         self._uncs = []
-        self._tracks = []
+        self._arrays = []
 
         csv = CsvWriter()
         csv.path = self.getPath('Large-Spatial-Uncertainties.csv')
@@ -49,13 +50,14 @@ class SpatialUncertaintyStage(AnalysisStage):
             ('z', 'Z') )
         self._largeUncCsv = csv
 
-#___________________________________________________________________________________________________ _anal
-    def _analyzeTrack(self, track, series, trackway, sitemap):
-        self._tracks.append(track)
-        x = track.xValue
-        self._uncs.append(x.uncertainty)
-        z = track.zValue
-        self._uncs.append(z.uncertainty)
+#___________________________________________________________________________________________________ _analyzeTrackSeries
+    def _analyzeTrackSeries(self, series, trackway, sitemap):
+        if self._seriesCallback and not self._seriesCallback(self, series, trackway, sitemap):
+            return
+
+        trackArray = series.trackArray
+        self._arrays.append(trackArray)
+        self._uncs.extend(np.column_stack((trackArray.xUnc, trackArray.zUnc)).ravel().tolist())
 
 #___________________________________________________________________________________________________ _postAnalyze
     def _postAnalyze(self):
@@ -81,33 +83,38 @@ class SpatialUncertaintyStage(AnalysisStage):
         #-------------------------------------------------------------------------------------------
         # FIND LARGE UNCERTAINTY TRACKS
         largeUncertaintyCount = 0
-        for t in self._tracks:
-            x = t.xValue
-            z = t.zValue
-            if max(x.uncertainty, z.uncertainty) <= 2.0*average.uncertainty:
-                continue
-
-            largeUncertaintyCount += 1
-            self._largeUncCsv.createRow(
-                uid=t.uid,
-                fingerprint=t.fingerprint,
-                x=x.label,
-                z=z.label)
-
-            #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-            # TODO: [KENT] MAP UNCERTAIN TRACKS
-            #       Here t is an instance of a track that has a large uncertainty value (in excess
-            #       of 2 standard deviations) and should be noted on the map file. I've assigned a
-            #       few variables here that you'll need to add this to the output map file.
-            xSigmas = x.uncertainty
-            zSigmas = z.uncertainty
-            sitemap = t.trackSeries.trackway.sitemap
+        trackCount            = 0
+        for trackArray in self._arrays:
+            trackCount += len(trackArray)
+            indexes = np.flatnonzero(
+                np.maximum(trackArray.xUnc, trackArray.zUnc) > 2.0*average.uncertainty)
+
+            for index in indexes:
+                t = trackArray.tracks[index]
+                x = trackArray.getXValue(index)
+                z = trackArray.getZValue(index)
+                largeUncertaintyCount += 1
+                self._largeUncCsv.createRow(
+                    uid=t.uid,
+                    fingerprint=t.fingerprint,
+                    x=x.label,
+                    z=z.label)
+
+                #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                # TODO: [KENT] MAP UNCERTAIN TRACKS
+                #       Here t is an instance of a track that has a large uncertainty value (in
+                #       excess of 2 standard deviations) and should be noted on the map file. I've
+                #       assigned a few variables here that you'll need to add this to the output
+                #       map file.
+                xSigmas = x.uncertainty
+                zSigmas = z.uncertainty
+                sitemap = t.trackSeries.trackway.sitemap
 
         self.logger.write('%s Tracks with large spatial uncertainties found (%s%%)' % (
             largeUncertaintyCount, NumericUtils.roundToOrder(
-                100.0*float(largeUncertaintyCount)/float(len(self._tracks)), -1) ))
+                100.0*float(largeUncertaintyCount)/float(trackCount), -1) ))
 
         self._largeUncCsv.save()
-        self._tracks = []
+        self._arrays = []
 
 
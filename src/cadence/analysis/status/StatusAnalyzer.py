@@ -21,12 +21,22 @@ class StatusAnalyzer(AnalyzerBase):
     def __init__(self, **kwargs):
         """Creates a new instance of StatusAnalyzer."""
         super(StatusAnalyzer, self).__init__(**kwargs)
-        self.addStage(TrackwayLoadStage('load', self))
-        self.addStage(SpatialUncertaintyStage('spatialUncertainty', self))
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ createStages
+    @classmethod
+    def createStages(cls, owner =None):
+        return [
+            TrackwayLoadStage('load', owner),
+            SpatialUncertaintyStage('spatialUncertainty', owner) ]
 
 ####################################################################################################
 ####################################################################################################
 
 #___________________________________________________________________________________________________ RUN MAIN
 if __name__ == '__main__':
-    StatusAnalyzer().run()
+    import sys
+    from cadence.analysis.AnalyzerRunner import AnalyzerRunner
+    sys.exit(AnalyzerRunner.run(['StatusAnalyzer'] + sys.argv[1:]))
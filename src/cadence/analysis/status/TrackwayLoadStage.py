@@ -36,6 +36,7 @@ class TrackwayLoadStage(AnalysisStage):
         self._unknownCsv        = None
         self._unprocessedCsv    = None
         self._soloTrackCsv      = None
+        self._overlapCsv        = None
         self._allTracks         = None
 
 #===================================================================================================
@@ -51,6 +52,17 @@ class TrackwayLoadStage(AnalysisStage):
             ('fingerprint', 'Fingerprint') )
         self._soloTrackCsv = csv
 
+        csv = CsvWriter()
+        csv.path = self.getPath('Overlapping-Track-Report.csv')
+        csv.autoIndexFieldName = 'Index'
+        csv.addFields(
+            ('uid', 'UID'),
+            ('fingerprint', 'Fingerprint'),
+            ('overlapUid', 'Overlapping UID'),
+            ('overlapFingerprint', 'Overlapping Fingerprint'),
+            ('distance', 'Separation (cm)') )
+        self._overlapCsv = csv
+
         csv = CsvWriter()
         csv.path = self.getPath('Unprocessed-Track-Report.csv')
         csv.autoIndexFieldName = 'Index'
@@ -114,10 +126,9 @@ class TrackwayLoadStage(AnalysisStage):
         #       This list is used to find tracks that are not referenced by relationships to
         #       sitemaps, which would never be loaded by standard analysis methods
         model = Tracks_Track.MASTER
-        session = model.createSession()
+        session = self.owner.getTracksSession()
         for t in session.query(model).all():
             self._allTracks[t.uid] = {'uid':t.uid, 'fingerprint':t.fingerprint}
-        session.close()
 
 #___________________________________________________________________________________________________ _analyzeSitemap
     # noinspection PyUnusedLocal
@@ -177,6 +188,12 @@ class TrackwayLoadStage(AnalysisStage):
                 sitemap=sitemap.filename)
             processed.append(t)
 
+        #-------------------------------------------------------------------------------------------
+        # OVERLAPPING TRACKS
+        #       Use the spatial index of the sitemap to find visible tracks whose centers lie
+        #       within half the width of another visible track, which are likely duplicate entries
+        self._findOverlappingTracks(sitemap)
+
         #-------------------------------------------------------------------------------------------
         # TRACKWAYS
         #       Iterate over the trackways within the current site
@@ -248,6 +265,37 @@ class TrackwayLoadStage(AnalysisStage):
             completion=completion,
             unprocessed=smUnprocessed)
 
+#___________________________________________________________________________________________________ _findOverlappingTracks
+    def _findOverlappingTracks(self, sitemap):
+        """ Adds a row to the overlapping track report for each pair of visible tracks within the
+            sitemap whose centers are separated by less than half the width of either track. """
+
+        index = sitemap.getSpatialIndex()
+        for t in index.tracks:
+            if t.hidden:
+                continue
+
+            # Track widths are in meters while scene coordinates are in centimeters
+            radius = 50.0*max(t.width, t.widthMeasured)
+            if radius <= 0.0:
+                continue
+
+            for other, distance in index.getWithinRadius(t.x, t.z, radius, exclude=[t]):
+                if other.hidden:
+                    continue
+
+                # Skip pairs already reported when the other track was the subject
+                otherRadius = 50.0*max(other.width, other.widthMeasured)
+                if distance <= otherRadius and other.uid < t.uid:
+                    continue
+
+                self._overlapCsv.createRow(
+                    uid=t.uid,
+                    fingerprint=t.fingerprint,
+                    overlapUid=other.uid,
+                    overlapFingerprint=other.fingerprint,
+                    distance=NumericUtils.roundToOrder(distance, -2))
+
 #___________________________________________________________________________________________________ _postAnalyze
     def _postAnalyze(self):
         count       = self.count
@@ -260,6 +308,8 @@ class TrackwayLoadStage(AnalysisStage):
         self.logger.write('UNKNOWN TRACK COUNT: %s' % self._unknownCsv.count)
         self._unknownCsv.save()
 
+        self.logger.write('OVERLAPPING TRACK COUNT: %s' % self._overlapCsv.count)
+        self._overlapCsv.save()
         self._soloTrackCsv.save()
         self._unprocessedCsv.save()
         self._trackwayCsv.save()
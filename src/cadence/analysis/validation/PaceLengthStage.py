@@ -23,9 +23,23 @@ class PaceLengthStage(AnalysisStage):
 #===================================================================================================
 #                                                                                       C L A S S
 
+    FUSABLE = True
+
+    CACHE_VERSION = 1
+
+    ENTRY_TRACK_FIELDS = ('track', 'pairTrack')
+    TRACK_CACHE_KEY    = 'paceData'
+
+    SHARD_ACCUMULATORS = {
+        'entries':AnalysisStage.MERGE_EXTEND,
+        'noData':AnalysisStage.MERGE_SUM,
+        'count':AnalysisStage.MERGE_SUM }
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, key, owner, **kwargs):
         """Creates a new instance of PaceLengthStage."""
+        kwargs.setdefault('dependencies', [])
+        kwargs.setdefault('outputs', ['paceData'])
         super(PaceLengthStage, self).__init__(
             key, owner,
             label='Pace Length',
@@ -80,30 +94,35 @@ class PaceLengthStage(AnalysisStage):
     def _analyzeSeriesPair(self, series, pair):
         """_analyzeSeriesPair doc..."""
 
+        paces      = series.getSnapshotValues(SnapshotDataEnum.PACE)
+        trackArray = series.trackArray
+        pairArray  = pair.trackArray
+
         for index in range(series.count):
             track   = series.tracks[index]
-            data    = track.snapshotData
-            pace    = data.get(SnapshotDataEnum.PACE)
-            if pace is None:
+            pace    = paces[index]
+            if np.isnan(pace):
                 self.noData += 1
                 continue
 
             pace = float(pace)
-            position = track.positionValue
+            position = trackArray.getPositionValue(index)
 
             if track != series.tracks[-1]:
                 nextTrack = series.tracks[index + 1]
                 if track.next != nextTrack.uid:
                     self.logger.write('[ERROR]: Invalid track ordering (%s -> %s)' % (
                         track.uid, nextTrack.uid))
-                nextPosition = nextTrack.positionValue
+                nextPosition = trackArray.getPositionValue(index + 1)
             elif index == 0:
                 continue
             else:
                 # Extrapolate using the position of the previous print to get a nextPosition
                 # value for use in finding the pace track pair
                 lastTrack = series.tracks[index - 1]
-                line = LineSegment2D(start=lastTrack.positionValue, end=position)
+                line = LineSegment2D(
+                    start=trackArray.getPositionValue(index - 1),
+                    end=position)
                 try:
                     line.postExtendLine(line.length.raw)
                 except Exception:
@@ -121,16 +140,19 @@ class PaceLengthStage(AnalysisStage):
             if track.fingerprint.startswith('BEB-515-2009-1-S-21-L-M'):
                 print(track.fingerprint)
 
-            for pt in pair.tracks:
-                try:
-                    pos = pt.positionValue
-                    d = nextPosition.distanceTo(pos).raw + position.distanceTo(pos).raw
-                except Exception:
-                    continue
+            # Find the pair track with the smallest combined distance to this track and the next
+            # one for all pair tracks at once. The 2D positions map z -> x and x -> y. Pair tracks
+            # that coincide with either position have no valid separation and are excluded.
+            nextDistances = np.hypot(pairArray.z - nextPosition.x, pairArray.x - nextPosition.y)
+            distances     = np.hypot(pairArray.z - position.x, pairArray.x - position.y)
+            combined      = np.where(
+                (nextDistances > 0.0) & (distances > 0.0), nextDistances + distances, np.inf)
 
-                if d < distance:
-                    pairTrack = pt
-                    distance = d
+            if len(combined):
+                pairIndex = int(np.argmin(combined))
+                if combined[pairIndex] < distance:
+                    pairTrack = pairArray.tracks[pairIndex]
+                    distance  = combined[pairIndex]
 
             if not pairTrack:
                 self.logger.write([
@@ -140,7 +162,7 @@ class PaceLengthStage(AnalysisStage):
                 continue
 
             try:
-                entered = position.distanceTo(pairTrack.positionValue)
+                entered = position.distanceTo(pairArray.getPositionValue(pairIndex))
             except Exception:
                 self.logger.write([
                     '[WARNING]: Invalid track separation of 0.0. Ignoring track',
@@ -23,9 +23,22 @@ class StrideLengthStage(AnalysisStage):
 #===================================================================================================
 #                                                                                       C L A S S
 
+    FUSABLE = True
+
+    CACHE_VERSION = 1
+
+    ENTRY_TRACK_FIELDS = ('track',)
+    TRACK_CACHE_KEY    = 'strideData'
+
+    SHARD_ACCUMULATORS = {
+        'entries':AnalysisStage.MERGE_EXTEND,
+        'noData':AnalysisStage.MERGE_SUM }
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, key, owner, **kwargs):
         """Creates a new instance of StrideLengthStage."""
+        kwargs.setdefault('dependencies', [])
+        kwargs.setdefault('outputs', ['strideData'])
         super(StrideLengthStage, self).__init__(
             key, owner,
             label='Stride Length',
@@ -59,11 +72,12 @@ class StrideLengthStage(AnalysisStage):
 #___________________________________________________________________________________________________ _analyzeTrackSeries
     def _analyzeTrackSeries(self, series, trackway, sitemap):
 
+        strides = series.getSnapshotValues(SnapshotDataEnum.STRIDE_LENGTH)
+
         for index in ListUtils.range(series.count - 1):
             track   = series.tracks[index]
-            data    = track.snapshotData
-            stride  = data.get(SnapshotDataEnum.STRIDE_LENGTH)
-            if stride is None:
+            stride  = strides[index]
+            if np.isnan(stride):
                 self.noData += 1
                 continue
 
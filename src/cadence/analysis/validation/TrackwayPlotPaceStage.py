@@ -19,9 +19,12 @@ class TrackwayPlotPaceStage(AnalysisStage):
 #===================================================================================================
 #                                                                                       C L A S S
 
+    FUSABLE = True
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, key, owner, **kwargs):
         """Creates a new instance of TrackwayPlotPaceStage."""
+        kwargs.setdefault('dependencies', ['paceData'])
         super(TrackwayPlotPaceStage, self).__init__(
             key, owner,
             label='Pace Length Plotting',
@@ -35,7 +38,7 @@ class TrackwayPlotPaceStage(AnalysisStage):
     def _analyzeTrackway(self, trackway, sitemap):
         pl = self.plot
 
-        self.owner.createFigure(trackway.uid)
+        self.owner.createFigure(self._getFigureKey(trackway))
         pl.xlabel('Track Index')
         pl.ylabel('Pace Length (m)')
         pl.title(trackway.name)
@@ -43,9 +46,18 @@ class TrackwayPlotPaceStage(AnalysisStage):
 
         super(TrackwayPlotPaceStage, self)._analyzeTrackway(trackway, sitemap)
 
+#___________________________________________________________________________________________________ _postAnalyzeTrackway
+    def _postAnalyzeTrackway(self, trackway, sitemap):
+        key = self._getFigureKey(trackway)
         if trackway.cache.get('doPacePlot', False):
-            self._paths.append(self.owner.saveFigure(trackway.uid))
-        self.owner.closeFigure(trackway.uid)
+            self._paths.append(self.owner.saveFigure(key))
+        self.owner.closeFigure(key)
+
+#___________________________________________________________________________________________________ _getFigureKey
+    def _getFigureKey(self, trackway):
+        """ Figures are keyed by stage as well as trackway, as the plots of other stages for the
+            same trackway can be open at the same time during a fused traversal. """
+        return '%s-%s' % (self.key, trackway.uid)
 
 #___________________________________________________________________________________________________ _analyzeTrackSeries
     def _analyzeTrackSeries(self, series, trackway, sitemap):
@@ -60,7 +72,7 @@ class TrackwayPlotPaceStage(AnalysisStage):
         error = []
         lw    = []
 
-        self.owner.getFigure(trackway.uid)
+        self.owner.getFigure(self._getFigureKey(trackway))
         for track in series.tracks:
             entry = track.cache.get('paceData')
             if not entry:
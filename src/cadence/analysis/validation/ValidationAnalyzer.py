@@ -24,16 +24,26 @@ class ValidationAnalyzer(AnalyzerBase):
 #___________________________________________________________________________________________________ __init__
     def __init__(self, **kwargs):
         """Creates a new instance of ValidationAnalyzer."""
+        kwargs.setdefault('readOnly', True)
         super(ValidationAnalyzer, self).__init__(**kwargs)
-        self.addStage(StrideLengthStage('strideLength', self))
-        self.addStage(TrackwayPlotStrideStage('stridePlots', self))
-        self.addStage(PaceLengthStage('paceLength', self))
-        self.addStage(TrackwayPlotPaceStage('pacePlots', self))
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ createStages
+    @classmethod
+    def createStages(cls, owner =None):
+        return [
+            StrideLengthStage('strideLength', owner),
+            TrackwayPlotStrideStage('stridePlots', owner),
+            PaceLengthStage('paceLength', owner),
+            TrackwayPlotPaceStage('pacePlots', owner) ]
 
 ####################################################################################################
 ####################################################################################################
 
 #___________________________________________________________________________________________________ RUN MAIN
 if __name__ == '__main__':
-    ValidationAnalyzer().run()
-
+    import sys
+    from cadence.analysis.AnalyzerRunner import AnalyzerRunner
+    sys.exit(AnalyzerRunner.run(['ValidationAnalyzer'] + sys.argv[1:]))
@@ -37,7 +37,6 @@ class TrackCsvImporter(object):
         self._path    = path
         self.created  = []
         self.modified = []
-        self.fingerprints = dict()
         self._logger  = logger
         if not logger:
             self._logger = Logger(self, printOut=True)
@@ -228,16 +227,15 @@ class TrackCsvImporter(object):
 
         #-------------------------------------------------------------------------------------------
         # FIND EXISTING
-        #       Use data set above to attempt to load the track database entry
+        #       Use data set above to attempt to load the track database entry. Track stores
+        #       created by earlier rows of this import have already been flushed with their csv
+        #       index, so a repeated entry is found here as ambiguous as well.
         fingerprint = ts.fingerprint
         existingStore = ts.findExistingTracks(session)
         if existingStore and not isinstance(existingStore, Tracks_TrackStore):
             existingStore = existingStore[0]
 
-        if (existingStore and existingStore.index != csvIndex) or fingerprint in self.fingerprints:
-            if not existingStore:
-                existingStore = self.fingerprints[fingerprint]
-
+        if existingStore and existingStore.index != csvIndex:
             self._writeError({
                 'message':u'Ambiguous track entry [#%s -> #%s]' % (csvIndex, existingStore.index),
                 'data':csvRowData,
@@ -266,8 +264,6 @@ class TrackCsvImporter(object):
                 self._logger.write(u'<div>REMOVED TRACK: "%s"</div>' % fingerprint)
             return False
 
-        self.fingerprints[fingerprint] = ts
-
         if existingStore:
             ts = existingStore
         else:
@@ -552,7 +548,7 @@ class TrackCsvImporter(object):
 
         if 'existing' in data:
             source = {}
-            for n,v in DictUtils.iter(JSON.fromString(data['existing'].snapshot)):
+            for n,v in DictUtils.iter(data['existing'].snapshotData or dict()):
                 source[u' '.join(n.split(u'_')).title()] = v
             result.append(u'CONFLICT: ' + DictUtils.prettyPrint(source))
 
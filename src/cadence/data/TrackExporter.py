@@ -8,8 +8,11 @@ from pyaid.debug.Logger import Logger
 from pyaid.dict.DictUtils import DictUtils
 from pyaid.json.JSON import JSON
 from pyaid.number.NumericUtils import NumericUtils
+from pyaid.radix.Base64 import Base64
 from pyaid.string.StringUtils import StringUtils
 
+from cadence.enums.TrackPropEnum import TrackPropEnumOps
+from cadence.models.tracks.Tracks_Track import Tracks_Track
 from cadence.models.tracks.Tracks_TrackStore import Tracks_TrackStore
 
 #___________________________________________________________________________________________________ TrackExporter
@@ -35,41 +38,64 @@ class TrackExporter(object):
 
 #___________________________________________________________________________________________________ process
     def process(self, session, difference =True):
-        """Doc..."""
+        """ Creates the export results by comparing every track store with its matching track.
+            Both tables are loaded together in a single outer join on uid, which selects only the
+            exported columns, so that track stores without a matching track (deletions) are found
+            as rows with no track values and the remaining rows are compared column by column
+            without loading model instances. """
 
         if self.results is not None:
             return True
 
         results = []
         storeModel = Tracks_TrackStore.MASTER
+        trackModel = Tracks_Track.MASTER
 
         if session is None:
             session = storeModel.createSession()
 
-        trackStores = session.query(storeModel).all()
+        names = TrackPropEnumOps.DATA_NAMES
+        count = len(names) + 2
+
+        query = session.query(*(
+            [storeModel.i, storeModel.uid] + [getattr(storeModel, n) for n in names] +
+            [trackModel.i, trackModel.uid] + [getattr(trackModel, n) for n in names]))
+        rows = query.select_from(storeModel) \
+            .outerjoin(trackModel, trackModel.uid == storeModel.uid) \
+            .order_by(storeModel.i, trackModel.i).all()
+
+        # Only the first matching track is used for each track store should the tracks table
+        # contain duplicate uids
+        entries = []
+        previous = None
+        for row in rows:
+            if row[0] != previous:
+                entries.append((row[:count], row[count:]))
+                previous = row[0]
+
         index = 0
-        indices = NumericUtils.linearSpace(0, len(trackStores), roundToIntegers=True)[1:]
+        indices = NumericUtils.linearSpace(0, len(entries), roundToIntegers=True)[1:]
 
-        for trackStore in trackStores:
-            track = trackStore.getMatchingTrack(session)
-            if track is None:
+        for store, track in entries:
+            if track[0] is None:
                 self.modifications += 1
-                results.append({'uid':trackStore.uid, 'action':self.DELETED_IDENTIFIER})
+                results.append({'uid':store[1], 'action':self.DELETED_IDENTIFIER})
 
                 self.logger.write(
                     u'<div>DELETED: %s</div>' %  DictUtils.prettyPrint(
-                        trackStore.toDict(uniqueOnly=True)))
+                        self._createDict(store, names, uniqueOnly=True)))
             else:
                 if difference:
-                    diff = trackStore.toDiffDict(track.toDict())
+                    diff = self._createDiffDict(store, track, names)
                     if diff is not None:
                         self.modifications += 1
                         results.append(diff)
 
                         self.logger.write(
-                            u'<div>MODIFIED: %s</div>' % trackStore.fingerprint)
+                            u'<div>MODIFIED: %s</div>' % storeModel.getFingerprintFromDict(
+                                self._createDict(store, names, uniqueOnly=True)))
                 else:
-                    results.append(track.toDict())
+                    results.append(self._createDict(track, names))
 
             index += 1
             if index in indices:
@@ -96,6 +122,44 @@ class TrackExporter(object):
                 u'PATH: ' + StringUtils.toUnicode(path)], err)
             return False
 
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _createDict
+    @classmethod
+    def _createDict(cls, values, names, uniqueOnly =False):
+        """ Creates the dictionary representation of a track from a row of column values in the
+            same form as returned by the toDict() method of the track models. """
+
+        out = dict(id=Base64.to64(values[0]), uid=values[1])
+        for name, value in zip(names, values[2:]):
+            if not uniqueOnly or name in TrackPropEnumOps.UNIQUE_NAMES:
+                out[name] = value
+        return out
+
+#___________________________________________________________________________________________________ _createDiffDict
+    @classmethod
+    def _createDiffDict(cls, store, track, names):
+        """ Returns a dictionary of the track values that differ from those of the track store, in
+            the same form as Tracks_TrackStore.toDiffDict(), or None if they do not differ. """
+
+        if store == track:
+            return None
+
+        out = dict()
+        if store[0] != track[0]:
+            out['id'] = Base64.to64(track[0])
+
+        for name, storeValue, trackValue in zip(names, store[2:], track[2:]):
+            if storeValue != trackValue:
+                out[name] = trackValue
+
+        if not out:
+            return None
+
+        out['uid'] = store[1]
+        return out
+
 #===================================================================================================
 #                                                                               I N T R I N S I C
 
@@ -8,6 +8,7 @@ from pyaid.ArgsUtils import ArgsUtils
 from pyglass.threading.RemoteExecutionThread import RemoteExecutionThread
 
 from cadence.data.TrackExporter import TrackExporter
+from cadence.models.SessionFactory import SessionFactory
 from cadence.models.tracks.Tracks_Track import Tracks_Track
 
 #___________________________________________________________________________________________________ TrackExporterRemoteThread
@@ -35,7 +36,7 @@ class TrackExporterRemoteThread(RemoteExecutionThread):
 #___________________________________________________________________________________________________ _runImpl
     def _runImpl(self):
         model   = Tracks_Track.MASTER
-        session = self._session if self._session else model.createSession()
+        session = self._session if self._session else SessionFactory.createSession(model, readOnly=True)
 
         try:
             exporter = TrackExporter(logger=self._log)
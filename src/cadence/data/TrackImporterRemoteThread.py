@@ -9,6 +9,7 @@ from pyglass.threading.RemoteExecutionThread import RemoteExecutionThread
 
 from cadence.data.TrackCsvImporter import TrackCsvImporter
 from cadence.data.TrackJsonImporter import TrackJsonImporter
+from cadence.models.SessionFactory import SessionFactory
 from cadence.models.tracks.Tracks_Track import Tracks_Track
 
 #___________________________________________________________________________________________________ TrackImporterRemoteThread
@@ -38,7 +39,7 @@ class TrackImporterRemoteThread(RemoteExecutionThread):
 #___________________________________________________________________________________________________ _runImpl
     def _runImpl(self):
         model   = Tracks_Track.MASTER
-        session = self._session if self._session else model.createSession()
+        session = self._session if self._session else SessionFactory.createSession(model)
 
         try:
             if self._importType == self.CSV:
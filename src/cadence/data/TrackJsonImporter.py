@@ -163,6 +163,14 @@ class TrackJsonImporter(object):
 #___________________________________________________________________________________________________ _getTrackByProps
     @classmethod
     def _getTrackByProps(cls, data, session, model):
+        """ Returns a list of the tracks matching the uniquely identifying properties within the
+            data dictionary. When the data contains all of those properties the tracks are found
+            by a single fingerprint lookup. """
+
+        fingerprint = model.getFingerprintFromDict(data)
+        if fingerprint is not None:
+            return model.getByFingerprint(fingerprint, session)
+
         searchData = dict()
 
         for name,value in DictUtils.iter(data):
@@ -7,6 +7,7 @@ from __future__ import print_function, absolute_import, unicode_literals, divisi
 from pyglass.threading.RemoteExecutionThread import RemoteExecutionThread
 
 from cadence.data.TrackLinkConnector import TrackLinkConnector
+from cadence.models.SessionFactory import SessionFactory
 from cadence.models.tracks.Tracks_Track import Tracks_Track
 
 #___________________________________________________________________________________________________ TrackLinkageRemoteThread
@@ -29,7 +30,7 @@ class TrackLinkageRemoteThread(RemoteExecutionThread):
 #___________________________________________________________________________________________________ _runImpl
     def _runImpl(self):
         model   = Tracks_Track.MASTER
-        session = self._session if self._session else model.createSession()
+        session = self._session if self._session else SessionFactory.createSession(model)
 
         try:
             tlc = TrackLinkConnector(logger=self._log)
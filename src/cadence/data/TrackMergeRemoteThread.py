@@ -35,7 +35,9 @@ class TrackMergeRemoteThread(RemoteExecutionThread):
         tracks  = self._tracks
 
         if not tracks:
-            tracks = session.query(model).all()
+            # Merging copies every column, so the deferred columns are loaded up front rather than
+            # one track at a time
+            tracks = session.query(model).options(model.getUndeferOption()).all()
 
         counter = IterationCounter(len(tracks), majorIntervalCount=10)
         for track in tracks:
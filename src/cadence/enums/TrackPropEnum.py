@@ -5,6 +5,7 @@
 from __future__ import print_function, absolute_import, unicode_literals, division
 
 from collections import namedtuple
+from operator import attrgetter
 
 from pyaid.reflection.Reflection import Reflection
 
@@ -134,14 +135,39 @@ class TrackPropEnum(object):
 
 #___________________________________________________________________________________________________ TrackPropEnumOps
 class TrackPropEnumOps(object):
-    """ Support class for helper operations related to the TrackPropEnum class. """
+    """ Support class for helper operations related to the TrackPropEnum class. The enumerated
+        values are compiled once into the static tables below so that serialization code can
+        iterate over them directly instead of reflecting on the TrackPropEnum class for each
+        track. """
 
-#___________________________________________________________________________________________________ _getTrackPropEnum
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Every TrackPropEnum value
+    ENUMS = tuple(Reflection.getReflectionList(TrackPropEnum))
+
+    # TrackPropEnum values keyed by their name attribute
+    ENUMS_BY_NAME = dict((enum.name, enum) for enum in ENUMS)
+
+    # Names of every property, of the uniquely identifying properties and of the properties that
+    # are loaded from serialized data, i.e. all but the uid, which is never changed
+    NAMES        = tuple(enum.name for enum in ENUMS)
+    UNIQUE_NAMES = tuple(enum.name for enum in ENUMS if enum.unique)
+    DATA_NAMES   = tuple(enum.name for enum in ENUMS if enum != TrackPropEnum.UID)
+
+    # (name, maya) pairs for the properties represented by Maya node attributes and the Maya
+    # attribute names of those pairs
+    MAYA_PAIRS = tuple((enum.name, enum.maya) for enum in ENUMS if enum.maya)
+    MAYA_NAMES = tuple(pair[1] for pair in MAYA_PAIRS)
+
+    # Accessor functions that return a tuple of the values of the named properties of a track in
+    # a single call, in the order of the corresponding names tuple
+    getValues       = staticmethod(attrgetter(*NAMES))
+    getUniqueValues = staticmethod(attrgetter(*UNIQUE_NAMES))
+    getMayaValues   = staticmethod(attrgetter(*[pair[0] for pair in MAYA_PAIRS]))
+
+#___________________________________________________________________________________________________ getTrackPropEnumByName
     @classmethod
     def getTrackPropEnumByName(cls, name):
         """ Retrieves the TrackPropEnum enumerated value based on the name attribute. """
-
-        for enum in Reflection.getReflectionList(TrackPropEnum):
-            if enum.name == name:
-                return enum
-        return None
+        return cls.ENUMS_BY_NAME.get(name)
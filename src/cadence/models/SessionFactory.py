@@ -0,0 +1,236 @@
+# SessionFactory.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import threading
+
+import sqlalchemy as sqla
+
+#*************************************************************************************************** SessionFactory
+class SessionFactory(object):
+    """ Creates sessions into the Cadence tracks and analysis databases with SQLite connections
+        tuned for concurrent access. Each new connection is given a large page cache and
+        memory-mapped I/O, and relaxed syncing if its database uses write-ahead logging, which
+        lets a reader and a writer (e.g. an analyzer and a UI export) work on the same database
+        file at the same time. Write-ahead logging is a persistent property of the database file
+        that is enabled once by enableWriteAheadLogging() when the application starts, rather
+        than by every connection. Read-only sessions additionally enable the query_only pragma
+        for each of their transactions, which makes any accidental write fail instead of locking
+        the database. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Page cache size in kibibytes per connection, specified as a negative value for SQLite
+    CACHE_SIZE = 64*1024
+
+    # Maximum number of bytes of the database file accessed through memory-mapped I/O
+    MMAP_SIZE = 256*1024*1024
+
+    # Pragmas executed on every new connection, none of which modify the database file
+    PRAGMAS = (
+        'PRAGMA temp_store = MEMORY',
+        'PRAGMA cache_size = -%s' % CACHE_SIZE,
+        'PRAGMA mmap_size = %s' % MMAP_SIZE )
+
+    # Pragmas executed on every new connection to a database that uses write-ahead logging, where
+    # they are safe from corruption on power loss
+    WAL_PRAGMAS = (
+        'PRAGMA synchronous = NORMAL', )
+
+    _LOCK         = threading.RLock()
+    _engines      = set()
+    _shared       = dict()
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ createSession
+    @classmethod
+    def createSession(cls, model, readOnly =False):
+        """ Creates and returns a new session into the database of the specified model class
+            whose connections are tuned for concurrent access. The caller owns the session and is
+            responsible for closing it.
+
+            [readOnly] :: Boolean :: False
+                If True, the session will refuse to write to the database. """
+
+        session = model.createSession()
+        engine  = cls._getEngine(session, model)
+        if engine is None or engine.dialect.name != 'sqlite':
+            return session
+
+        cls.tuneEngine(engine)
+        if readOnly:
+            sqla.event.listen(session, 'after_begin', cls._handleReadOnlyBegin)
+        return session
+
+#___________________________________________________________________________________________________ getSharedSession
+    @classmethod
+    def getSharedSession(cls, model):
+        """ Returns a read-only session into the database of the specified model class that is
+            shared by every caller on the current thread. Sessions are not thread-safe and so
+            each thread is given its own shared session. Every call must be balanced by a call
+            to releaseSharedSession(), and the session is closed when the last user releases
+            it. """
+
+        key = cls._getSharedKey(model)
+        with cls._LOCK:
+            entry = cls._shared.get(key)
+            if entry is None:
+                entry = [cls.createSession(model, readOnly=True), 0]
+                cls._shared[key] = entry
+            entry[1] += 1
+            return entry[0]
+
+#___________________________________________________________________________________________________ releaseSharedSession
+    @classmethod
+    def releaseSharedSession(cls, session):
+        """ Releases a session returned by getSharedSession(), closing it once it is no longer in
+            use. Returns True if the session was closed. """
+
+        with cls._LOCK:
+            for key, entry in list(cls._shared.items()):
+                if entry[0] is not session:
+                    continue
+
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return False
+
+                del cls._shared[key]
+                session.close()
+                return True
+
+        # Sessions not handed out by the factory are closed directly
+        session.close()
+        return True
+
+#___________________________________________________________________________________________________ discardSharedSessions
+    @classmethod
+    def discardSharedSessions(cls):
+        """ Forgets every shared session without closing it, for use within a forked process
+            that inherited the shared sessions of its parent, whose connections belong to the
+            parent and must not be used or closed by the child. """
+
+        with cls._LOCK:
+            cls._shared.clear()
+
+#___________________________________________________________________________________________________ enableWriteAheadLogging
+    @classmethod
+    def enableWriteAheadLogging(cls, model):
+        """ Switches the SQLite database of the specified model class to write-ahead logging if
+            it does not use it already, and returns whether or not the database uses it. The
+            journal mode is stored in the database file, so this only has to succeed once. The
+            switch requires exclusive access to the database and is skipped with a False result
+            if another connection holds a lock on it. """
+
+        session = model.createSession()
+        try:
+            engine = cls._getEngine(session, model)
+        finally:
+            session.close()
+        if engine is None or engine.dialect.name != 'sqlite':
+            return False
+
+        connection = engine.raw_connection()
+        try:
+            if cls._getJournalMode(connection) == 'wal':
+                return True
+            try:
+                cls._executePragmas(connection, ('PRAGMA journal_mode = WAL',))
+            except Exception:
+                return False
+            return cls._getJournalMode(connection) == 'wal'
+        finally:
+            connection.close()
+
+#___________________________________________________________________________________________________ tuneEngine
+    @classmethod
+    def tuneEngine(cls, engine):
+        """ Registers the connection tuning events on the specified SQLite engine, if they have
+            not already been registered. Connections are tuned when they are opened, so pooled
+            connections opened before registration keep their default settings. """
+
+        with cls._LOCK:
+            if engine in cls._engines:
+                return
+            cls._engines.add(engine)
+
+        sqla.event.listen(engine, 'connect', cls._handleConnect)
+        sqla.event.listen(engine, 'checkin', cls._handleCheckin)
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getEngine
+    @classmethod
+    def _getEngine(cls, session, model):
+        try:
+            return session.get_bind(model)
+        except Exception:
+            return session.bind
+
+#___________________________________________________________________________________________________ _getSharedKey
+    @classmethod
+    def _getSharedKey(cls, model):
+        """ Returns the key of the shared session for the database of the specified model on the
+            current thread. Models within the same database share the same session. """
+        return threading.current_thread().ident, model.__module__.rsplit('.', 1)[0]
+
+#___________________________________________________________________________________________________ _getJournalMode
+    @classmethod
+    def _getJournalMode(cls, dbapiConnection):
+        cursor = dbapiConnection.cursor()
+        try:
+            cursor.execute('PRAGMA journal_mode')
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return row[0].lower() if row and row[0] else ''
+
+#___________________________________________________________________________________________________ _executePragmas
+    @classmethod
+    def _executePragmas(cls, dbapiConnection, pragmas):
+        cursor = dbapiConnection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+#===================================================================================================
+#                                                                                 H A N D L E R S
+
+#___________________________________________________________________________________________________ _handleConnect
+    @classmethod
+    def _handleConnect(cls, dbapiConnection, connectionRecord):
+        cls._executePragmas(dbapiConnection, cls.PRAGMAS)
+        if cls._getJournalMode(dbapiConnection) == 'wal':
+            cls._executePragmas(dbapiConnection, cls.WAL_PRAGMAS)
+
+#___________________________________________________________________________________________________ _handleCheckin
+    @classmethod
+    def _handleCheckin(cls, dbapiConnection, connectionRecord):
+        """ Pooled connections are shared by read-only and writing sessions, so the query_only
+            state of a read-only session must not outlive its use of the connection. """
+        if dbapiConnection is not None:
+            cls._executePragmas(dbapiConnection, ('PRAGMA query_only = OFF',))
+
+#___________________________________________________________________________________________________ _handleReadOnlyBegin
+    @classmethod
+    def _handleReadOnlyBegin(cls, session, transaction, connection):
+        connection.execute('PRAGMA query_only = ON')
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
@@ -0,0 +1,246 @@
+# TrackNoteIndex.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from collections import namedtuple
+import re
+
+import sqlalchemy as sqla
+
+#*************************************************************************************************** TrackNoteIndex
+class TrackNoteIndex(object):
+    """ Searches the notes of tracks, which collect importer error messages and human comments,
+        along with the key names of their serialized snapshots. Searches use the trackNotes SQLite
+        FTS5 full-text index, which is brought up to date before each search from the row ids of
+        the changed tracks that triggers on the tracks table collect in the trackNoteChanges
+        table. Those triggers do not use FTS5, so that SQLite libraries lacking it can still
+        write to the tracks table. Databases without the index, or connections whose SQLite
+        library cannot use it, fall back to a slower LIKE scan of the tracks table. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    TABLE_NAME = 'trackNotes'
+
+    # Table of the row ids of the tracks changed since the index was last brought up to date
+    CHANGES_TABLE_NAME = 'trackNoteChanges'
+
+    SEARCH_RESULT = namedtuple('SEARCH_RESULT', ['uid', 'rank', 'snippet'])
+
+    # Default maximum number of results returned by a search
+    DEFAULT_LIMIT = 200
+
+    # Relative weights of the uid, note and snapshotKeys columns in the bm25 ranking
+    _WEIGHTS = (0.0, 1.0, 0.5)
+
+    _SNIPPET_WORDS  = 16
+    _SNIPPET_LENGTH = 120
+    _TOKEN_PATTERN  = re.compile('\\S+')
+
+    _SEARCH_SQL = '\n'.join([
+        'SELECT uid, bm25({table}, {weights}) AS score,',
+        '   snippet({table}, -1, \'[\', \']\', \'...\', {words}) AS excerpt',
+        'FROM {table} WHERE {table} MATCH :query',
+        'ORDER BY score LIMIT :limit' ])
+
+    # Expression that lists the top-level keys of a snapshot JSON string separated by spaces
+    _SNAPSHOT_KEYS_SQL = '\n'.join([
+        'CASE WHEN json_valid(snapshot) AND json_type(snapshot) = \'object\'',
+        '   THEN (SELECT group_concat(key, \' \') FROM json_each(snapshot))',
+        '   ELSE \'\' END' ])
+
+    _INDEX_SQL = '\n'.join([
+        'INSERT INTO {table}(rowid, uid, note, snapshotKeys)',
+        'SELECT i, uid, COALESCE(note, \'\'), {keys} FROM tracks' ])
+
+    _FALLBACK_SQL = '\n'.join([
+        'SELECT uid, note, snapshot FROM tracks',
+        'WHERE note LIKE :pattern ESCAPE \'\\\' OR snapshot LIKE :pattern ESCAPE \'\\\'',
+        'LIMIT :limit' ])
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ isAvailable
+    @classmethod
+    def isAvailable(cls, session):
+        """ Returns whether or not the database of the specified tracks session contains the
+            full-text index and the SQLite library of the session connection provides the FTS5
+            and JSON extensions needed to query and update it. """
+
+        result = session.execute(
+            sqla.text('SELECT COUNT(*) FROM sqlite_master WHERE type = \'table\' AND name = :name'),
+            {'name':cls.TABLE_NAME}).scalar()
+        if not result:
+            return False
+
+        try:
+            session.execute(sqla.text(
+                'SELECT rowid, json_valid(\'{}\') FROM %s LIMIT 0' % cls.TABLE_NAME)).fetchall()
+        except sqla.exc.DBAPIError:
+            return False
+        return True
+
+#___________________________________________________________________________________________________ synchronize
+    @classmethod
+    def synchronize(cls, session):
+        """ Updates the index entries of the tracks changed since the index was last brought up
+            to date, within the transaction of the specified session, and returns whether or not
+            the index is up to date. The index is left unchanged and False is returned if it is
+            not available or the session cannot write to the database. """
+
+        if not cls.isAvailable(session):
+            return False
+
+        changes = sqla.text('SELECT COUNT(*) FROM %s' % cls.CHANGES_TABLE_NAME)
+        if not session.execute(changes).scalar():
+            return True
+
+        changed = 'i IN (SELECT i FROM %s)' % cls.CHANGES_TABLE_NAME
+        try:
+            session.execute(sqla.text('DELETE FROM %s WHERE rowid IN (SELECT i FROM %s)' % (
+                cls.TABLE_NAME, cls.CHANGES_TABLE_NAME)))
+            session.execute(sqla.text('%s WHERE %s' % (cls._getIndexSql(), changed)))
+            session.execute(sqla.text('DELETE FROM %s' % cls.CHANGES_TABLE_NAME))
+        except sqla.exc.DBAPIError:
+            return False
+        return True
+
+#___________________________________________________________________________________________________ rebuild
+    @classmethod
+    def rebuild(cls, session):
+        """ Recreates every entry of the index from the tracks table within the transaction of
+            the specified session, for databases whose index no longer matches their tracks,
+            e.g. after tracks were changed with the triggers dropped. Returns whether or not the
+            index was rebuilt. """
+
+        if not cls.isAvailable(session):
+            return False
+
+        session.execute(sqla.text('DELETE FROM %s' % cls.TABLE_NAME))
+        session.execute(sqla.text(cls._getIndexSql()))
+        session.execute(sqla.text('DELETE FROM %s' % cls.CHANGES_TABLE_NAME))
+        return True
+
+#___________________________________________________________________________________________________ search
+    @classmethod
+    def search(cls, session, text, limit =None, prefix =True):
+        """ Returns a list of SEARCH_RESULT tuples for the tracks whose note or snapshot keys
+            contain every word of the specified text, ordered from the best match to the worst.
+            Each result has the uid of the track, its rank, where lower values are better matches,
+            and a snippet of the matching note with the matched words enclosed in brackets.
+
+            [limit] :: Integer :: DEFAULT_LIMIT
+                The maximum number of results to return.
+
+            [prefix] :: Boolean :: True
+                Whether or not words in the text match words that begin with them, e.g. 'miss'
+                matching 'missing'. """
+
+        limit = cls.DEFAULT_LIMIT if limit is None else limit
+        words = cls._TOKEN_PATTERN.findall(text or '')
+        if not words or limit <= 0:
+            return []
+
+        if not cls.synchronize(session):
+            return cls._searchTable(session, words, limit)
+
+        sql = cls._SEARCH_SQL.format(
+            table=cls.TABLE_NAME,
+            weights=', '.join(['%s' % w for w in cls._WEIGHTS]),
+            words=cls._SNIPPET_WORDS)
+
+        rows = session.execute(
+            sqla.text(sql), {'query':cls.createMatchQuery(words, prefix), 'limit':limit})
+        return [cls.SEARCH_RESULT(r[0], r[1], r[2]) for r in rows]
+
+#___________________________________________________________________________________________________ getTracks
+    @classmethod
+    def getTracks(cls, session, text, limit =None, prefix =True):
+        """ Returns a list of the Tracks_Track instances whose note or snapshot keys match the
+            specified text, ordered from the best match to the worst. Arguments are the same as
+            for the search() method. """
+
+        # AS NEEDED: Prevents circular imports between the tracks models and this module
+        from cadence.models.tracks.Tracks_Track import Tracks_Track
+
+        uids = [r.uid for r in cls.search(session, text, limit=limit, prefix=prefix)]
+        if not uids:
+            return []
+
+        model  = Tracks_Track.MASTER
+        tracks = dict()
+        for index in range(0, len(uids), 500):
+            batch = uids[index:index + 500]
+            for track in session.query(model).filter(model.uid.in_(batch)):
+                tracks[track.uid] = track
+
+        return [tracks[uid] for uid in uids if uid in tracks]
+
+#___________________________________________________________________________________________________ createMatchQuery
+    @classmethod
+    def createMatchQuery(cls, words, prefix =True):
+        """ Returns an FTS5 MATCH query that requires every one of the specified words. Each word
+            is quoted so that characters with special meaning in the FTS5 query syntax, which are
+            common in importer error messages, are matched literally. """
+
+        suffix = '*' if prefix else ''
+        return ' '.join(['"%s"%s' % (w.replace('"', '""'), suffix) for w in words])
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getIndexSql
+    @classmethod
+    def _getIndexSql(cls):
+        """ Returns the statement that adds the index entries of the tracks table. """
+        return cls._INDEX_SQL.format(table=cls.TABLE_NAME, keys=cls._SNAPSHOT_KEYS_SQL)
+
+#___________________________________________________________________________________________________ _searchTable
+    @classmethod
+    def _searchTable(cls, session, words, limit):
+        """ Searches the tracks table directly for databases without the full-text index. Rows
+            are matched on the longest word and then filtered on the others. """
+
+        pattern = max(words, key=len)
+        pattern = pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        rows    = session.execute(
+            sqla.text(cls._FALLBACK_SQL), {'pattern':'%%%s%%' % pattern, 'limit':-1})
+
+        lowerWords = [w.lower() for w in words]
+        results    = []
+        for uid, note, snapshot in rows:
+            note     = note or ''
+            searched = ('%s %s' % (note, snapshot or '')).lower()
+            if not all(w in searched for w in lowerWords):
+                continue
+
+            results.append(cls.SEARCH_RESULT(uid, 0.0, cls._createExcerpt(note, lowerWords[0])))
+            if len(results) >= limit:
+                break
+        return results
+
+#___________________________________________________________________________________________________ _createExcerpt
+    @classmethod
+    def _createExcerpt(cls, note, word):
+        index = note.lower().find(word)
+        if index < 0:
+            return note[:cls._SNIPPET_LENGTH]
+
+        start = max(0, index - cls._SNIPPET_LENGTH//2)
+        end   = min(len(note), start + cls._SNIPPET_LENGTH)
+        return '%s%s%s' % (
+            '...' if start > 0 else '', note[start:end], '...' if end < len(note) else '')
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
@@ -4,14 +4,14 @@
 
 from __future__ import print_function, absolute_import, unicode_literals, division
 
-from array import array
-
+import numpy as np
 from pyaid.string.ByteChunk import ByteChunk
 
 import sqlalchemy as sqla
 from cadence.analysis.shared.PositionValue2D import PositionValue2D
 
 from cadence.models.analysis.AnalysisDefault import AnalysisDefault
+from cadence.shared.io.ArrayBlob import ArrayBlob
 
 
 #___________________________________________________________________________________________________ Analysis_TrackCurve
@@ -36,34 +36,50 @@ class Analysis_TrackCurve(AnalysisDefault):
 #___________________________________________________________________________________________________ GS: points
     @property
     def points(self):
-        """ Returns a list of position value objects (x, z, xUnc, zUnc) corresponding to the points
-            in the curve """
+        """ Returns a read-only numpy array with one row of (x, z, xUnc, zUnc) values for each of
+            the points in the curve, which is read directly from the stored blob. Curves stored in
+            the legacy ByteChunk format are converted on read. """
         out = self.fetchTransient('points')
         if out is None:
-            bc  = ByteChunk(sourceBytes=self.pointBlob)
-            a   = bc.readArrayChunk('d')
-            out = []
-            i   = 0
-
-            while i < len(a):
-                out.append(PositionValue2D(a[i], a[i+1], a[i+2], a[i+3]))
-                i += 4
-
-            out = tuple(out)
+            blob = self.pointBlob
+            if not blob:
+                out = np.zeros((0, 4), dtype=np.float64)
+            elif ArrayBlob.isArrayBlob(blob):
+                out = ArrayBlob.unpack(blob)
+            else:
+                out = self._unpackLegacyPoints(blob)
             self.putTransient('points', out)
         return out
     @points.setter
     def points(self, value):
-        if not value:
-            self.putTransient('points', [])
-            self.points = None
+        """ Stores the specified points, either an array-like of (x, z, xUnc, zUnc) rows or a
+            sequence of PositionValue2D instances. """
+        if value is None or not len(value):
+            self.putTransient('points', None)
+            self.pointBlob = None
             return
 
-        self.putTransient('points', value)
-        store = array('d')
-        for point in value:
-            store.extend(point.toTuple())
-        bc = ByteChunk()
-        bc.writeArrayChunk(store)
-        self.points = bc.byteArray
+        if isinstance(value[0], PositionValue2D):
+            value = [point.toTuple() for point in value]
+
+        value = np.asarray(value, dtype=np.float64).reshape((-1, 4))
+        self.pointBlob = ArrayBlob.pack(value)
+        self.putTransient('points', None)
 
+#___________________________________________________________________________________________________ GS: positionValues
+    @property
+    def positionValues(self):
+        """ Returns a tuple of PositionValue2D instances for the points in the curve, which are
+            created on each request and should only be used where per-point objects are needed. """
+        return tuple(PositionValue2D(*row) for row in self.points.tolist())
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _unpackLegacyPoints
+    @classmethod
+    def _unpackLegacyPoints(cls, blob):
+        """ Reads points stored as a ByteChunk array chunk of doubles, the format used before
+            points were stored as array blobs. """
+        values = ByteChunk(sourceBytes=blob).readArrayChunk('d')
+        return np.array(values, dtype=np.float64).reshape((-1, 4))
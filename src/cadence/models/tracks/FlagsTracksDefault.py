@@ -4,6 +4,8 @@
 
 from __future__ import print_function, absolute_import, unicode_literals, division
 
+import importlib
+
 import sqlalchemy as sqla
 
 from pyglass.sqlalchemy.PyGlassModelsDefault import PyGlassModelsDefault
@@ -24,3 +26,55 @@ class FlagsTracksDefault(PyGlassModelsDefault):
     _displayFlags        = sqla.Column(sqla.Integer,     default=0)
     _importFlags         = sqla.Column(sqla.Integer,     default=0)
     _analysisFlags       = sqla.Column(sqla.Integer,     default=0)
+
+    # Default loading strategy of the relationships between the tracks database models, which can
+    # be overridden for individual queries with the options returned by getLoaderOption()
+    RELATIONSHIP_LOADING = 'select'
+
+    # Maps loading strategy names to the SQLAlchemy loader option functions. The selectin
+    # strategy falls back to subquery loading for SQLAlchemy versions that do not support it.
+    _LOADERS = {
+        'select':   'lazyload',
+        'joined':   'joinedload',
+        'subquery': 'subqueryload',
+        'selectin': 'selectinload' }
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ getLoaderOption
+    @classmethod
+    def getLoaderOption(cls, *relationships, **kwargs):
+        """ Returns a query option that loads the specified chain of relationship attributes, e.g.
+            (Tracks_SiteMap.trackways, Tracks_Trackway.firstLeftPesTrack), with the specified
+            loading strategy. Eager strategies load the relationship for every instance returned
+            by a query with a fixed number of additional queries.
+
+            [strategy] :: String :: 'selectin'
+                One of 'select', 'joined', 'subquery' or 'selectin'. """
+
+        strategy = kwargs.get('strategy', 'selectin')
+        if strategy not in cls._LOADERS:
+            raise ValueError('Unknown relationship loading strategy "%s"' % strategy)
+
+        name   = cls._LOADERS[strategy]
+        option = None
+        for relationship in relationships:
+            if option is None:
+                loader = getattr(sqla.orm, name, None) or sqla.orm.subqueryload
+            else:
+                loader = getattr(option, name, None) or option.subqueryload
+            option = loader(relationship)
+        return option
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getTracksModel
+    @classmethod
+    def _getTracksModel(cls, name):
+        """ Returns the master class of the tracks database model with the specified class name,
+            which is imported as needed to prevent circular imports between the models that
+            reference each other within relationships. """
+        module = importlib.import_module('cadence.models.tracks.%s' % name)
+        return getattr(module, name).MASTER
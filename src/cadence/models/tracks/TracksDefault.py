@@ -6,13 +6,15 @@ from __future__ import print_function, absolute_import, unicode_literals, divisi
 
 import re
 import math
+from collections import namedtuple
+
 from pyaid.dict.DictUtils import DictUtils
 from pyaid.json.JSON import JSON
 from pyaid.number.NumericUtils import NumericUtils
 
 import sqlalchemy as sqla
+from sqlalchemy.ext.declarative import declared_attr
 from pyaid.radix.Base64 import Base64
-from pyaid.reflection.Reflection import Reflection
 from pyaid.string.StringUtils import StringUtils
 from pyglass.sqlalchemy.PyGlassModelsDefault import PyGlassModelsDefault
 from pyglass.sqlalchemy.ConcretePyGlassModelsMeta import ConcretePyGlassModelsMeta
@@ -22,6 +24,8 @@ from cadence.CadenceEnvironment import CadenceEnvironment
 from cadence.analysis.shared.PositionValue2D import PositionValue2D
 from cadence.enums.SourceFlagsEnum import SourceFlagsEnum
 from cadence.enums.TrackPropEnum import TrackPropEnum
+from cadence.enums.TrackPropEnum import TrackPropEnumOps
+from cadence.models.tracks.FlagsTracksDefault import FlagsTracksDefault
 
 #___________________________________________________________________________________________________ TracksDefault
 # noinspection PyAttributeOutsideInit
@@ -33,10 +37,34 @@ class TracksDefault(PyGlassModelsDefault):
 
     __abstract__  = True
 
+    # Result of a series query, where cycleUid is the uid of the track at which the series links
+    # back onto itself, or None if the series is acyclic
+    SERIES_RESULT = namedtuple('SERIES_RESULT', ['tracks', 'cycleUid'])
+
+    # Separator of the uids within the visited path of the recursive series queries
+    _SERIES_PATH_SEPARATOR = '|'
+
+    # Groups of columns that callers select with getLoadingOptions() to load only the columns
+    # they need. The columns of the DEFERRED_GROUP are deferred by default and are loaded on first
+    # access unless the group is requested explicitly.
+    LOADING_PROFILES = {
+        'identity': (
+            'uid', 'site', 'year', 'level', 'sector', 'trackwayType', 'trackwayNumber', 'number',
+            'left', 'pes', 'next', 'hidden', 'index', 'fingerprintKey', 'seriesFingerprintKey'),
+        'geometry': (
+            'width', 'length', 'rotation', 'x', 'z', 'lengthRatio', 'widthMeasured',
+            'widthUncertainty', 'lengthMeasured', 'lengthUncertainty', 'depthMeasured',
+            'depthUncertainty', 'rotationMeasured', 'rotationUncertainty'),
+        'flags': (
+            'flags', 'sourceFlags', 'displayFlags', 'importFlags', 'analysisFlags', 'dead'),
+        'metadata': ('snapshot', 'note') }
+
+    DEFERRED_GROUP = 'metadata'
+
     # Used to break trackway specifier into separate type and number entries
     _TRACKWAY_PATTERN = re.compile('(?P<type>[A-Za-z]+)[\s\t]*(?P<number>[0-9]+)')
 
-    _uid                 = sqla.Column(sqla.Unicode,     default='')
+    _uid                 = sqla.Column(sqla.Unicode,     default='', index=True, unique=True)
     _site                = sqla.Column(sqla.Unicode,     default='')
     _year                = sqla.Column(sqla.Unicode,     default='')
     _level               = sqla.Column(sqla.Unicode,     default='')
@@ -46,7 +74,7 @@ class TracksDefault(PyGlassModelsDefault):
     _number              = sqla.Column(sqla.Unicode,     default='')
     _snapshot            = sqla.Column(sqla.Unicode,     default='')
     _note                = sqla.Column(sqla.UnicodeText, default='')
-    _next                = sqla.Column(sqla.Unicode,     default='')
+    _next                = sqla.Column(sqla.Unicode,     default='', index=True)
     _left                = sqla.Column(sqla.Boolean,     default=True)
     _pes                 = sqla.Column(sqla.Boolean,     default=True)
     _hidden              = sqla.Column(sqla.Boolean,     default=False)
@@ -75,11 +103,75 @@ class TracksDefault(PyGlassModelsDefault):
     # Entry is dead for deletion during cleanup/export
     _dead                = sqla.Column(sqla.Boolean,     default=False)
 
+    # Persisted copies of the fingerprint and trackSeriesFingerprint values, which are refreshed
+    # automatically whenever the track is flushed so that identity lookups are a single indexed
+    # equality comparison
+    _fingerprintKey       = sqla.Column(sqla.Unicode,    default='', index=True)
+    _seriesFingerprintKey = sqla.Column(sqla.Unicode,    default='', index=True)
+
+#___________________________________________________________________________________________________ __table_args__
+    @declared_attr
+    def __table_args__(cls):
+        """ Composite index supporting the sitemap and trackway lookups, which filter on site and
+            level and then optionally on sector, trackway type and trackway number. Existing
+            databases receive this index through the tracks alembic migrations. """
+        return (
+            sqla.Index(
+                'ix_%s_site_level_trackway' % cls.__tablename__,
+                'site', 'level', 'sector', 'trackwayType', 'trackwayNumber'), )
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, **kwargs):
         super(TracksDefault, self).__init__(**kwargs)
         self.uid = CadenceEnvironment.createUniqueId('track')
 
+#___________________________________________________________________________________________________ __mapper_cls__
+    @classmethod
+    def __mapper_cls__(cls, *args, **kwargs):
+        """ Creates the mapper of each concrete model class with the columns of the DEFERRED_GROUP
+            deferred, which keeps the large text columns out of queries that do not use them. """
+
+        deferred   = cls.LOADING_PROFILES[cls.DEFERRED_GROUP]
+        properties = kwargs.get('properties', dict())
+        for key, value in list(properties.items()):
+            if isinstance(value, sqla.Column) and value.name.lstrip('_') in deferred:
+                properties[key] = sqla.orm.deferred(value, group=cls.DEFERRED_GROUP)
+        return sqla.orm.mapper(*args, **kwargs)
+
+#___________________________________________________________________________________________________ __declare_last__
+    @classmethod
+    def __declare_last__(cls):
+        """ Registers the flush event handlers once the concrete model class has been mapped. """
+        sqla.event.listen(cls, 'before_insert', cls._handleBeforeFlush)
+        sqla.event.listen(cls, 'before_update', cls._handleBeforeFlush)
+
+#___________________________________________________________________________________________________ nextTrack
+    @declared_attr
+    def nextTrack(cls):
+        """ View-only relationship to the track whose uid is stored in the next column. Being
+            view-only, a loaded value is not refreshed when the next column changes until the
+            instance is expired, which getNextTrack() accounts for. """
+        return sqla.orm.relationship(
+            lambda: cls,
+            primaryjoin=lambda: sqla.orm.foreign(cls.__table__.c.next)
+                == sqla.orm.remote(cls.__table__.c.uid),
+            uselist=False,
+            viewonly=True,
+            lazy=FlagsTracksDefault.RELATIONSHIP_LOADING)
+
+#___________________________________________________________________________________________________ previousTracks
+    @declared_attr
+    def previousTracks(cls):
+        """ View-only relationship to the list of tracks whose next column references this track,
+            which contains more than one track only if the series linkage is branched. """
+        return sqla.orm.relationship(
+            lambda: cls,
+            primaryjoin=lambda: sqla.orm.foreign(sqla.orm.remote(cls.__table__.c.next))
+                == cls.__table__.c.uid,
+            order_by=lambda: cls.__table__.c.i,
+            viewonly=True,
+            lazy=FlagsTracksDefault.RELATIONSHIP_LOADING)
+
 #===================================================================================================
 #                                                                                   G E T / S E T
 
@@ -161,42 +253,56 @@ class TracksDefault(PyGlassModelsDefault):
     @property
     def fingerprint(self):
         """ String created from the uniquely identifying track properties. """
-        return '%s-%s' % (
+        return self._createFingerprint(
             self.trackSeriesFingerprint,
-            getattr(self, TrackPropEnum.NUMBER.name, '0') )
+            getattr(self, TrackPropEnum.NUMBER.name, '0'))
 
 #___________________________________________________________________________________________________ GS: trackSeriesFingerprint
     @property
     def trackSeriesFingerprint(self):
-        return '-'.join([
+        return self._createSeriesFingerprint(
             self.trackwayFingerprint,
-            'L' if getattr(self, TrackPropEnum.LEFT.name, False) else 'R',
-            'P' if getattr(self, TrackPropEnum.PES.name, False) else 'M' ])
+            getattr(self, TrackPropEnum.LEFT.name, False),
+            getattr(self, TrackPropEnum.PES.name, False))
 
 #___________________________________________________________________________________________________ GS: trackwayFingerprint
     @property
     def trackwayFingerprint(self):
-        return '-'.join([
+        return self._createTrackwayFingerprint(
             getattr(self, TrackPropEnum.SITE.name, ''),
             getattr(self, TrackPropEnum.LEVEL.name, ''),
             getattr(self, TrackPropEnum.YEAR.name, ''),
             getattr(self, TrackPropEnum.SECTOR.name, ''),
             getattr(self, TrackPropEnum.TRACKWAY_TYPE.name, ''),
-            getattr(self, TrackPropEnum.TRACKWAY_NUMBER.name, '0') ])
+            getattr(self, TrackPropEnum.TRACKWAY_NUMBER.name, '0'))
 
 #___________________________________________________________________________________________________ GS: snapshotData
     @property
     def snapshotData(self):
+        """ The parsed dictionary form of the snapshot JSON string, or None if the snapshot is
+            empty or invalid. The parsed result is memoized against the raw string, which means it
+            is only parsed again after the snapshot has been modified. The returned dictionary is
+            shared and should not be modified without assigning it back to this property. """
+
+        snapshot = self.snapshot
+        memo     = self.fetchTransient('snapshotData')
+        if memo and memo[0] == snapshot:
+            return memo[1]
+
         try:
-            return JSON.fromString(self.snapshot)
+            data = JSON.fromString(snapshot)
         except Exception:
-            return None
+            data = None
+
+        self.putTransient('snapshotData', (snapshot, data))
+        return data
     @snapshotData.setter
     def snapshotData(self, value):
         if not value:
             self.snapshot = ''
         else:
             self.snapshot = JSON.asString(value)
+        self.putTransient('snapshotData', (self.snapshot, value if value else None))
 
 #===================================================================================================
 #                                                                                     P U B L I C
@@ -206,7 +312,15 @@ class TracksDefault(PyGlassModelsDefault):
         """ Returns the previous track in the series if such a track exists.  It is found by
             querying to find that other model instance whose 'next' matches this uid. If getAll
             is True the result returns a list of all tracks with a next value matching this
-            track's UID, which is useful in finding linkage branching errors. """
+            track's UID, which is useful in finding linkage branching errors. If the
+            previousTracks relationship was eagerly loaded and no session is specified, the
+            result is taken from the loaded relationship without a query. """
+        if not session and self._isRelationshipLoaded('previousTracks'):
+            tracks = [t for t in self.previousTracks if t.next == self.uid]
+            if getAll:
+                return tracks
+            return tracks[0] if tracks else None
+
         if not session:
             session = self.mySession
         model = self.__class__
@@ -223,14 +337,38 @@ class TracksDefault(PyGlassModelsDefault):
     def getNextTrack(self, session =None):
         """ Returns the next track in the series if such a track exists.  Unlike getPreviousTrack,
             the next track's uid is explicitly stored in the attribute next, waiting to be used.  A
-            query is still required to get the Track_track model instance for that uid. """
-        if not session:
-            session = self.mySession
-
+            query is still required to get the Track_track model instance for that uid, unless
+            the nextTrack relationship was already loaded for the current next value. """
         if self.next is None:
             return None
+
+        if not session and self._isRelationshipLoaded('nextTrack'):
+            track = self.nextTrack
+            if track is not None and track.uid == self.next:
+                return track
+
+        if not session:
+            session = self.mySession
         return self.getByUid(self.next, session=session)
 
+#___________________________________________________________________________________________________ getSnapshotValue
+    def getSnapshotValue(self, key, default =None):
+        """ Returns the numeric value stored in the snapshot for the specified key, which should be
+            one of the SnapshotDataEnum values, or the default if no such value exists. """
+
+        data = self.snapshotData
+        if not data:
+            return default
+
+        value = data.get(key)
+        if value is None:
+            return default
+
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
 #___________________________________________________________________________________________________ fromDict
     def fromDict(self, data):
         """ Populates the track with the values specified by data dictionary argument. The keys of
@@ -238,31 +376,28 @@ class TracksDefault(PyGlassModelsDefault):
             class and the values valid entries for each key in the database class. This method can
             be used to load a track object from disk into a database model. """
 
-        for enum in Reflection.getReflectionList(TrackPropEnum):
-            if enum == TrackPropEnum.UID:
-                continue
-            if enum.name in data:
-                setattr(self, enum.name, data[enum.name])
+        for name in TrackPropEnumOps.DATA_NAMES:
+            if name in data:
+                setattr(self, name, data[name])
 
 #___________________________________________________________________________________________________ toDict
     def toDict(self, uniqueOnly =False):
         """ Returns a dictionary containing the keys and current values of the track object
             with no dependency on a database session object. """
 
-        out = dict(id=self.id, uid=self.uid)
-        for enum in Reflection.getReflectionList(TrackPropEnum):
-            if uniqueOnly and not enum.unique:
-                continue
-            out[enum.name] = getattr(self, enum.name)
+        if uniqueOnly:
+            out = dict(zip(
+                TrackPropEnumOps.UNIQUE_NAMES, TrackPropEnumOps.getUniqueValues(self)))
+        else:
+            out = dict(zip(TrackPropEnumOps.NAMES, TrackPropEnumOps.getValues(self)))
+        out['id']  = self.id
+        out['uid'] = self.uid
         return self._createDict(**out)
 
 #___________________________________________________________________________________________________ toMayaNodeDict
     def toMayaNodeDict(self):
         """ Creates a dictionary representation of those properties required for a Maya node. """
-        out = dict()
-        for enum in Reflection.getReflectionList(TrackPropEnum):
-            if enum.maya:
-                out[enum.maya] = getattr(self, enum.name)
+        out = dict(zip(TrackPropEnumOps.MAYA_NAMES, TrackPropEnumOps.getMayaValues(self)))
 
         # load up the values of left and pes so that they can be used in assigning shaders
         out[TrackPropEnum.LEFT.name]   = getattr(self, TrackPropEnum.LEFT.name)
@@ -287,12 +422,19 @@ class TracksDefault(PyGlassModelsDefault):
             in this track instance and returns a result list of any duplicates found. """
         if not session:
             session = self.mySession
-        model = self.__class__
-        query = session.query(model)
-        for enum in Reflection.getReflectionList(TrackPropEnum):
-            if enum.unique:
-                query = query.filter(getattr(model, enum.name) == getattr(self, enum.name))
-        return query.all()
+        return self.getByFingerprint(self.fingerprint, session)
+
+#___________________________________________________________________________________________________ refreshFingerprintKeys
+    def refreshFingerprintKeys(self):
+        """ Updates the persisted fingerprint key columns to match the current values of the
+            uniquely identifying track properties. This is called automatically before the track
+            is inserted or updated in the database and need only be called directly when those
+            columns are modified outside of the ORM. """
+
+        seriesFingerprint = self.trackSeriesFingerprint
+        self.seriesFingerprintKey = seriesFingerprint
+        self.fingerprintKey = self._createFingerprint(
+            seriesFingerprint, getattr(self, TrackPropEnum.NUMBER.name, '0'))
 
 #___________________________________________________________________________________________________ equivalentProps
     def equivalentProps(self, **kwargs):
@@ -312,6 +454,153 @@ class TracksDefault(PyGlassModelsDefault):
         except Exception:
             return None
 
+#___________________________________________________________________________________________________ getByFingerprint
+    @classmethod
+    def getByFingerprint(cls, fingerprint, session):
+        """ Returns a list of the model instances with the specified fingerprint, which should
+            contain no more than one entry unless the database contains ambiguous tracks. """
+        return session.query(cls).filter(cls.fingerprintKey == fingerprint).all()
+
+#___________________________________________________________________________________________________ querySeries
+    @classmethod
+    def querySeries(cls, uid, session, forward =True, maxDepth =None):
+        """ Returns a SERIES_RESULT with the ordered list of tracks linked to the track with the
+            specified uid, which is the first entry of the list, retrieved with a single
+            recursive query instead of one query per linked track. The list is empty if no such
+            track exists.
+
+            [forward] :: Boolean :: True
+                If True the series is followed through the next links of the tracks, otherwise it
+                is followed backwards, which at branched linkages follows the previous track with
+                the lowest row id, consistent with getPreviousTrack().
+
+            [maxDepth] :: Integer :: None
+                The maximum number of links to follow from the specified track. If not specified
+                the series is followed until its end or until it links back onto itself. """
+
+        table  = cls.__table__
+        sep    = cls._SERIES_PATH_SEPARATOR
+        series = sqla.select([
+            table.c.uid,
+            table.c.next,
+            sqla.literal(0).label('depth'),
+            (sqla.literal(sep) + table.c.uid + sep).label('path'),
+            sqla.literal(0).label('cycle')
+        ]).where(table.c.uid == uid).cte('series', recursive=True)
+
+        parent = series.alias('parent')
+        child  = table.alias('child')
+        if forward:
+            link = sqla.and_(parent.c.next != '', child.c.uid == parent.c.next)
+        else:
+            link = child.c.next == parent.c.uid
+
+        # Tracks already within the path of their parent are returned flagged as cyclic, but are
+        # not followed any further, which guarantees that the recursion terminates
+        visited = sqla.func.instr(parent.c.path, sqla.literal(sep) + child.c.uid + sep) > 0
+        step    = sqla.select([
+            child.c.uid,
+            child.c.next,
+            parent.c.depth + 1,
+            parent.c.path + child.c.uid + sep,
+            sqla.case([(visited, 1)], else_=0)
+        ]).where(link).where(parent.c.cycle == 0)
+        if maxDepth is not None:
+            step = step.where(parent.c.depth < maxDepth)
+        series = series.union_all(step)
+
+        rows = session.query(cls, series.c.depth, series.c.cycle) \
+            .join(series, table.c.uid == series.c.uid) \
+            .order_by(series.c.depth, table.c.i) \
+            .all()
+
+        tracks = []
+        for track, depth, cycle in rows:
+            if depth != len(tracks):
+                continue
+            if tracks:
+                last = tracks[-1]
+                if forward and last.next != track.uid:
+                    continue
+                if not forward and track.next != last.uid:
+                    continue
+            if cycle:
+                return cls.SERIES_RESULT(tracks, track.uid)
+            tracks.append(track)
+
+        return cls.SERIES_RESULT(tracks, None)
+
+#___________________________________________________________________________________________________ getTracksAfter
+    @classmethod
+    def getTracksAfter(cls, uid, session, maxDepth =None):
+        """ Returns an ordered list of the tracks following the track with the specified uid in
+            its series, retrieved with a single query. See querySeries() for details. """
+        return cls.querySeries(uid, session, forward=True, maxDepth=maxDepth).tracks[1:]
+
+#___________________________________________________________________________________________________ getTracksBefore
+    @classmethod
+    def getTracksBefore(cls, uid, session, maxDepth =None):
+        """ Returns a list of the tracks preceding the track with the specified uid in its series,
+            ordered from the nearest to the first track of the series and retrieved with a single
+            query. See querySeries() for details. """
+        return cls.querySeries(uid, session, forward=False, maxDepth=maxDepth).tracks[1:]
+
+#___________________________________________________________________________________________________ getLoadingOptions
+    @classmethod
+    def getLoadingOptions(cls, *groups):
+        """ Returns a list of query options that load only the columns of the specified
+            LOADING_PROFILES groups, e.g. ('identity', 'geometry'), along with the primary key.
+            Columns outside of those groups are loaded individually on first access, so the
+            groups should cover every column the caller uses. """
+
+        for group in groups:
+            if group not in cls.LOADING_PROFILES:
+                raise ValueError('Unknown track loading profile group "%s"' % group)
+
+        if set(groups) == set(cls.LOADING_PROFILES.keys()):
+            return [cls.getUndeferOption()]
+
+        mapper = sqla.inspect(cls)
+        names  = ['i']
+        for group in groups:
+            names.extend(cls.LOADING_PROFILES[group])
+
+        keys = [mapper.get_property_by_column(cls.__table__.c[name]).key for name in names]
+        return [sqla.orm.load_only(*keys)]
+
+#___________________________________________________________________________________________________ getUndeferOption
+    @classmethod
+    def getUndeferOption(cls):
+        """ Returns a query option that loads the deferred columns along with the rest of the
+            columns, for callers that read or copy entire tracks, e.g. the import and storage
+            merge paths. """
+        return sqla.orm.undefer_group(cls.DEFERRED_GROUP)
+
+#___________________________________________________________________________________________________ getFingerprintFromDict
+    @classmethod
+    def getFingerprintFromDict(cls, data):
+        """ Returns the fingerprint for the track described by the data dictionary, whose keys are
+            the names of TrackPropEnum values, or None if the dictionary does not contain every
+            uniquely identifying track property. """
+
+        for name in TrackPropEnumOps.UNIQUE_NAMES:
+            if name not in data:
+                return None
+
+        TPE = TrackPropEnum
+        return cls._createFingerprint(
+            cls._createSeriesFingerprint(
+                cls._createTrackwayFingerprint(
+                    data[TPE.SITE.name],
+                    data[TPE.LEVEL.name],
+                    data[TPE.YEAR.name],
+                    data[TPE.SECTOR.name],
+                    data[TPE.TRACKWAY_TYPE.name],
+                    data[TPE.TRACKWAY_NUMBER.name]),
+                data[TPE.LEFT.name],
+                data[TPE.PES.name]),
+            data[TPE.NUMBER.name])
+
 #___________________________________________________________________________________________________ getByProperties
     @classmethod
     def getByProperties(cls, session, **kwargs):
@@ -349,11 +638,47 @@ class TracksDefault(PyGlassModelsDefault):
 #===================================================================================================
 #                                                                               P R O T E C T E D
 
+#___________________________________________________________________________________________________ _isRelationshipLoaded
+    def _isRelationshipLoaded(self, name):
+        """ Returns whether or not the value of the specified relationship has already been loaded
+            for this instance, e.g. by an eager loading query option. """
+        try:
+            return name not in sqla.inspect(self).unloaded
+        except Exception:
+            return False
+
 #___________________________________________________________________________________________________ _createDict
     def _createDict(self, **kwargs):
         kwargs['id'] = self.id
         return kwargs
 
+#___________________________________________________________________________________________________ _createTrackwayFingerprint
+    @classmethod
+    def _createTrackwayFingerprint(cls, site, level, year, sector, trackwayType, trackwayNumber):
+        return '-'.join([
+            site or '', level or '', year or '', sector or '', trackwayType or '',
+            trackwayNumber or '' ])
+
+#___________________________________________________________________________________________________ _createSeriesFingerprint
+    @classmethod
+    def _createSeriesFingerprint(cls, trackwayFingerprint, left, pes):
+        return '-'.join([trackwayFingerprint, 'L' if left else 'R', 'P' if pes else 'M'])
+
+#___________________________________________________________________________________________________ _createFingerprint
+    @classmethod
+    def _createFingerprint(cls, seriesFingerprint, number):
+        return '%s-%s' % (seriesFingerprint, number or '')
+
+#===================================================================================================
+#                                                                                 H A N D L E R S
+
+#___________________________________________________________________________________________________ _handleBeforeFlush
+    @classmethod
+    def _handleBeforeFlush(cls, mapper, connection, target):
+        """ Mapper event handler that keeps the fingerprint key columns synchronized with the
+            uniquely identifying properties of each track as it is flushed to the database. """
+        target.refreshFingerprintKeys()
+
 #===================================================================================================
 #                                                                               I N T R I N S I C
 
@@ -7,10 +7,13 @@ from __future__ import print_function, absolute_import, unicode_literals, divisi
 from pyaid.config.ConfigsDict import ConfigsDict
 from pyaid.radix.Base36 import Base36
 import sqlalchemy as sqla
+from sqlalchemy.ext.declarative import declared_attr
 
 from cadence.models.tracks.FlagsTracksDefault import FlagsTracksDefault
 
 
+# AS NEEDED: from cadence.analysis.shared.SitemapTransform import SitemapTransform
+# AS NEEDED: from cadence.analysis.shared.TrackSpatialIndex import TrackSpatialIndex
 # AS NEEDED: from cadence.models.tracks.Tracks_Track import Tracks_Track
 # AS NEEDED: from cadence.models.tracks.Tracks_Trackway import Tracks_Trackway
 
@@ -67,6 +70,20 @@ class Tracks_SiteMap(FlagsTracksDefault):
     def __init__(self, **kwargs):
         super(Tracks_SiteMap, self).__init__(**kwargs)
 
+#___________________________________________________________________________________________________ trackways
+    @declared_attr
+    def trackways(cls):
+        """ View-only relationship to the trackways residing in this sitemap, ordered by index,
+            which is the inverse of the Tracks_Trackway.parentSitemap relationship. """
+        return sqla.orm.relationship(
+            lambda: cls._getTracksModel('Tracks_Trackway'),
+            primaryjoin=lambda: sqla.orm.foreign(
+                cls._getTracksModel('Tracks_Trackway').__table__.c.siteMapIndex
+            ) == cls.__table__.c.index,
+            order_by=lambda: cls._getTracksModel('Tracks_Trackway').__table__.c.index,
+            viewonly=True,
+            lazy=cls.RELATIONSHIP_LOADING)
+
 #===================================================================================================
 #                                                                                   G E T / S E T
 
@@ -98,11 +115,25 @@ class Tracks_SiteMap(FlagsTracksDefault):
 
         return [self.federalEast, self.federalNorth]
 
+#___________________________________________________________________________________________________ getTransform
+    def getTransform(self):
+        """ Returns a SitemapTransform created from the current values of this sitemap, which
+            converts numpy arrays of points between the map, scene and federal coordinate
+            spaces. """
+
+        from cadence.analysis.shared.SitemapTransform import SitemapTransform
+        return SitemapTransform(self)
+
 #___________________________________________________________________________________________________ getTracksQuery
-    def getTracksQuery(self, session =None):
+    def getTracksQuery(self, session =None, profile =None):
         """ This method returns an SQLAlchemy query object within the specified session, or a new
             session if none is specified, that can be used to retrieve all tracks within this
-            sitemap. """
+            sitemap.
+
+            [profile] :: List :: None
+                The TracksDefault.LOADING_PROFILES groups of columns to load, e.g.
+                ['identity', 'geometry']. If not specified, every column except the deferred
+                metadata columns is loaded. """
 
         from cadence.models.tracks.Tracks_Track import Tracks_Track
         model = Tracks_Track.MASTER
@@ -117,28 +148,72 @@ class Tracks_SiteMap(FlagsTracksDefault):
         if session is None:
             session = self.mySession
 
-        return session.query(model).filter(model.site == site).filter(model.level == level)
+        query = session.query(model).filter(model.site == site).filter(model.level == level)
+        if profile:
+            query = query.options(*model.getLoadingOptions(*profile))
+        return query
 
 #___________________________________________________________________________________________________ getAllTracks
-    def getAllTracks(self, session =None):
+    def getAllTracks(self, session =None, profile =None):
         """ This operates on the current siteMap, which is populated with the specifics for a given
             track site.  The three-letter site abbreviation (e.g., BSY, TCH) and the level can be
             parsed the filename, based on the (informal-but-thus-far-valid) naming convention for
             the sitemap file. """
 
-        return self.getTracksQuery(session=session).all()
+        return self.getTracksQuery(session=session, profile=profile).all()
+
+#___________________________________________________________________________________________________ getSpatialIndex
+    def getSpatialIndex(self, session =None):
+        """ Returns a TrackSpatialIndex of all tracks within this sitemap by their scene
+            coordinates, which supports nearest neighbour, radius and bounding box queries. The
+            index is built on first request and cached in the sitemap cache until it is
+            invalidated by a call to invalidateSpatialIndex(). """
+
+        index = self.cache.get('spatialIndex')
+        if index is None:
+            from cadence.analysis.shared.TrackSpatialIndex import TrackSpatialIndex
+            tracks = self.getAllTracks(session=session, profile=('identity', 'geometry'))
+            index  = TrackSpatialIndex(tracks or [])
+            self.cache.set('spatialIndex', index)
+        return index
+
+#___________________________________________________________________________________________________ invalidateSpatialIndex
+    def invalidateSpatialIndex(self):
+        """ Discards the cached spatial index so that it is rebuilt on the next request, which
+            should be done whenever tracks within the sitemap are added, removed or moved. """
+        self.cache.set('spatialIndex', None)
 
 #___________________________________________________________________________________________________ getTrackways
     def getTrackways(self):
-        """getTrackways doc..."""
+        """ Returns a list of the trackways residing in this sitemap from the trackways
+            relationship, which is only queried if it was not already eagerly loaded. """
 
-        from cadence.models.tracks.Tracks_Trackway import Tracks_Trackway
-        model = Tracks_Trackway.MASTER
-        trackways = self.mySession.query(model).filter(model.siteMapIndex == self.index).all()
+        trackways = list(self.trackways)
         for tw in trackways:
             tw.sitemap = self
         return trackways
 
+#___________________________________________________________________________________________________ getHierarchyOptions
+    @classmethod
+    def getHierarchyOptions(cls, includeTracks =True, strategy ='selectin'):
+        """ Returns a list of query options that eagerly load the trackways of every sitemap
+            returned by a query, and optionally the first track of each of their series, so that
+            the hierarchy is loaded with a fixed number of queries regardless of its size.
+
+            [includeTracks] :: Boolean :: True
+                Whether or not to load the first tracks of the trackway series as well.
+
+            [strategy] :: String :: 'selectin'
+                The eager loading strategy, either 'selectin', 'subquery' or 'joined'. """
+
+        trackwayModel = cls._getTracksModel('Tracks_Trackway')
+        out = [cls.getLoaderOption(cls.trackways, strategy=strategy)]
+        if includeTracks:
+            for name in trackwayModel.FIRST_TRACK_RELATIONSHIPS:
+                out.append(cls.getLoaderOption(
+                    cls.trackways, getattr(trackwayModel, name), strategy=strategy))
+        return out
+
 #___________________________________________________________________________________________________ GS: getNameFromFilename
     @classmethod
     def getNameFromFilename(cls, filename):
@@ -6,6 +6,7 @@ from __future__ import print_function, absolute_import, unicode_literals, divisi
 
 import nimble
 from pyaid.config.ConfigsDict import ConfigsDict
+import sqlalchemy as sqla
 
 from cadence.enums.SourceFlagsEnum import SourceFlagsEnum
 
@@ -14,6 +15,7 @@ from cadence.mayan.trackway import UpdateTrackNode
 from cadence.mayan.trackway import CreateTrackNode
 from cadence.models.tracks.TracksDefault import TracksDefault
 # AS NEEDED: from cadence.models.tracks.Tracks_TrackStore import Tracks_TrackStore
+# AS NEEDED: from cadence.models.tracks.Tracks_Trackway import Tracks_Trackway
 
 #___________________________________________________________________________________________________ Tracks_Track
 # noinspection PyAttributeOutsideInit
@@ -26,6 +28,36 @@ class Tracks_Track(TracksDefault):
 
     __tablename__  = u'tracks'
 
+    # Names of the columns whose modification changes the trackway rows calculated from the track
+    # linkages by Tracks_Trackway
+    TRACKWAY_COLUMNS = (
+        'next', 'hidden', 'left', 'pes', 'site', 'level', 'year', 'sector', 'trackwayType',
+        'trackwayNumber')
+
+    # Key within the session info dictionary of the flag that enables the incremental update of
+    # the trackway rows for the session, which is set by enableTrackwayUpdates()
+    _UPDATE_TRACKWAYS_KEY = 'cadenceUpdateTrackways'
+
+    # Key within the session info dictionary of the set of trackway fingerprints that must be
+    # recalculated once the current flush completes
+    _DIRTY_TRACKWAYS_KEY = 'cadenceDirtyTrackways'
+
+#___________________________________________________________________________________________________ __declare_last__
+    @classmethod
+    def __declare_last__(cls):
+        """ Registers the event handlers that collect the trackways affected by each flush and
+            recalculate their rows once the flush completes, which only act upon the sessions for
+            which enableTrackwayUpdates() was called. """
+        super(Tracks_Track, cls).__declare_last__()
+
+        sqla.event.listen(cls, 'after_insert', cls._handleTrackAddedOrRemoved)
+        sqla.event.listen(cls, 'after_delete', cls._handleTrackAddedOrRemoved)
+        sqla.event.listen(cls, 'after_update', cls._handleTrackUpdated)
+
+        if not sqla.event.contains(
+                sqla.orm.Session, 'after_flush_postexec', cls._handleAfterFlush):
+            sqla.event.listen(sqla.orm.Session, 'after_flush_postexec', cls._handleAfterFlush)
+
 #===================================================================================================
 #                                                                                   G E T / S E T
 
@@ -186,3 +218,144 @@ class Tracks_Track(TracksDefault):
         model  = Tracks_TrackStore.MASTER
         result = session.query(model).filter(model.uid == self.uid).all()
         return result[0] if result else None
+
+#___________________________________________________________________________________________________ enableTrackwayUpdates
+    @classmethod
+    def enableTrackwayUpdates(cls, session, enabled =True):
+        """ Enables or disables the incremental update of the trackway rows for the specified
+            session, which recalculates the rows of the trackways affected by each flush of
+            changes to the linkage, visibility or identity of tracks. Updates are disabled by
+            default, so that bulk edits such as imports, which flush partially populated tracks,
+            do not recalculate trackways and should call Tracks_Trackway.populateTrackwaysTable()
+            once complete instead. """
+
+        if enabled:
+            session.info[cls._UPDATE_TRACKWAYS_KEY] = True
+        else:
+            session.info.pop(cls._UPDATE_TRACKWAYS_KEY, None)
+            session.info.pop(cls._DIRTY_TRACKWAYS_KEY, None)
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getModifiedTrackwayFingerprints
+    @classmethod
+    def _getModifiedTrackwayFingerprints(cls, target, connection):
+        """ Returns a list of the trackway fingerprints affected by the flushed update of the
+            specified track, which is empty if none of the TRACKWAY_COLUMNS were modified. Tracks
+            whose identity changed affect both their previous and their current trackway, and
+            tracks whose next track changed also affect the trackways of both the previous and
+            the current next track, which may gain or lose their first track. """
+
+        state    = sqla.inspect(target)
+        mapper   = state.mapper
+        modified = set()
+        previous = dict()
+        for name in cls.TRACKWAY_COLUMNS:
+            key     = mapper.get_property_by_column(mapper.local_table.c[name]).key
+            history = state.attrs[key].history
+            if not history.has_changes():
+                continue
+            modified.add(name)
+            if history.deleted:
+                previous[name] = history.deleted[0]
+
+        if not modified:
+            return []
+
+        def getPrevious(name):
+            return previous.get(name, getattr(target, name))
+
+        out = [
+            target.trackwayFingerprint,
+            cls._createTrackwayFingerprint(
+                getPrevious('site'), getPrevious('level'), getPrevious('year'),
+                getPrevious('sector'), getPrevious('trackwayType'),
+                getPrevious('trackwayNumber')) ]
+
+        if 'next' in modified:
+            out.extend(cls._getLinkedTrackwayFingerprints(
+                connection, [previous.get('next'), target.next]))
+        return out
+
+#___________________________________________________________________________________________________ _getLinkedTrackwayFingerprints
+    @classmethod
+    def _getLinkedTrackwayFingerprints(cls, connection, uids, previous =False):
+        """ Returns a list of the trackway fingerprints of the tracks with the specified uids,
+            queried on the connection of the current flush. Empty uids are ignored.
+
+            [previous] :: Boolean :: False
+                If True the fingerprints are those of the tracks that link to the tracks with the
+                specified uids instead. """
+
+        uids = [uid for uid in uids if uid]
+        if not uids:
+            return []
+
+        table  = cls.__table__
+        column = table.c.next if previous else table.c.uid
+        query  = sqla.select([
+            table.c.site, table.c.level, table.c.year, table.c.sector, table.c.trackwayType,
+            table.c.trackwayNumber]).where(column.in_(uids))
+        return [cls._createTrackwayFingerprint(*row) for row in connection.execute(query)]
+
+#___________________________________________________________________________________________________ _getUpdatingSession
+    @classmethod
+    def _getUpdatingSession(cls, target):
+        """ Returns the session of the target track if trackway updates are enabled for it, or
+            None otherwise. """
+
+        session = sqla.orm.object_session(target)
+        if session is None or not session.info.get(cls._UPDATE_TRACKWAYS_KEY):
+            return None
+        return session
+
+#___________________________________________________________________________________________________ _addDirtyTrackways
+    @classmethod
+    def _addDirtyTrackways(cls, session, fingerprints):
+        """ Adds the specified trackway fingerprints to the set of dirty trackways stored on the
+            session, which are recalculated once the flush completes. """
+
+        if fingerprints:
+            session.info.setdefault(cls._DIRTY_TRACKWAYS_KEY, set()).update(fingerprints)
+
+#===================================================================================================
+#                                                                                 H A N D L E R S
+
+#___________________________________________________________________________________________________ _handleTrackAddedOrRemoved
+    @classmethod
+    def _handleTrackAddedOrRemoved(cls, mapper, connection, target):
+        """ Marks the trackway of the added or removed track as dirty, along with those of its
+            next track and of the tracks linking to it, whose series are joined or broken. """
+
+        session = cls._getUpdatingSession(target)
+        if session is None:
+            return
+
+        cls._addDirtyTrackways(
+            session,
+            [target.trackwayFingerprint]
+            + cls._getLinkedTrackwayFingerprints(connection, [target.next])
+            + cls._getLinkedTrackwayFingerprints(connection, [target.uid], previous=True))
+
+#___________________________________________________________________________________________________ _handleTrackUpdated
+    @classmethod
+    def _handleTrackUpdated(cls, mapper, connection, target):
+        session = cls._getUpdatingSession(target)
+        if session is None:
+            return
+
+        cls._addDirtyTrackways(session, cls._getModifiedTrackwayFingerprints(target, connection))
+
+#___________________________________________________________________________________________________ _handleAfterFlush
+    @classmethod
+    def _handleAfterFlush(cls, session, flushContext):
+        """ Session event handler that recalculates the rows of the trackways that were made dirty
+            by the completed flush. """
+
+        fingerprints = session.info.pop(cls._DIRTY_TRACKWAYS_KEY, None)
+        if not fingerprints:
+            return
+
+        from cadence.models.tracks.Tracks_Trackway import Tracks_Trackway
+        Tracks_Trackway.updateTrackways(session, fingerprints)
@@ -11,6 +11,7 @@ from pyaid.debug.Logger import Logger
 from pyaid.radix.Base36 import Base36
 from pyaid.string.StringUtils import StringUtils
 import sqlalchemy as sqla
+from sqlalchemy.ext.declarative import declared_attr
 
 from cadence.models.tracks.FlagsTracksDefault import FlagsTracksDefault
 
@@ -40,10 +41,59 @@ class Tracks_Trackway(FlagsTracksDefault):
     _firstLeftManus      = sqla.Column(sqla.Unicode,     default='')
     _firstRightManus     = sqla.Column(sqla.Unicode,     default='')
 
+    # Names of the relationships to the first tracks of each series in the order of the series
+    # returned by getTrackSeries()
+    FIRST_TRACK_RELATIONSHIPS = (
+        'firstLeftPesTrack', 'firstRightPesTrack', 'firstLeftManusTrack', 'firstRightManusTrack')
+
+    # Maximum number of trackways recalculated per query by updateTrackways(), where each trackway
+    # adds four series keys to the IN clause, which keeps the query below the SQLite bound
+    # parameter limit
+    _UPDATE_BATCH_SIZE = 100
+
+    # Logger shared by the updateTrackways() calls made after each flush, created when first used
+    _updateLogger = None
+
 #___________________________________________________________________________________________________ __init__
     def __init__(self, **kwargs):
         super(Tracks_Trackway, self).__init__(**kwargs)
 
+#___________________________________________________________________________________________________ parentSitemap
+    @declared_attr
+    def parentSitemap(cls):
+        """ View-only relationship to the sitemap in which this trackway resides. """
+        return sqla.orm.relationship(
+            lambda: cls._getTracksModel('Tracks_SiteMap'),
+            primaryjoin=lambda: sqla.orm.foreign(cls.__table__.c.siteMapIndex)
+                == sqla.orm.remote(cls._getTracksModel('Tracks_SiteMap').__table__.c.index),
+            uselist=False,
+            viewonly=True,
+            lazy=cls.RELATIONSHIP_LOADING)
+
+#___________________________________________________________________________________________________ firstLeftPesTrack
+    @declared_attr
+    def firstLeftPesTrack(cls):
+        """ View-only relationship to the first track in the left pes series. """
+        return cls._createFirstTrackRelationship('firstLeftPes')
+
+#___________________________________________________________________________________________________ firstRightPesTrack
+    @declared_attr
+    def firstRightPesTrack(cls):
+        """ View-only relationship to the first track in the right pes series. """
+        return cls._createFirstTrackRelationship('firstRightPes')
+
+#___________________________________________________________________________________________________ firstLeftManusTrack
+    @declared_attr
+    def firstLeftManusTrack(cls):
+        """ View-only relationship to the first track in the left manus series. """
+        return cls._createFirstTrackRelationship('firstLeftManus')
+
+#___________________________________________________________________________________________________ firstRightManusTrack
+    @declared_attr
+    def firstRightManusTrack(cls):
+        """ View-only relationship to the first track in the right manus series. """
+        return cls._createFirstTrackRelationship('firstRightManus')
+
 #===================================================================================================
 #                                                                                   G E T / S E T
 
@@ -96,7 +146,12 @@ class Tracks_Trackway(FlagsTracksDefault):
 #                                                                                     P U B L I C
 
 #___________________________________________________________________________________________________ getTrackSeries
-    def getTrackSeries(self):
+    def getTrackSeries(self, tracks =None):
+        """ Returns an ordered dictionary of the four TrackSeries (leftPes, rightPes, leftManus and
+            rightManus) within this trackway, loaded from the database. If a tracks dictionary that
+            maps track uids to track instances is specified, such as the one created by the
+            TrackSeriesLoader, the series are threaded from it in memory instead. """
+
         from cadence.analysis.TrackSeries import TrackSeries
 
         series = OrderedDict()
@@ -106,19 +161,24 @@ class Tracks_Trackway(FlagsTracksDefault):
         series['rightManus'] = TrackSeries(self, firstTrackUid=self.firstRightManus)
 
         for key, s in series.items():
-            s.load()
+            s.load(tracks)
 
         return series
 
 #___________________________________________________________________________________________________ getSitemap
     def getSitemap(self):
-        """getSitemap doc..."""
+        """ Returns the sitemap in which this trackway resides from the parentSitemap
+            relationship, which is only queried if it was not already eagerly loaded. """
         if not self.siteMapIndex:
             return None
+        return self.parentSitemap
 
-        from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
-        model = Tracks_SiteMap.MASTER
-        return self.mySession.query(model).filter(model.index == self.siteMapIndex).first()
+#___________________________________________________________________________________________________ getFirstTracks
+    def getFirstTracks(self):
+        """ Returns a list of the first tracks of each of the four series within this trackway,
+            in the order of the series returned by getTrackSeries(), with None for any series
+            that does not exist. """
+        return [getattr(self, name) for name in self.FIRST_TRACK_RELATIONSHIPS]
 
 #___________________________________________________________________________________________________ populateTrackwaysTable
     @classmethod
@@ -128,11 +188,7 @@ class Tracks_Trackway(FlagsTracksDefault):
             operation should only be carried out for initial population purposes as it will
             dispose of all existing data and changes made by users. """
 
-        from cadence.models.tracks.Tracks_Track import Tracks_Track
-        from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
-        sitemapModel = Tracks_SiteMap.MASTER
-        trackModel   = Tracks_Track.MASTER
-        model        = cls.MASTER
+        model = cls.MASTER
 
         if not logger:
             logger = Logger(cls, printOut=True)
@@ -142,77 +198,318 @@ class Tracks_Trackway(FlagsTracksDefault):
             newSession = True
             session = model.createSession()
 
-        result = session.query(trackModel).filter(trackModel.next == '').all()
+        rows = cls._createTrackwayRows(session, logger)
+
+        # Delete all existing rows if any exist
+        rowCount = session.query(model).count()
+        if rowCount > 0:
+            session.query(model).delete()
+
+        # Insert the new trackways entries in a single bulk statement
+        if rows:
+            session.execute(model.__table__.insert(), rows)
+
+        if newSession:
+            session.commit()
+            session.close()
+
+#___________________________________________________________________________________________________ updateTrackways
+    @classmethod
+    def updateTrackways(cls, session, fingerprints, logger =None):
+        """ Recalculates the rows of the trackways table for the specified trackway fingerprints
+            from the current track linkages, without rebuilding the rest of the table. Rows are
+            updated in place to preserve their indexes, trackways without an existing row are
+            appended and rows of trackways that no longer contain any visible tracks are removed.
+            This is called automatically when tracks are flushed with changes to their linkage,
+            visibility or identity by a session for which Tracks_Track.enableTrackwayUpdates()
+            was called, and returns the number of trackway rows that were changed.
+
+            fingerprints :: List
+                The trackway fingerprints, which are also the names of the trackway rows, to
+                recalculate. """
+
+        from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
+        model        = cls.MASTER
+        table        = model.__table__
+        sitemapModel = Tracks_SiteMap.MASTER
+
+        if not logger:
+            logger = cls._getUpdateLogger()
+
+        fingerprints = sorted(set(fingerprints))
+        if not fingerprints:
+            return 0
+
+        # The graph can extend the fingerprints with those of other trackways whose rows depend
+        # upon the tracks of the specified trackways
+        graph        = cls._loadTrackGraph(session, fingerprints)
+        fingerprints = sorted(graph[2])
+
+        rows = dict()
+        for row in cls._createTrackwayRows(session, logger, graph):
+            rows[row['name']] = row
+
+        existing = dict()
+        for index in range(0, len(fingerprints), cls._UPDATE_BATCH_SIZE):
+            batch = fingerprints[index:index + cls._UPDATE_BATCH_SIZE]
+            query = sqla.select([table.c.i, table.c.name, table.c.siteMapIndex]).where(
+                table.c.name.in_(batch))
+            for row in session.execute(query):
+                existing.setdefault(row.name, row)
+
+        maxIndex  = session.execute(sqla.select([sqla.func.max(table.c.index)])).scalar()
+        nextIndex = 0 if maxIndex is None else maxIndex + 1
+
+        changed  = set()
+        sitemaps = set()
+        for fingerprint in fingerprints:
+            row     = rows.get(fingerprint)
+            current = existing.get(fingerprint)
+            if current is not None:
+                sitemaps.add(current.siteMapIndex)
+
+            if row is None:
+                if current is not None:
+                    session.execute(table.delete().where(table.c.i == current.i))
+                    changed.add(fingerprint)
+                continue
+
+            sitemaps.add(row['siteMapIndex'])
+            if current is None:
+                row['index'] = nextIndex
+                nextIndex   += 1
+                session.execute(table.insert(), [row])
+            else:
+                del row['index']
+                session.execute(table.update().where(table.c.i == current.i).values(**row))
+            changed.add(fingerprint)
+
+        # Loaded trackway instances are expired so that they reflect the recalculated rows, as are
+        # the trackway collections of the sitemaps in which trackways were changed
+        for instance in list(session.identity_map.values()):
+            if isinstance(instance, model) and instance.name in changed:
+                session.expire(instance)
+            elif changed and isinstance(instance, sitemapModel) and instance.index in sitemaps:
+                session.expire(instance, ['trackways'])
+
+        return len(changed)
+
+#===================================================================================================
+#                                                                               P R O T E C T E D
+
+#___________________________________________________________________________________________________ _getUpdateLogger
+    @classmethod
+    def _getUpdateLogger(cls):
+        """ Returns the logger used by updateTrackways() when none is specified, which is created
+            once rather than for every flush. """
+        if cls._updateLogger is None:
+            cls._updateLogger = Logger(cls, printOut=True)
+        return cls._updateLogger
+
+#___________________________________________________________________________________________________ _createFirstTrackRelationship
+    @classmethod
+    def _createFirstTrackRelationship(cls, columnName):
+        """ Creates a view-only relationship to the track whose uid is stored in the specified
+            first track column. """
+        return sqla.orm.relationship(
+            lambda: cls._getTracksModel('Tracks_Track'),
+            primaryjoin=lambda: sqla.orm.foreign(cls.__table__.c[columnName])
+                == sqla.orm.remote(cls._getTracksModel('Tracks_Track').__table__.c.uid),
+            uselist=False,
+            viewonly=True,
+            lazy=cls.RELATIONSHIP_LOADING)
+
+#___________________________________________________________________________________________________ _loadTrackGraph
+    @classmethod
+    def _loadTrackGraph(cls, session, fingerprints =None):
+        """ Loads the linkage and identifying columns of the tracks from which the track graph is
+            built in memory by _createTrackwayRows(), and returns a (links, tracks, fingerprints)
+            tuple. The links are the rows of the loaded tracks in table order and the tracks are
+            the same rows keyed by uid.
+
+            [fingerprints] :: List :: None
+                If specified, only the tracks within the series of these trackways are loaded,
+                along with every track linked to or from them either directly or through other
+                tracks, so that the linkages of each loaded track are complete. The returned
+                fingerprints then also include those of the heads of the loaded tracks, whose
+                rows can be changed by any modification within the specified trackways, and
+                whose tracks are loaded in the same way. Otherwise every track is loaded and the
+                returned fingerprints are None. """
+
+        from cadence.models.tracks.Tracks_Track import Tracks_Track
+        trackModel = Tracks_Track.MASTER
+
+        columns = [
+            trackModel.__table__.c.i, trackModel.uid, trackModel.next, trackModel.hidden,
+            trackModel.left, trackModel.pes, trackModel.site, trackModel.level, trackModel.year,
+            trackModel.sector, trackModel.trackwayType, trackModel.trackwayNumber,
+            trackModel.seriesFingerprintKey]
+
+        if fingerprints is None:
+            links = session.query(*columns).all()
+            return links, dict((row.uid, row) for row in links), None
+
+        fingerprints = set(fingerprints)
+        pending      = set(fingerprints)
+        tracks       = dict()
+        loaded       = set()
+        while pending:
+            keys     = cls._getSeriesKeys(pending) - loaded
+            loaded  |= keys
+            frontier = cls._loadTrackRows(
+                session, columns, trackModel.seriesFingerprintKey, keys, tracks)
+
+            # Whole series are loaded for each newly linked track, so that the number of queries
+            # depends upon the number of series crossed by the linkages and not upon their length
+            while frontier:
+                nexts   = [row.next for row in frontier if row.next and row.next not in tracks]
+                linked  = cls._loadTrackRows(
+                    session, columns, trackModel.next, [row.uid for row in frontier], tracks)
+                linked += cls._loadTrackRows(session, columns, trackModel.uid, nexts, tracks)
+
+                keys     = set(row.seriesFingerprintKey for row in linked) - loaded
+                loaded  |= keys
+                frontier = linked + cls._loadTrackRows(
+                    session, columns, trackModel.seriesFingerprintKey, keys, tracks)
+
+            linkedUids = set(row.next for row in tracks.values() if row.next)
+            pending    = set(
+                trackModel._createTrackwayFingerprint(
+                    row.site, row.level, row.year, row.sector, row.trackwayType,
+                    row.trackwayNumber)
+                for row in tracks.values() if row.uid not in linkedUids) - fingerprints
+            fingerprints |= pending
+
+        links = sorted(tracks.values(), key=lambda row: row.i)
+        return links, tracks, fingerprints
+
+#___________________________________________________________________________________________________ _getSeriesKeys
+    @classmethod
+    def _getSeriesKeys(cls, fingerprints):
+        """ Returns the set of series fingerprint keys of the four series within each of the
+            trackways of the specified fingerprints. """
+
+        from cadence.models.tracks.Tracks_Track import Tracks_Track
+        trackModel = Tracks_Track.MASTER
+
+        out = set()
+        for fingerprint in fingerprints:
+            for left in (True, False):
+                for pes in (True, False):
+                    out.add(trackModel._createSeriesFingerprint(fingerprint, left, pes))
+        return out
+
+#___________________________________________________________________________________________________ _loadTrackRows
+    @classmethod
+    def _loadTrackRows(cls, session, columns, column, values, tracks):
+        """ Loads the rows of the specified columns for the tracks whose column value is one of
+            the specified values, in batches that keep the queries below the SQLite bound
+            parameter limit. Rows of tracks not already within the tracks dictionary are added to
+            it and returned as a list. """
+
+        values = sorted(set(values))
+        size   = 4*cls._UPDATE_BATCH_SIZE
+        out    = []
+        for index in range(0, len(values), size):
+            query = session.query(*columns).filter(column.in_(values[index:index + size]))
+            for row in query:
+                if row.uid not in tracks:
+                    tracks[row.uid] = row
+                    out.append(row)
+        return out
+
+#___________________________________________________________________________________________________ _createTrackwayRows
+    @classmethod
+    def _createTrackwayRows(cls, session, logger, graph =None):
+        """ Calculates the trackways from the track linkages and returns a list of row dictionaries
+            for insertion into the trackways table. The first track of each series is found by
+            walking backwards from every visible last track (one with no next track) until
+            reaching a head, which is a track that no other track links to.
+
+            [graph] :: Tuple :: None
+                The (links, tracks, fingerprints) tuple returned by _loadTrackGraph(), which is
+                loaded for every track if not specified. If it was loaded for a list of
+                fingerprints only the rows of those trackways are returned, while the heads are
+                still resolved against the linkages of every track. """
 
-        index     = 0
-        trackways = dict()
+        from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
+        sitemapModel = Tracks_SiteMap.MASTER
+
+        links, tracks, fingerprints = graph or cls._loadTrackGraph(session)
+
+        # Map each uid to the tracks that link to it, preserving row order so that branched
+        # linkages resolve to the same previous track as a getPreviousTrack() query would
+        previous = dict()
+        for row in links:
+            if row.next:
+                previous.setdefault(row.next, []).append(row.uid)
+
+        sitemaps = dict()
+        for sitemap in session.query(sitemapModel).all():
+            sitemaps.setdefault((sitemap.name, sitemap.level), sitemap)
 
-        # Iterate over every track in the database
-        tested = []
-        for track in result:
-            if track in tested or track.hidden:
+        # Only tracks whose next is an empty string are last tracks, as with the next == '' query
+        # of the original calculation, which means that tracks with a NULL next are never tails
+        trackways = OrderedDict()
+        for row in links:
+            if row.next != '' or row.hidden:
                 continue
 
-            prev = track
-            while prev:
-                tested.append(prev)
-                t = prev.getPreviousTrack()
-                if not t:
-                    break
-                prev = t
+            uid     = row.uid
+            visited = set()
+            while uid in previous and uid not in visited:
+                visited.add(uid)
+                uid = previous[uid][0]
 
-            if not prev:
+            # Heads of trackways that were not requested have no loaded identifying columns
+            prev = tracks.get(uid)
+            if prev is None:
                 continue
 
-            if prev.trackwayFingerprint not in trackways:
-                tw       = Tracks_Trackway()
-                tw.index = index
-                tw.name  = prev.trackwayFingerprint
+            fingerprint = '-'.join([
+                prev.site or '', prev.level or '', prev.year or '', prev.sector or '',
+                prev.trackwayType or '', prev.trackwayNumber or '' ])
+            if fingerprints is not None and fingerprint not in fingerprints:
+                continue
 
-                siteMap = session.query(sitemapModel).filter(
-                    sitemapModel.name == prev.site).filter(
-                    sitemapModel.level == prev.level).first()
-                if not siteMap:
+            tw = trackways.get(fingerprint)
+            if tw is None:
+                tw = dict(
+                    index=len(trackways),
+                    name=fingerprint,
+                    siteMapIndex=0,
+                    firstLeftPes='',
+                    firstRightPes='',
+                    firstLeftManus='',
+                    firstRightManus='')
+
+                sitemap = sitemaps.get((prev.site, prev.level))
+                if not sitemap:
                     logger.write('[WARNING]: No site map found for name "%s" and level "%s"' % (
                         prev.site, prev.level))
                 else:
-                    tw.siteMapIndex = siteMap.index
-                index += 1
-                trackways[tw.name] = tw
-            else:
-                tw = trackways[prev.trackwayFingerprint]
+                    tw['siteMapIndex'] = sitemap.index
+                trackways[fingerprint] = tw
 
             if prev.left and prev.pes:
-                existing = tw.firstLeftPes
-                tw.firstLeftPes = prev.uid
+                key = 'firstLeftPes'
             elif prev.left:
-                existing = tw.firstLeftManus
-                tw.firstLeftManus = prev.uid
+                key = 'firstLeftManus'
             elif prev.pes:
-                existing = tw.firstRightPes
-                tw.firstRightPes = prev.uid
+                key = 'firstRightPes'
             else:
-                existing = tw.firstRightManus
-                tw.firstRightManus = prev.uid
+                key = 'firstRightManus'
+
+            existing = tw[key]
+            tw[key]  = prev.uid
 
             if existing and existing != prev.uid:
                 logger.write([
                     '[WARNING]: Duplicate tracks found for the same series',
                     'TRACKS: "%s" AND "%s"' % (existing, prev.uid),
-                    'TRACKWAY: %s' % tw.name])
+                    'TRACKWAY: %s' % fingerprint])
 
-        # Delete all existing rows if any exist
-        rowCount = session.query(model).count()
-        if rowCount > 0:
-            session.query(model).delete()
-
-        # Add the new trackways entries to the session
-        for fingerprint, trackway in trackways.items():
-            session.add(trackway)
-
-        if newSession:
-            session.commit()
-            session.close()
+        return list(trackways.values())
 
 #===================================================================================================
 #                                                                               I N T R I N S I C
@@ -0,0 +1,116 @@
+# ArrayBlob.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import struct
+import zlib
+
+import numpy as np
+
+#*************************************************************************************************** ArrayBlob
+class ArrayBlob(object):
+    """ Packs numpy arrays into binary blobs for storage in database columns and unpacks them
+        again. Each blob begins with a versioned header that records the dtype and shape of the
+        array, followed by the raw array data, which can optionally be zlib compressed.
+        Uncompressed blobs are unpacked without copying the data, as read-only arrays that view
+        the blob bytes directly.
+
+        Header layout (little-endian):
+            4 bytes     magic 'CDAB'
+            1 byte      format version
+            1 byte      flags (bit 0 set when the data is compressed)
+            1 byte      length of the dtype string
+            1 byte      number of dimensions
+            n bytes     the numpy dtype string, e.g. '<f8'
+            8*ndim      the size of each dimension """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    VERSION     = 1
+    MAGIC       = b'CDAB'
+
+    _COMPRESSED = 0x01
+    _PREFIX     = struct.Struct(str('<4sBBBB'))
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ pack
+    @classmethod
+    def pack(cls, values, dtype =None, compress =False):
+        """ Returns the blob bytes for the specified array-like values.
+
+            [dtype] :: numpy.dtype :: None
+                The dtype in which to store the values. If not specified the dtype of the values is
+                used, or float64 for sequences of numbers.
+
+            [compress] :: Boolean :: False
+                Whether or not to zlib compress the array data, which trades the zero-copy read
+                for a smaller blob. """
+
+        # Unlike ascontiguousarray(), require() keeps the shape of zero-dimensional values
+        values = np.require(
+            values, dtype=dtype or getattr(values, 'dtype', np.float64), requirements='C')
+        dtypeName = values.dtype.str.encode('ascii')
+
+        data  = values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+        flags = 0
+        if compress:
+            data   = zlib.compress(data)
+            flags |= cls._COMPRESSED
+
+        header = cls._PREFIX.pack(
+            cls.MAGIC, cls.VERSION, flags, len(dtypeName), values.ndim) \
+            + dtypeName \
+            + struct.pack(str('<%sQ' % values.ndim), *values.shape)
+        return header + data
+
+#___________________________________________________________________________________________________ unpack
+    @classmethod
+    def unpack(cls, blob):
+        """ Returns the numpy array stored within the specified blob. Uncompressed arrays are
+            read-only views of the blob data and must be copied before being modified. Raises a
+            ValueError if the blob is not a valid array blob of a supported version. """
+
+        if not cls.isArrayBlob(blob):
+            raise ValueError('Blob is not a packed array')
+
+        magic, version, flags, dtypeLength, ndim = cls._PREFIX.unpack_from(blob, 0)
+        if version > cls.VERSION:
+            raise ValueError('Unsupported array blob version %s' % version)
+
+        offset = cls._PREFIX.size
+        dtype  = np.dtype(bytes(blob[offset:offset + dtypeLength]).decode('ascii'))
+        offset += dtypeLength
+
+        shape  = struct.unpack_from(str('<%sQ' % ndim), blob, offset)
+        offset += 8*ndim
+
+        if flags & cls._COMPRESSED:
+            values = np.frombuffer(zlib.decompress(bytes(blob[offset:])), dtype=dtype)
+        else:
+            values = np.frombuffer(blob, dtype=dtype, offset=offset)
+        return values.reshape(shape)
+
+#___________________________________________________________________________________________________ isArrayBlob
+    @classmethod
+    def isArrayBlob(cls, blob):
+        """ Returns whether or not the specified blob begins with an array blob header, which
+            distinguishes it from blobs written in other formats. """
+        return blob is not None \
+            and len(blob) >= cls._PREFIX.size \
+            and bytes(blob[:len(cls.MAGIC)]) == cls.MAGIC
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
@@ -84,8 +84,9 @@ class CadenceDrawing(object):
             argument to establish the correspondence between the Maya scene and the site siteMap
             coordinates. """
 
-        self.fileName = fileName
-        self.siteMap  = siteMap
+        self.fileName  = fileName
+        self.siteMap   = siteMap
+        self.transform = siteMap.getTransform()
 
         # Generally units can be specified in millimeters.  In a few cases, however, (e.g.,
         # PolyLine) the coordinates must be unqualified integers (as px).  The site maps, however
@@ -138,12 +139,8 @@ class CadenceDrawing(object):
             In the scene, x is positive to the left, and z is positive upwards.  In the siteMap, x
             is positive to the right and y is positive downwards. """
 
-        xMap   = p[0]
-        yMap   = p[1]
-        xScene = -self.scaleToScene(xMap - self.siteMap.xFederal)
-        zScene = -self.scaleToScene(yMap - self.siteMap.yFederal)
-
-        return (xScene, zScene)
+        xScene, zScene = self.transform.mapToScene(p[0], p[1])
+        return (float(xScene), float(zScene))
 
 #___________________________________________________________________________________________________ projectToMap
     def projectToMap(self, p):
@@ -152,12 +149,15 @@ class CadenceDrawing(object):
             is positive to the left, and zScene is positive upwards; xMap is positive to the right
             and yMap is positive downwards. """
 
-        xScene = p[0]
-        yScene = p[1]
-        xMap   = self.siteMap.xFederal - self.scaleToMap(xScene)
-        yMap   = self.siteMap.yFederal - self.scaleToMap(yScene)
+        xMap, yMap = self.transform.sceneToMap(p[0], p[1])
+        return (float(xMap), float(yMap))
+
+#___________________________________________________________________________________________________ projectAllToMap
+    def projectAllToMap(self, xScene, zScene):
+        """ Projects numpy arrays of scene coordinates to siteMap locations in a single vectorized
+            call and returns them as an (xMap, yMap) tuple of numpy arrays. """
 
-        return (xMap, yMap)
+        return self.transform.sceneToMap(xScene, zScene)
 
 #___________________________________________________________________________________________________ mm
     def mm(self, p):
@@ -0,0 +1,109 @@
+# LruCache.py
+# (C)2014
+# Scott Ernst
+
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from collections import OrderedDict
+
+#*************************************************************************************************** LruCache
+class LruCache(object):
+    """ A dictionary-like cache of a bounded number of values. When the cache is full, adding a
+        value discards the least recently used value. Keys can be any hashable value, such as a
+        tuple of query parameters. """
+
+#===================================================================================================
+#                                                                                       C L A S S
+
+    # Marker returned by get() for keys that are not in the cache, as None is a valid value
+    MISSING = object()
+
+#___________________________________________________________________________________________________ __init__
+    def __init__(self, maxSize =256):
+        """ Creates a new instance of LruCache.
+
+            [maxSize] :: Integer :: 256
+                The maximum number of values held by the cache. """
+
+        self._maxSize = max(1, maxSize)
+        self._values  = OrderedDict()
+        self._hits    = 0
+        self._misses  = 0
+
+#===================================================================================================
+#                                                                                   G E T / S E T
+
+#___________________________________________________________________________________________________ GS: maxSize
+    @property
+    def maxSize(self):
+        return self._maxSize
+
+#___________________________________________________________________________________________________ GS: hits
+    @property
+    def hits(self):
+        """ The number of get() calls that found their key since the cache was created. """
+        return self._hits
+
+#___________________________________________________________________________________________________ GS: misses
+    @property
+    def misses(self):
+        """ The number of get() calls that did not find their key since the cache was
+            created. """
+        return self._misses
+
+#===================================================================================================
+#                                                                                     P U B L I C
+
+#___________________________________________________________________________________________________ get
+    def get(self, key, default =MISSING):
+        """ Returns the value cached for the specified key, marking it as the most recently used,
+            or the default value if the key is not in the cache. """
+
+        value = self._values.pop(key, self.MISSING)
+        if value is self.MISSING:
+            self._misses += 1
+            return default
+
+        self._values[key] = value
+        self._hits += 1
+        return value
+
+#___________________________________________________________________________________________________ put
+    def put(self, key, value):
+        """ Caches the value for the specified key as the most recently used value and returns
+            the value. """
+
+        self._values.pop(key, None)
+        self._values[key] = value
+        while len(self._values) > self._maxSize:
+            self._values.popitem(last=False)
+        return value
+
+#___________________________________________________________________________________________________ remove
+    def remove(self, key):
+        """ Removes the specified key from the cache if it is present. """
+        self._values.pop(key, None)
+
+#___________________________________________________________________________________________________ clear
+    def clear(self):
+        """ Removes every value from the cache. """
+        self._values.clear()
+
+#===================================================================================================
+#                                                                               I N T R I N S I C
+
+#___________________________________________________________________________________________________ __contains__
+    def __contains__(self, key):
+        return key in self._values
+
+#___________________________________________________________________________________________________ __len__
+    def __len__(self):
+        return len(self._values)
+
+#___________________________________________________________________________________________________ __repr__
+    def __repr__(self):
+        return self.__str__()
+
+#___________________________________________________________________________________________________ __str__
+    def __str__(self):
+        return '<%s %s/%s>' % (self.__class__.__name__, len(self._values), self._maxSize)
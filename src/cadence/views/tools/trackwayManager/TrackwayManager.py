@@ -5,6 +5,7 @@
 from __future__ import print_function, absolute_import, unicode_literals, division
 
 import nimble
+import sqlalchemy as sqla
 
 from nimble import cmds
 
@@ -14,9 +15,11 @@ from cadence.CadenceEnvironment import CadenceEnvironment
 from cadence.enums.TrackPropEnum import TrackPropEnum
 from cadence.enums.SourceFlagsEnum import SourceFlagsEnum
 
+from cadence.models.TrackNoteIndex import TrackNoteIndex
 from cadence.models.tracks.Tracks_Track import Tracks_Track
 from cadence.models.tracks.Tracks_SiteMap import Tracks_SiteMap
 
+from cadence.util.caching.LruCache import LruCache
 from cadence.util.maya.MayaUtils import MayaUtils
 
 from cadence.mayan.trackway import GetSelectedUidList
@@ -42,9 +45,31 @@ class TrackwayManager(object):
     FIT_FACTOR   = 0.2
     CADENCE_CAM  = 'CadenceCam'
 
+    # Maximum number of query results and track instances held by the caches
+    QUERY_CACHE_SIZE = 128
+    TRACK_CACHE_SIZE = 20000
+
+    # Maximum number of uids within a single IN clause
+    UID_BATCH_SIZE   = 500
+
 #___________________________________________________________________________________________________ __init__
-    def __init__(self):
-        self._session = None
+    def __init__(self, createSession =None):
+        """ Query results are cached until the database is changed, which is detected from the
+            SQLite data version of a connection held open by the manager, or until the manager
+            writes to the database or to the track nodes. Where the SQLite library does not report
+            the data version they are only cached until the current session is closed. Track
+            instances belong to the current session and are cached until it is closed.
+
+            [createSession] :: Function :: None
+                Creates the sessions into the tracks database, which defaults to the
+                createSession() method of the Tracks_Track model. """
+
+        self._createSession     = createSession or Tracks_Track.MASTER.createSession
+        self._session           = None
+        self._versionConnection = None
+        self._dataVersion       = None
+        self._queryCache        = LruCache(self.QUERY_CACHE_SIZE)
+        self._trackCache        = LruCache(self.TRACK_CACHE_SIZE)
 
 #===================================================================================================
 #                                                                                     P U B L I C
@@ -76,9 +101,8 @@ class TrackwayManager(object):
         uidList = self.getUidList()
 
         # and from this list of UIDs, compile the corresponding list of track instances
-        tracks  = []
-        for uid in uidList:
-            tracks.append(self.getTrackByUid(uid))
+        found  = self._fetchTracks(uidList)
+        tracks = [found.get(uid) for uid in uidList]
 
         self.closeSession()
         return tracks if len(tracks) > 0 else None
@@ -135,29 +159,16 @@ class TrackwayManager(object):
         """ Creates a list of all tracks that have a given source flag either set or cleared,
             based on the boolean argument set. """
 
-        model   = Tracks_Track.MASTER
-        state   = flag if set else 0
-        size    = 200
-        iMax    = len(uidList)/size
-        i       = 0
-        entries = []
+        model = Tracks_Track.MASTER
+        state = flag if set else 0
+        key   = ('flagged', flag, state, tuple(uidList))
 
-        session = self._getSession()
-        while i < iMax:
-            query   = session.query(model)
-            batch   = uidList[i*size : (i + 1)*size]
-            query   = query.filter(model.uid.in_(batch))
-            query   = query.filter(model.sourceFlags.op('&')(flag) == state)
-            entries += query.all()
-            i       += 1
-
-        if i*size < len(uidList):
-            query   = session.query(model)
-            batch   = uidList[i*size :]
-            query   = query.filter(model.uid.in_(batch))
-            query   = query.filter(model.sourceFlags.op('&')(flag) == state)
-            entries += query.all()
+        uids = self._getCachedQuery(key)
+        if uids is None:
+            uids = self._queryCache.put(key, self._queryUids(
+                uidList, model.sourceFlags.op('&')(flag) == state))
 
+        entries = self.getTracksByUid(uids)
         self.closeSession(commit=False)
 
         return entries if len(entries) > 0 else None
@@ -236,9 +247,10 @@ class TrackwayManager(object):
         if len(selectedUidList) == 0:
             return None
 
+        found  = self._fetchTracks(selectedUidList)
         tracks = []
         for uid in selectedUidList:
-            track = self.getTrackByUid(uid)
+            track = found.get(uid)
             track.updateFromNode()
             tracks.append(track)
         return tracks
@@ -253,7 +265,7 @@ class TrackwayManager(object):
         siteMap = session.query(model).filter(model.index == index).first()
 
         # close this session to release the database lock
-        session.close()
+        self.closeSession(commit=False)
 
         # an indicator that the siteMap table is not yet populated for this index, check the scale
         if not siteMap or siteMap.scale == 0:
@@ -265,8 +277,23 @@ class TrackwayManager(object):
     def getTrackByUid(self, uid):
         """ This gets the track model instance corresponding to a given uid. """
 
-        model = Tracks_Track.MASTER
-        return model.getByUid(uid, self._getSession())
+        track = self._trackCache.get(uid, None)
+        if track is not None:
+            return track
+
+        track = Tracks_Track.MASTER.getByUid(uid, self._getSession())
+        if track is not None:
+            self._trackCache.put(uid, track)
+        return track
+
+#___________________________________________________________________________________________________ getTracksByUid
+    def getTracksByUid(self, uids):
+        """ Returns a list of the track model instances corresponding to the given list of uids,
+            in the same order. Tracks that are not cached are fetched in batches instead of one
+            query per uid, and uids without a track are skipped. """
+
+        found = self._fetchTracks(uids)
+        return [found[uid] for uid in uids if uid in found]
 
 #___________________________________________________________________________________________________ getTracksByUid
     def getTracksByProperties(self, **kwargs):
@@ -319,37 +346,20 @@ class TrackwayManager(object):
     def getTracksAfter(self, track):
         """ This returns all tracks that are subsequent to a given specified track. If track is the
             last track in the series (or an isolated track), it returns None, rather than the empty
-            list. """
+            list. The tracks are retrieved with a single recursive query. """
 
-        track = self.getNextTrack(track)
-
-        if not track:
-            return None
-
-        tracks = []
-        while track:
-            tracks.append(track)
-            track = self.getNextTrack(track)
-
-        return tracks
+        tracks = self._getCachedSeries('after', track)
+        return tracks if tracks else None
 
 #___________________________________________________________________________________________________ getTracksBefore
     def getTracksBefore(self, track):
         """ This returns all tracks that are before a given specified track.  If track is the first
             track in the series (or an isolated track), it returns None, rather than the empty
-            list. """
-
-        track = self.getPreviousTrack(track)
-
-        if not track:
-            return None
-
-        tracks = []
-        while track:
-            tracks.append(track)
-            track = self.getPreviousTrack(track)
+            list. The tracks are ordered from the nearest preceding track to the first track in
+            the series and are retrieved with a single recursive query. """
 
-        return tracks
+        tracks = self._getCachedSeries('before', track)
+        return tracks if tracks else None
 
  #__________________________________________________________________________________________________ getTrackSeries
     def getTrackSeries(self, track):
@@ -362,7 +372,7 @@ class TrackwayManager(object):
 
         tracksBefore = self.getTracksBefore(track)
         if tracksBefore:
-            series.extend(tracksBefore)
+            series.extend(reversed(tracksBefore))
 
         series.append(track)
 
@@ -377,35 +387,20 @@ class TrackwayManager(object):
         """ Creates a list of all tracks that have Maya tracknodes (hence are in the uidList) and
             have the specified trackwayName (trackway type and trackway number). """
 
-        model   = Tracks_Track.MASTER
-        size    = 200
-        iMax    = len(uidList)/size
-        i       = 0
-        tracks  = []
-        type    = trackwayName[0]
-        number  = trackwayName[1:]
+        model  = Tracks_Track.MASTER
+        type   = trackwayName[0]
+        number = trackwayName[1:]
 
         if not uidList:
             uidList = self.getUidList()
 
-        session = self._getSession()
-        while i < iMax:
-            query   = session.query(model)
-            batch   = uidList[i*size : (i + 1)*size]
-            query   = query.filter(model.uid.in_(batch))
-            query   = query.filter(model.trackwayType == type)
-            query   = query.filter(model.trackwayNumber == number)
-            tracks += query.all()
-            i       += 1
-
-        if i*size < len(uidList):
-            query   = session.query(model)
-            batch   = uidList[i*size :]
-            query   = query.filter(model.uid.in_(batch))
-            query   = query.filter(model.trackwayType == type)
-            query   = query.filter(model.trackwayNumber == number)
-            tracks += query.all()
+        key  = ('trackway', trackwayName, tuple(uidList))
+        uids = self._getCachedQuery(key)
+        if uids is None:
+            uids = self._queryCache.put(key, self._queryUids(
+                uidList, model.trackwayType == type, model.trackwayNumber == number))
 
+        tracks = self.getTracksByUid(uids)
         self.closeSession(commit=False)
         return tracks if len(tracks) > 0 else None
 
@@ -416,6 +411,11 @@ class TrackwayManager(object):
             sectors. Hence it is necessary to fully qualify the trackway name with site, level, and
             sector. """
 
+        key           = ('trackwayNames', site, level, sector)
+        trackwayNames = self._getCachedQuery(key)
+        if trackwayNames is not None:
+            return list(trackwayNames) if trackwayNames else None
+
         props = {
             TrackPropEnum.SITE.name:site,
             TrackPropEnum.LEVEL.name:level,
@@ -433,6 +433,7 @@ class TrackwayManager(object):
         # remove the duplicates, sort 'em and return 'em
         trackwayNames = list(set(trackwayNames))
         trackwayNames.sort()
+        self._queryCache.put(key, list(trackwayNames))
 
         return trackwayNames if len(trackwayNames) > 0 else None
 
@@ -482,6 +483,24 @@ class TrackwayManager(object):
         if len(nodes) > 0:
             cmds.select(nodes)
 
+#___________________________________________________________________________________________________ findTracksByNote
+    def findTracksByNote(self, text, limit =None):
+        """ Returns a list of the tracks whose note (which includes any importer errors) or
+            snapshot keys contain every word of the specified text, best matches first. """
+
+        return TrackNoteIndex.getTracks(self._getSession(), text, limit=limit)
+
+#___________________________________________________________________________________________________ selectTracksByNote
+    def selectTracksByNote(self, text, limit =None):
+        """ Selects the track nodes of the tracks matching the specified note text that have been
+            loaded into Maya, and returns the list of matching tracks. """
+
+        tracks = self.findTracksByNote(text, limit=limit)
+        nodes  = [n for n in [self.getTrackNode(t) for t in tracks] if n]
+        if nodes:
+            cmds.select(nodes)
+        return tracks
+
 #___________________________________________________________________________________________________ selectSeriesAfter
     def selectSeriesAfter(self, track):
         """ Selects all tracks in a sequence after a given specific track. """
@@ -534,6 +553,7 @@ class TrackwayManager(object):
             SetNodeDatum,
             nodeValuePairs=nodeValuePairs,
             runInMaya=True)
+        self.invalidateCache()
 
         # Check to see if the remote command execution was successful
         if not result.success:
@@ -574,6 +594,7 @@ class TrackwayManager(object):
             SetNodeLinks,
             nodeLinks=nodeLinks,
             runInMaya=True)
+        self.invalidateCache()
 
         # Check to see if the remote command execution was successful
         if not result.success:
@@ -788,13 +809,26 @@ class TrackwayManager(object):
         cmds.setAttr('%s.visibility' % layer, visible)
 
 
+#___________________________________________________________________________________________________ invalidateCache
+    def invalidateCache(self):
+        """ Discards every cached query result, which is done automatically whenever the manager
+            writes to the database or to the track nodes and when the database is changed by
+            others. Cached track instances are kept until the session is closed, as they remain
+            valid within it. """
+        self._queryCache.clear()
+
 #___________________________________________________________________________________________________ closeSession
     def closeSession(self, commit =True):
         """ Closes a session and indicates such by nulling out model and session.  This is public
-            because the TrackwayManagerWidget needs to call it."""
+            because the TrackwayManagerWidget needs to call it. The cached track instances are
+            discarded with the session they belong to, while the cached query results are kept
+            until the database is changed. """
 
         session = self._session
         self._session = None
+        self._trackCache.clear()
+        if self._dataVersion is None:
+            self._queryCache.clear()
 
         if session:
             if commit:
@@ -810,10 +844,113 @@ class TrackwayManager(object):
     def _getSession(self):
         """ Access to model instances is based on the current model and session, stored in two
             local instance variables so that multiple operations can be performed before closing
-            this given session. """
+            this given session. The rows of the trackways affected by link, visibility or
+            identity edits are recalculated as the session flushes them. """
 
         if self._session is not None:
             return self._session
 
-        self._session = Tracks_Track.MASTER.createSession()
+        self._session = self._createSession()
+        Tracks_Track.enableTrackwayUpdates(self._session)
+        sqla.event.listen(self._session, 'after_flush', self._handleSessionFlush)
         return self._session
+
+#___________________________________________________________________________________________________ _getCachedQuery
+    def _getCachedQuery(self, key):
+        """ Returns the cached result of the query with the specified key, or None if it is not
+            cached. Every cached result is discarded first if the database was changed since the
+            previous lookup. """
+
+        version = self._getDataVersion()
+        if version != self._dataVersion:
+            self._queryCache.clear()
+            self._dataVersion = version
+        return self._queryCache.get(key, None)
+
+#___________________________________________________________________________________________________ _getDataVersion
+    def _getDataVersion(self):
+        """ Returns the SQLite data version of the tracks database read on a connection held open
+            by the manager, which changes whenever another connection commits a change to the
+            database, or None if the SQLite library does not report it. """
+
+        if self._versionConnection is None:
+            session = self._createSession()
+            try:
+                self._versionConnection = session.get_bind(Tracks_Track.MASTER).connect()
+            finally:
+                session.close()
+
+        row = self._versionConnection.execute('PRAGMA data_version').first()
+        return None if row is None else row[0]
+
+#___________________________________________________________________________________________________ _fetchTracks
+    def _fetchTracks(self, uids):
+        """ Returns a dictionary of the track instances for the specified uids, keyed by uid. The
+            tracks that are not already cached are fetched with batched IN queries. """
+
+        found   = dict()
+        missing = []
+        for uid in uids:
+            track = self._trackCache.get(uid, None)
+            if track is None:
+                missing.append(uid)
+            else:
+                found[uid] = track
+
+        if not missing:
+            return found
+
+        model   = Tracks_Track.MASTER
+        session = self._getSession()
+        size    = self.UID_BATCH_SIZE
+        for i in range(0, len(missing), size):
+            query = session.query(model).filter(model.uid.in_(missing[i:i + size]))
+            for track in query:
+                found[track.uid] = self._trackCache.put(track.uid, track)
+        return found
+
+#___________________________________________________________________________________________________ _queryUids
+    def _queryUids(self, uidList, *criteria):
+        """ Returns the list of uids within the specified uid list whose tracks meet all of the
+            specified filter criteria, in the order of the uid list. """
+
+        model   = Tracks_Track.MASTER
+        session = self._getSession()
+        size    = self.UID_BATCH_SIZE
+        matches = set()
+        for i in range(0, len(uidList), size):
+            query = session.query(model.uid).filter(model.uid.in_(uidList[i:i + size]))
+            for criterion in criteria:
+                query = query.filter(criterion)
+            matches.update(row[0] for row in query)
+        return [uid for uid in uidList if uid in matches]
+
+#___________________________________________________________________________________________________ _getCachedSeries
+    def _getCachedSeries(self, direction, track):
+        """ Returns the list of tracks after or before the specified track, depending on the
+            direction, with the uids of the series cached until the next write. """
+
+        key  = (direction, track.uid)
+        uids = self._getCachedQuery(key)
+        if uids is not None:
+            return self.getTracksByUid(uids)
+
+        model = Tracks_Track.MASTER
+        if direction == 'after':
+            tracks = model.getTracksAfter(track.uid, self._getSession())
+        else:
+            tracks = model.getTracksBefore(track.uid, self._getSession())
+
+        for t in tracks:
+            self._trackCache.put(t.uid, t)
+        self._queryCache.put(key, [t.uid for t in tracks])
+        return tracks
+
+#===================================================================================================
+#                                                                                 H A N D L E R S
+
+#___________________________________________________________________________________________________ _handleSessionFlush
+    def _handleSessionFlush(self, session, flushContext):
+        """ Any flush writes track changes, such as flag or link changes, to the database and so
+            invalidates the cached query results. """
+        self.invalidateCache()
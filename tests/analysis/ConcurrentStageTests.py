@@ -0,0 +1,74 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import threading
+import time
+
+import matplotlib.pyplot as plt
+
+from cadence.analysis.AnalysisStage import AnalysisStage
+from cadence.analysis.AnalyzerBase import AnalyzerBase
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+
+#___________________________________________________________________________________________________ QueryStage
+class QueryStage(AnalysisStage):
+    """ Queries the file-backed tracks database repeatedly through the tracks session of the
+        thread on which the stage runs, waiting for the other stage so that both are running
+        at the same time. """
+
+    started   = set()
+    condition = threading.Condition()
+
+    def __init__(self, key, owner, **kwargs):
+        super(QueryStage, self).__init__(key, owner, dependencies=[], **kwargs)
+        self.session = None
+        self.error   = None
+        self.thread  = None
+
+    def _analyze(self):
+        try:
+            self.thread  = threading.current_thread().ident
+            self.session = self.owner.getTracksSession()
+            self._waitForOther()
+            for index in range(20):
+                self.session.query(Tracks_Track.MASTER).limit(50).all()
+        except Exception as err:
+            self.error = err
+            raise
+
+    def _waitForOther(self, timeout =30.0):
+        end = time.time() + timeout
+        with self.condition:
+            self.started.add(self.key)
+            self.condition.notify_all()
+            while len(self.started) < 2 and time.time() < end:
+                self.condition.wait(max(0.0, end - time.time()))
+            if len(self.started) < 2:
+                raise RuntimeError('Timed out waiting for the other stage to start')
+
+#___________________________________________________________________________________________________ ConcurrentAnalyzer
+class ConcurrentAnalyzer(AnalyzerBase):
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('readOnly', True)
+        kwargs.setdefault('maxWorkers', 2)
+        super(ConcurrentAnalyzer, self).__init__(**kwargs)
+        self.addStage(QueryStage('first', self))
+        self.addStage(QueryStage('second', self))
+
+analyzer = ConcurrentAnalyzer()
+analyzer.run()
+first, second = analyzer.stages
+
+print('[TEST]: Concurrent stages query without errors %s' % (
+    'PASSED' if first.error is None and second.error is None else 'FAILED'))
+print('ERRORS:', first.error, second.error)
+
+print('[TEST]: Concurrent stages run on separate threads %s' % (
+    'PASSED' if first.thread and second.thread and first.thread != second.thread else 'FAILED'))
+
+print('[TEST]: Concurrent stages use separate sessions %s' % (
+    'PASSED' if first.session is not None and first.session is not second.session else 'FAILED'))
+
+print('[TEST]: Concurrent stages use the non-interactive backend %s' % (
+    'PASSED' if plt.get_backend().lower() == AnalyzerBase.CONCURRENT_BACKEND.lower()
+    else 'FAILED'))
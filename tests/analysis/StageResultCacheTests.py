@@ -0,0 +1,89 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import os
+import shutil
+import tempfile
+
+from cadence.analysis.StageResultCache import StageResultCache
+
+#___________________________________________________________________________________________________ FixtureStage
+class FixtureStage(object):
+    CACHE_VERSION = 1
+
+    def __init__(self, key ='fixture', version =1):
+        self.key           = key
+        self.CACHE_VERSION = version
+
+#___________________________________________________________________________________________________ FixtureObject
+class FixtureObject(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+COLUMNS = ('uid', 'next', 'width')
+
+def createSeries(width =0.5, isReady =True):
+    tracks = [
+        FixtureObject(uid='t1', next='t2', width=width),
+        FixtureObject(uid='t2', next='', width=0.4) ]
+    return {'leftPes': FixtureObject(tracks=tracks, isReady=isReady)}
+
+path     = tempfile.mkdtemp()
+trackway = FixtureObject(uid='BEB-515-2014-A-S-1')
+
+try:
+    cache = StageResultCache(path, FixtureStage(), COLUMNS)
+    key   = cache.createKey(trackway, createSeries())
+    saved = cache.save(key, {'entries': [1, 2, 3]})
+    found, result = cache.load(key)
+    print('[TEST]: Stored result round trips %s' % (
+        'PASSED' if saved and found and result == {'entries': [1, 2, 3]} else 'FAILED'))
+
+    cache = StageResultCache(path, FixtureStage(), COLUMNS)
+    found, result = cache.load(cache.createKey(trackway, createSeries()))
+    print('[TEST]: Stored result is found by a new cache %s' % (
+        'PASSED' if found and cache.hits == 1 and cache.misses == 0 else 'FAILED'))
+
+    changed = cache.createKey(trackway, createSeries(width=0.6))
+    print('[TEST]: Changed track column invalidates the key %s' % (
+        'PASSED' if changed != key and not cache.load(changed)[0] else 'FAILED'))
+
+    print('[TEST]: Changed series readiness invalidates the key %s' % (
+        'PASSED' if cache.createKey(trackway, createSeries(isReady=False)) != key else 'FAILED'))
+
+    other = StageResultCache(path, FixtureStage(version=2), COLUMNS)
+    print('[TEST]: Changed cache version invalidates the key %s' % (
+        'PASSED' if other.createKey(trackway, createSeries()) != key else 'FAILED'))
+
+    other = StageResultCache(path, FixtureStage(), COLUMNS[:2])
+    print('[TEST]: Changed cache columns invalidate the key %s' % (
+        'PASSED' if other.createKey(trackway, createSeries()) != key else 'FAILED'))
+
+    StageResultCache._SOURCE_DIGESTS.clear()
+    dependencies = StageResultCache.DEPENDENCY_MODULES
+    StageResultCache.DEPENDENCY_MODULES = (StageResultCache.__module__,)
+    try:
+        other = StageResultCache(path, FixtureStage(), COLUMNS)
+    finally:
+        StageResultCache.DEPENDENCY_MODULES = dependencies
+        StageResultCache._SOURCE_DIGESTS.clear()
+    print('[TEST]: Changed dependency code invalidates the key %s' % (
+        'PASSED' if other.createKey(trackway, createSeries()) != key else 'FAILED'))
+
+    cold = StageResultCache(path, FixtureStage(), COLUMNS, cold=True)
+    print('[TEST]: Cold cache ignores stored results %s' % (
+        'PASSED' if not cold.load(key)[0] and cold.misses == 1 else 'FAILED'))
+
+    with open(os.path.join(path, key + StageResultCache.EXTENSION), 'wb') as f:
+        f.write(b'not a pickle')
+    print('[TEST]: Unreadable result is treated as missing %s' % (
+        'PASSED' if not StageResultCache(path, FixtureStage(), COLUMNS).load(key)[0]
+        else 'FAILED'))
+
+    cache = StageResultCache(path, FixtureStage(), COLUMNS)
+    cache.save(changed, {'entries': []})
+    removed = cache.prune()
+    print('[TEST]: Prune removes unused results %s' % (
+        'PASSED' if removed == 1 and os.listdir(path) == [changed + StageResultCache.EXTENSION]
+        else 'FAILED'))
+finally:
+    shutil.rmtree(path)
@@ -0,0 +1,60 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import sqlalchemy as sqla
+from sqlalchemy import orm
+
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+
+# Fixture tracks inserted into an in-memory database in row order, which differs from the series
+# order so that the results are ordered by link depth rather than by row id
+LINKS = [
+    ('a3', 'a4'), ('a1', 'a2'), ('a4', ''), ('a2', 'a3'),  # linear series a1 to a4
+    ('c1', 'c2'), ('c2', 'c3'), ('c3', 'c1'),              # cycle back onto c1
+    ('b1', 'b2'), ('b2', 'missing'),                       # broken link after b2
+    ('p1', 'm1'), ('p2', 'm1'), ('m1', '') ]               # branched linkage onto m1
+
+model  = Tracks_Track
+engine = sqla.create_engine('sqlite://')
+model.__table__.create(engine)
+engine.execute(model.__table__.insert(), [dict(uid=uid, next=next) for uid, next in LINKS])
+session = orm.sessionmaker(bind=engine)()
+
+def getUids(result):
+    return [t.uid for t in (result.tracks if hasattr(result, 'tracks') else result)]
+
+def test(label, result, expected, cycleUid =None):
+    passed = getUids(result) == expected and getattr(result, 'cycleUid', None) == cycleUid
+    print('[TEST]: %s %s' % (label, 'PASSED' if passed else 'FAILED'))
+    if not passed:
+        print('    RESULT:', getUids(result), getattr(result, 'cycleUid', None))
+
+test('Forward series is ordered by link', model.querySeries('a1', session),
+     ['a1', 'a2', 'a3', 'a4'])
+test('Forward series from the middle', model.querySeries('a2', session), ['a2', 'a3', 'a4'])
+test('Backward series is ordered from the nearest track',
+     model.querySeries('a4', session, forward=False), ['a4', 'a3', 'a2', 'a1'])
+
+test('Max depth limits the links followed', model.querySeries('a1', session, maxDepth=2),
+     ['a1', 'a2', 'a3'])
+test('Max depth of zero returns only the track', model.querySeries('a1', session, maxDepth=0),
+     ['a1'])
+
+test('Cycle terminates and reports the repeated track', model.querySeries('c1', session),
+     ['c1', 'c2', 'c3'], 'c1')
+test('Backward cycle terminates and reports the repeated track',
+     model.querySeries('c1', session, forward=False), ['c1', 'c3', 'c2'], 'c1')
+
+test('Broken link ends the series', model.querySeries('b1', session), ['b1', 'b2'])
+test('Unknown track returns an empty series', model.querySeries('missing', session), [])
+
+test('Backward branch follows the lowest row id',
+     model.querySeries('m1', session, forward=False), ['m1', 'p1'])
+print('[TEST]: Backward branch matches getPreviousTrack %s' % (
+    'PASSED' if model.getByUid('m1', session).getPreviousTrack(session).uid == 'p1'
+    else 'FAILED'))
+
+test('Tracks after exclude the track', model.getTracksAfter('a1', session), ['a2', 'a3', 'a4'])
+test('Tracks before run from the nearest to the first track',
+     model.getTracksBefore('a4', session), ['a3', 'a2', 'a1'])
+
+session.close()
@@ -0,0 +1,47 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from array import array
+
+import numpy as np
+from pyaid.string.ByteChunk import ByteChunk
+
+from cadence.analysis.shared.PositionValue2D import PositionValue2D
+from cadence.models.analysis.Analysis_TrackCurve import Analysis_TrackCurve
+from cadence.shared.io.ArrayBlob import ArrayBlob
+
+POINTS = [
+    (0.0, 0.0, 0.01, 0.02),
+    (1.5, 2.5, 0.03, 0.04),
+    (3.0, 5.0, 0.05, 0.06) ]
+
+expected = np.array(POINTS, dtype=np.float64)
+
+# Points written by the ByteChunk format used before array blobs
+store = array(str('d'))
+for point in POINTS:
+    store.extend(point)
+chunk = ByteChunk()
+chunk.writeArrayChunk(store)
+legacyBlob = bytes(chunk.byteArray)
+
+print('[TEST]: Legacy blob is not an array blob %s' % (
+    'PASSED' if not ArrayBlob.isArrayBlob(legacyBlob) else 'FAILED'))
+
+curve = Analysis_TrackCurve()
+curve.pointBlob = legacyBlob
+print('[TEST]: Legacy ByteChunk points are read %s' % (
+    'PASSED' if curve.points.shape == (3, 4) and np.array_equal(curve.points, expected)
+    else 'FAILED'))
+
+curve = Analysis_TrackCurve()
+curve.points = [PositionValue2D(*point) for point in POINTS]
+print('[TEST]: Points are stored as an array blob %s' % (
+    'PASSED' if ArrayBlob.isArrayBlob(curve.pointBlob) else 'FAILED'))
+print('[TEST]: Stored points round trip %s' % (
+    'PASSED' if np.array_equal(curve.points, expected) else 'FAILED'))
+print('[TEST]: Position values are created from the points %s' % (
+    'PASSED' if [p.toTuple() for p in curve.positionValues] == POINTS else 'FAILED'))
+
+curve.points = None
+print('[TEST]: Cleared points are empty %s' % (
+    'PASSED' if curve.pointBlob is None and curve.points.shape == (0, 4) else 'FAILED'))
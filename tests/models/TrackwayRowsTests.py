@@ -0,0 +1,128 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from collections import namedtuple
+
+from cadence.models.tracks.Tracks_Trackway import Tracks_Trackway
+
+Track   = namedtuple('Track', [
+    'uid', 'next', 'hidden', 'left', 'pes', 'site', 'level', 'year', 'sector', 'trackwayType',
+    'trackwayNumber'])
+Sitemap = namedtuple('Sitemap', ['name', 'level', 'index'])
+
+def createTrack(uid, next, number ='1', left =True, pes =True, hidden =False, site ='BEB'):
+    return Track(uid, next, hidden, left, pes, site, '515', '2014', 'A', 'S', number)
+
+# A small fixture graph covering simple series, a branched linkage, duplicate series within one
+# trackway, a hidden last track, a track with a NULL next and a site without a sitemap
+TRACKS = [
+    createTrack('a1', 'a2'),
+    createTrack('a2', 'a3'),
+    createTrack('a3', ''),
+    createTrack('b1', 'b2', left=False),
+    createTrack('b2', '', left=False),
+    createTrack('c1', 'c3', pes=False),
+    createTrack('c2', 'c3', pes=False),
+    createTrack('c3', '', pes=False),
+    createTrack('d1', '', number='2'),
+    createTrack('d2', 'd3', number='2'),
+    createTrack('d3', '', number='2'),
+    createTrack('e1', 'e2', number='3'),
+    createTrack('e2', '', number='3', hidden=True),
+    createTrack('f1', None, number='4'),
+    createTrack('g1', '', number='5', site='XYZ') ]
+
+SITEMAPS = [Sitemap('BEB', '515', 1)]
+
+#___________________________________________________________________________________________________ FixtureSession
+class FixtureSession(object):
+    """ Returns the fixture sitemaps for the sitemap query of the calculation. """
+    def query(self, *args):
+        return self
+    def all(self):
+        return list(SITEMAPS)
+
+#___________________________________________________________________________________________________ RecordingLogger
+class RecordingLogger(object):
+    def __init__(self):
+        self.lines = []
+    def write(self, value):
+        self.lines.append(value)
+
+#___________________________________________________________________________________________________ createOriginalRows
+def createOriginalRows(logger):
+    """ The original calculation, which queried the tracks with an empty next and walked back
+        through getPreviousTrack() queries from each visible one. """
+
+    def getPreviousTrack(track):
+        for t in TRACKS:
+            if t.next == track.uid:
+                return t
+        return None
+
+    trackways = dict()
+    order     = []
+    for track in [t for t in TRACKS if t.next == '']:
+        if track.hidden:
+            continue
+
+        prev = track
+        while True:
+            t = getPreviousTrack(prev)
+            if not t:
+                break
+            prev = t
+
+        fingerprint = '-'.join([
+            prev.site, prev.level, prev.year, prev.sector, prev.trackwayType,
+            prev.trackwayNumber])
+        if fingerprint not in trackways:
+            tw = dict(
+                index=len(order), name=fingerprint, siteMapIndex=0, firstLeftPes='',
+                firstRightPes='', firstLeftManus='', firstRightManus='')
+            siteMap = [s for s in SITEMAPS if s.name == prev.site and s.level == prev.level]
+            if not siteMap:
+                logger.write('[WARNING]: No site map found for name "%s" and level "%s"' % (
+                    prev.site, prev.level))
+            else:
+                tw['siteMapIndex'] = siteMap[0].index
+            trackways[fingerprint] = tw
+            order.append(fingerprint)
+        else:
+            tw = trackways[fingerprint]
+
+        if prev.left and prev.pes:
+            key = 'firstLeftPes'
+        elif prev.left:
+            key = 'firstLeftManus'
+        elif prev.pes:
+            key = 'firstRightPes'
+        else:
+            key = 'firstRightManus'
+
+        existing = tw[key]
+        tw[key]  = prev.uid
+        if existing and existing != prev.uid:
+            logger.write([
+                '[WARNING]: Duplicate tracks found for the same series',
+                'TRACKS: "%s" AND "%s"' % (existing, prev.uid),
+                'TRACKWAY: %s' % fingerprint])
+
+    return [trackways[name] for name in order]
+
+expectedLogger = RecordingLogger()
+expected       = createOriginalRows(expectedLogger)
+
+logger = RecordingLogger()
+graph  = (TRACKS, dict((t.uid, t) for t in TRACKS), None)
+rows   = Tracks_Trackway._createTrackwayRows(FixtureSession(), logger, graph)
+
+print('[TEST]: Trackway rows match the original calculation %s' % (
+    'PASSED' if rows == expected else 'FAILED'))
+print('ROWS:', rows)
+
+print('[TEST]: Trackway warnings match the original calculation %s' % (
+    'PASSED' if logger.lines == expectedLogger.lines else 'FAILED'))
+print('WARNINGS:', logger.lines)
+
+print('[TEST]: Tracks with a NULL next are not last tracks %s' % (
+    'PASSED' if 'f1' not in [r['firstLeftPes'] for r in rows] else 'FAILED'))
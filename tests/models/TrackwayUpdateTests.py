@@ -0,0 +1,92 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+from pyaid.debug.Logger import Logger
+import sqlalchemy as sqla
+
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+from cadence.models.tracks.Tracks_Trackway import Tracks_Trackway
+
+# Every edit is made within a single transaction that is rolled back once the tests complete, so
+# that the tracks database is left unchanged
+trackModel    = Tracks_Track.MASTER
+trackwayModel = Tracks_Trackway.MASTER
+table         = trackwayModel.__table__
+session       = trackModel.createSession()
+logger        = Logger('TrackwayUpdateTests', printOut=False)
+
+Tracks_Track.enableTrackwayUpdates(session)
+
+COLUMNS = (
+    'siteMapIndex', 'firstLeftPes', 'firstRightPes', 'firstLeftManus', 'firstRightManus')
+
+def getTableRows():
+    """ Returns the trackway rows currently stored in the table keyed by name. """
+    query = sqla.select([table.c.name] + [table.c[name] for name in COLUMNS])
+    return dict((row.name, tuple(row[name] for name in COLUMNS)) for row in session.execute(query))
+
+def getRebuiltRows():
+    """ Returns the trackway rows of a complete recalculation keyed by name. """
+    return dict(
+        (row['name'], tuple(row[name] for name in COLUMNS))
+        for row in Tracks_Trackway._createTrackwayRows(session, logger))
+
+def testMatchesRebuild(label):
+    session.flush()
+    stored  = getTableRows()
+    rebuilt = getRebuiltRows()
+    print('[TEST]: Incremental update matches rebuild after %s %s' % (
+        label, 'PASSED' if stored == rebuilt else 'FAILED'))
+    for name in sorted(set(stored.keys()) ^ set(rebuilt.keys())):
+        print('    ROW MISMATCH:', name, stored.get(name), rebuilt.get(name))
+    for name in sorted(set(stored.keys()) & set(rebuilt.keys())):
+        if stored[name] != rebuilt[name]:
+            print('    VALUE MISMATCH:', name, stored[name], rebuilt[name])
+
+try:
+    Tracks_Trackway.populateTrackwaysTable(session, logger)
+    testMatchesRebuild('population')
+
+    # Link edits: break a linkage in the middle of a series, then link the broken series onto the
+    # first track of a series within another trackway
+    link = session.query(trackModel).filter(
+        trackModel.next != '', trackModel.hidden == False).first()
+    link.next = ''
+    testMatchesRebuild('unlinking')
+
+    other = session.query(trackwayModel).filter(
+        trackwayModel.name != link.trackwayFingerprint,
+        trackwayModel.firstLeftPes != '').first()
+    headUid   = other.firstLeftPes
+    link.next = headUid
+    testMatchesRebuild('relinking')
+
+    # Hide edit: hide the last track of a series
+    tail = session.query(trackModel).filter(
+        trackModel.next == '', trackModel.hidden == False).first()
+    tail.hidden = True
+    testMatchesRebuild('hiding')
+
+    # Identity edit: move the first track of a series to a new trackway
+    first = session.query(trackwayModel).filter(
+        trackwayModel.name != other.name,
+        trackwayModel.firstRightPes != '').first()
+    head  = session.query(trackModel).filter(trackModel.uid == first.firstRightPes).first()
+    head.trackwayNumber = '9999'
+    testMatchesRebuild('identity change')
+
+    # Removal edit: delete a track in the middle of a series
+    middle = session.query(trackModel).filter(
+        trackModel.uid.in_(session.query(trackModel.next)), trackModel.next != '').first()
+    session.delete(middle)
+    testMatchesRebuild('removal')
+
+    # Sessions without trackway updates leave the trackway rows unchanged
+    Tracks_Track.enableTrackwayUpdates(session, False)
+    before = getTableRows()
+    link.next = ''
+    session.flush()
+    print('[TEST]: Disabled updates leave the trackway rows unchanged %s' % (
+        'PASSED' if getTableRows() == before else 'FAILED'))
+finally:
+    session.rollback()
+    session.close()
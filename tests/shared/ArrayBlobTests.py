@@ -0,0 +1,60 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import numpy as np
+
+from cadence.shared.io.ArrayBlob import ArrayBlob
+
+def roundTrip(values, **kwargs):
+    return ArrayBlob.unpack(ArrayBlob.pack(values, **kwargs))
+
+def isSame(result, expected):
+    return result.shape == expected.shape \
+        and result.dtype == expected.dtype \
+        and np.array_equal(result, expected)
+
+points = np.arange(24, dtype=np.float64).reshape((6, 4))
+print('[TEST]: Two-dimensional array round trips %s' % (
+    'PASSED' if isSame(roundTrip(points), points) else 'FAILED'))
+
+print('[TEST]: Compressed array round trips %s' % (
+    'PASSED' if isSame(roundTrip(points, compress=True), points) else 'FAILED'))
+
+scalar = np.array(3.5)
+result = roundTrip(scalar)
+print('[TEST]: Zero-dimensional array keeps its shape %s' % (
+    'PASSED' if isSame(result, scalar) else 'FAILED'))
+print('SHAPE:', result.shape)
+
+print('[TEST]: Python scalar round trips as a zero-dimensional array %s' % (
+    'PASSED' if isSame(roundTrip(2.0), np.array(2.0)) else 'FAILED'))
+
+print('[TEST]: Empty array round trips %s' % (
+    'PASSED' if isSame(roundTrip(np.zeros((0, 4))), np.zeros((0, 4))) else 'FAILED'))
+
+print('[TEST]: Sequence is stored as float64 %s' % (
+    'PASSED' if isSame(roundTrip([1, 2, 3]), np.array([1.0, 2.0, 3.0])) else 'FAILED'))
+
+print('[TEST]: Explicit dtype is stored %s' % (
+    'PASSED' if isSame(roundTrip([1, 2, 3], dtype=np.int32), np.array([1, 2, 3], np.int32))
+    else 'FAILED'))
+
+transposed = points.T
+print('[TEST]: Non-contiguous array round trips %s' % (
+    'PASSED' if isSame(roundTrip(transposed), transposed) else 'FAILED'))
+
+result = roundTrip(points)
+print('[TEST]: Uncompressed array is a read-only view %s' % (
+    'PASSED' if not result.flags.writeable else 'FAILED'))
+
+print('[TEST]: Other blobs are not array blobs %s' % (
+    'PASSED' if not ArrayBlob.isArrayBlob(b'\x00\x01\x02\x03\x04\x05\x06\x07\x08')
+    and not ArrayBlob.isArrayBlob(None) else 'FAILED'))
+
+blob = bytearray(ArrayBlob.pack(points))
+blob[4] = ArrayBlob.VERSION + 1
+try:
+    ArrayBlob.unpack(bytes(blob))
+    rejected = False
+except ValueError:
+    rejected = True
+print('[TEST]: Newer blob versions are rejected %s' % ('PASSED' if rejected else 'FAILED'))
@@ -0,0 +1,52 @@
+from __future__ import print_function, absolute_import, unicode_literals, division
+
+import os
+import shutil
+import tempfile
+
+import sqlalchemy as sqla
+from sqlalchemy import orm
+
+from cadence.models.tracks.Tracks_Track import Tracks_Track
+from cadence.views.tools.trackwayManager.TrackwayManager import TrackwayManager
+
+# The manager reads a temporary tracks database, which is changed through the engine directly to
+# stand in for the other processes, e.g. Maya, that write to the database
+path   = tempfile.mkdtemp()
+engine = sqla.create_engine('sqlite:///%s' % os.path.join(path, 'tracks.vdb'))
+table  = Tracks_Track.MASTER.__table__
+table.create(engine)
+
+def createTrack(uid, trackwayNumber):
+    return dict(
+        uid=uid, site='BEB', level='515', sector='A', trackwayType='S',
+        trackwayNumber=trackwayNumber)
+
+engine.execute(table.insert(), [createTrack('t1', '1'), createTrack('t2', '2')])
+
+queries = []
+def handleExecute(connection, cursor, statement, parameters, context, executemany):
+    if not statement.startswith('PRAGMA'):
+        queries.append(statement)
+sqla.event.listen(engine, 'before_cursor_execute', handleExecute)
+
+manager = TrackwayManager(createSession=orm.sessionmaker(bind=engine))
+try:
+    expected = manager.getTrackwayNames('BEB', '515', 'A')
+    print('[TEST]: Trackway names are found %s' % (
+        'PASSED' if expected == ['S1', 'S2'] else 'FAILED'))
+
+    manager.closeSession(commit=False)
+    del queries[:]
+    result = manager.getTrackwayNames('BEB', '515', 'A')
+    print('[TEST]: Query results are cached after the session is closed %s' % (
+        'PASSED' if result == expected and not queries else 'FAILED'))
+
+    engine.execute(table.insert(), [createTrack('t3', '3')])
+    result = manager.getTrackwayNames('BEB', '515', 'A')
+    print('[TEST]: Changes committed by other connections discard query results %s' % (
+        'PASSED' if result == ['S1', 'S2', 'S3'] else 'FAILED'))
+finally:
+    manager.closeSession(commit=False)
+    engine.dispose()
+    shutil.rmtree(path, ignore_errors=True)